@@ -0,0 +1,380 @@
+"""Benchmarks for the dashboard's render paths on synthetic data.
+
+For every scale / backend pair a worker process is started with FMS_DATA_DIR,
+FMS_CACHE_DIR, FMS_DB_PATH and FMS_BACKEND pointing at a generated dataset
+(see synthetic.py; generated on first use under benchmarks/data/). The
+worker times
+
+- load:      CSV parse, Arrow read and user partitioning (files) or the
+             per-user SQL reads (sqlite)
+- filter:    the explorer's filtered rows, count and first page, a
+             merchant search and a streamed CSV / Parquet export
+- aggregate: category totals, the time series and the utilization pivot,
+             the cohort cube's build and roll-ups, the top merchants
+- figure:    building and serializing each dashboard figure
+- page:      a full headless render of every page with streamlit's AppTest,
+             first run and reruns after switching user
+- startup:   a fresh Python process importing streamlit and rendering one
+             page once, i.e. a cold worker's first-page latency
+
+and reports the best of --repeat runs for everything but cold loads and
+first page runs. Results are written
+to benchmarks/results/latest.json and checked against thresholds.json
+(absolute seconds per scale / backend / step) and, with --baseline, against
+an earlier results file.
+
+    python benchmarks/run.py                               # 10k, both backends
+    python benchmarks/run.py --scales 10k 1m --backends sqlite
+    python benchmarks/run.py --baseline benchmarks/results/before.json
+    python benchmarks/run.py --record-thresholds           # refresh thresholds.json
+"""
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import synthetic
+
+BENCH_DIR = Path(__file__).resolve().parent
+APP_DIR = BENCH_DIR.parent / "financial_app"
+DATA_ROOT = BENCH_DIR / "data"
+RESULTS_DIR = BENCH_DIR / "results"
+THRESHOLDS = BENCH_DIR / "thresholds.json"
+
+BACKENDS = ["files", "sqlite"]
+PAGES = [
+    None,
+    "pages/00_Introduction.py",
+    "pages/01_User_Profile.py",
+    "pages/02_Transactions_Explorer.py",
+    "pages/03_Budget_Analysis.py",
+    "pages/04_Savings_and_Goals.py",
+    "pages/05_Cohort_Analysis.py",
+]
+
+# Recorded thresholds leave this much room over the measured time
+THRESHOLD_HEADROOM = 2.0
+THRESHOLD_FLOOR = 0.01
+# Steps that write or parse files swing with the disk and page cache, so a
+# few ms of measured time would record a threshold that fails on a busy runner
+IO_STEPS = ("filter:export_", "load:csv:")
+IO_THRESHOLD_FLOOR = 0.05
+
+
+def measure(fn, repeat=1):
+    """Best wall time of `repeat` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+# --------------------------
+# Worker (runs inside the configured environment)
+# --------------------------
+def step_timings(backend, repeat):
+    import pandas as pd
+    import plotly.io
+
+    import budget_engine
+    import charts
+    import cube
+    import data_store
+    import db
+    import export
+    import merchants
+    import queries
+    import savings_engine
+    from transaction_sources import FrameSource, SqlSource, TransactionFilter
+
+    timings = {}
+    users = data_store.list_users("transactions")
+    user_id = users[len(users) // 2]
+
+    if backend == "files":
+        for name in data_store.DATASETS:
+            timings[f"load:csv:{name}"] = measure(lambda: data_store.read_csv_typed(name))
+            data_store.build_columnar(name)
+            timings[f"load:arrow:{name}"] = measure(lambda: data_store.map_columnar(name), repeat)
+        timings["load:partition:transactions"] = measure(
+            lambda: data_store.build_partition("transactions")
+        )
+        partitions = {name: data_store.build_partition(name) for name in data_store.DATASETS}
+        frames = {name: part.get(user_id) for name, part in partitions.items()}
+        # Same columns the explorer page detects in the raw export
+        make_source = lambda: FrameSource(  # noqa: E731
+            frames["transactions"], "transaction_date", "category_id", None, "amount", user_id=user_id,
+        )
+        all_goals = partitions["savings"].frame
+        transactions = partitions["transactions"].frame
+        all_rates = savings_engine.contribution_rates(
+            budget_engine.monthly_actuals(transactions), savings_engine.latest_periods(transactions)
+        )
+    else:
+        for name, sql in queries.USER_QUERIES.items():
+            params = {"user_id": int(user_id)}
+            dates = queries.USER_QUERY_DATES.get(name)
+            timings[f"load:sql:{name}"] = measure(lambda: queries.read_sql(sql, params, dates), repeat)
+        frames = {
+            name: queries.read_sql(sql, {"user_id": int(user_id)}, queries.USER_QUERY_DATES.get(name))
+            for name, sql in queries.USER_QUERIES.items()
+        }
+        make_source = lambda: SqlSource(user_id)  # noqa: E731
+        with db.get_pool().connection() as conn:
+            all_goals, all_rates = savings_engine.read_goal_inputs(conn)
+            # Every goal read from the summary tables and projected in one pass
+            timings["load:sql:goal_projections"] = measure(
+                lambda: savings_engine.read_goal_projections(conn), repeat
+            )
+
+    options = make_source().options()
+    start = options["min_date"].date()
+    end = min(options["max_date"].date(), (options["min_date"] + pd.Timedelta(days=89)).date())
+    categories = tuple(options["categories"][: max(1, len(options["categories"]) // 2)])
+    quarter = TransactionFilter(start, end, categories, None)
+    everything = TransactionFilter(options["min_date"].date(), options["max_date"].date(), None, None)
+
+    timings["filter:rows"] = measure(lambda: make_source().rows(quarter), repeat)
+    timings["filter:count"] = measure(lambda: make_source().count(quarter), repeat)
+    timings["filter:first_page"] = measure(
+        lambda: make_source().page(quarter, "date", True, 50, None), repeat
+    )
+    # A merchant prefix as typed into the search box, combined with the date / category filters
+    merchant = str(make_source().rows(everything)["merchant_name"].iloc[0])
+    search = quarter._replace(search=merchant[:3])
+    timings["filter:search"] = measure(lambda: make_source().page(search, "date", True, 50, None), repeat)
+    timings["filter:search_count"] = measure(lambda: make_source().count(search), repeat)
+    # Every row of the user, as the explorer's export writes it
+    export.EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    for fmt, spec in export.FORMATS.items():
+        path = export.EXPORT_DIR / f"benchmark{spec.suffix}"
+        timings[f"filter:export_{fmt}"] = measure(lambda: export.export(make_source(), everything, fmt, path), repeat)
+    timings["aggregate:category_totals"] = measure(lambda: make_source().category_totals(quarter), repeat)
+    timings["aggregate:time_series"] = measure(lambda: make_source().time_series(everything), repeat)
+    timings["aggregate:utilization_pivot"] = measure(
+        lambda: charts.utilization_pivot(frames["budget"]), repeat
+    )
+    # Every goal of every user, as the savings pages would need for a cohort view
+    timings["aggregate:goal_projections"] = measure(
+        lambda: savings_engine.project_goals(all_goals, all_rates), repeat
+    )
+    # Cohort page: the cube is built once per data version, then only rolled up
+    timings["aggregate:cube_build"] = measure(cube.precompute)
+    cells, cohorts = cube.read_cube(cube.data_version())
+    timings["aggregate:cube_rollup"] = measure(
+        lambda: cube.per_user(cube.rollup(cells, ["city", "month"]), cube.cohort_sizes(cohorts, ["city"])), repeat
+    )
+
+    # Explorer panel: Space-Saving summaries (sqlite) or exact totals over the export (files)
+    timings["aggregate:top_merchants"] = measure(lambda: merchants.top_merchants(user_id, "spend"), repeat)
+    timings["aggregate:top_merchants_all"] = measure(
+        lambda: merchants.top_merchants(merchants.ALL_USERS, "count"), repeat
+    )
+
+    figures = {
+        "income_vs_expenses": (charts.income_vs_expenses, frames["monthly"]),
+        "spending_by_category": (charts.spending_by_category, frames["category"]),
+        "savings_progress": (charts.savings_progress, frames["savings"]),
+        "utilization_heatmap": (charts.utilization_heatmap, frames["budget"]),
+        "budget_vs_actual": (charts.budget_vs_actual, frames["budget"]),
+    }
+    for name, (chart, frame) in figures.items():
+        # __wrapped__ skips the figure cache so every repeat builds from scratch
+        build = chart.__wrapped__
+        timings[f"figure:{name}"] = measure(
+            lambda: plotly.io.to_json(build(frame), validate=False), repeat
+        )
+    return timings
+
+
+def page_timings(repeat):
+    from streamlit.testing.v1 import AppTest
+
+    timings, errors = {}, {}
+    for page in PAGES:
+        name = Path(page).stem if page else "app"
+        at = AppTest.from_file("app.py", default_timeout=600)
+        if page:
+            at.switch_page(page)
+        timings[f"page:{name}:first"] = measure(at.run)
+        if len(at.selectbox):
+            # Each rerun switches to a user not shown yet, so none hits a warm per-user cache
+            reruns = []
+            for i in range(1, min(repeat, len(at.selectbox[0].options) - 1) + 1):
+                at.selectbox[0].select_index(i)
+                reruns.append(measure(at.run))
+            timings[f"page:{name}:rerun"] = min(reruns)
+        if len(at.exception):
+            errors[name] = [e.value for e in at.exception]
+    return timings, errors
+
+
+# Run in a new interpreter per measurement, so nothing is imported yet
+STARTUP_SCRIPT = """
+import sys
+from streamlit.testing.v1 import AppTest
+
+at = AppTest.from_file("app.py", default_timeout=600)
+if sys.argv[1]:
+    at.switch_page(sys.argv[1])
+at.run()
+sys.exit(1 if len(at.exception) else 0)
+"""
+
+
+def startup_timings(repeat):
+    timings = {}
+    for page in PAGES:
+        name = Path(page).stem if page else "app"
+        command = [sys.executable, "-c", STARTUP_SCRIPT, page or ""]
+        timings[f"startup:{name}"] = measure(
+            lambda: subprocess.run(command, check=True, stderr=subprocess.DEVNULL), repeat
+        )
+    return timings
+
+
+def run_worker(backend, repeat, result_path):
+    os.chdir(APP_DIR)
+    sys.path.insert(0, str(APP_DIR))
+    timings = step_timings(backend, repeat)
+    pages, errors = page_timings(repeat)
+    timings.update(pages)
+    timings.update(startup_timings(repeat))
+    Path(result_path).write_text(json.dumps({"timings": timings, "errors": errors}))
+
+
+# --------------------------
+# Driver
+# --------------------------
+def ensure_dataset(scale):
+    data_dir = DATA_ROOT / scale
+    if not (data_dir / "fms.db").exists():
+        print(f"generating {scale} dataset in {data_dir} ...", flush=True)
+        synthetic.build(data_dir, synthetic.parse_scale(scale))
+    # The dashboard does not migrate; bring datasets from older runs up to date
+    synthetic.migrations.migrate(data_dir / "fms.db")
+    if not (data_dir / "users.csv").exists():
+        conn = sqlite3.connect(data_dir / "fms.db")
+        try:
+            synthetic.aggregates.export_summaries(conn, data_dir)
+        finally:
+            conn.close()
+    return data_dir
+
+
+def run_case(scale, backend, repeat):
+    data_dir = ensure_dataset(scale)
+    env = dict(
+        os.environ,
+        FMS_DATA_DIR=str(data_dir),
+        FMS_CACHE_DIR=str(data_dir / ".fms_cache"),
+        FMS_DB_PATH=str(data_dir / "fms.db"),
+        FMS_BACKEND=backend,
+    )
+    RESULTS_DIR.mkdir(exist_ok=True)
+    result_path = RESULTS_DIR / f".worker-{scale}-{backend}.json"
+    log_path = RESULTS_DIR / f"worker-{scale}-{backend}.log"
+    # Streamlit warns a lot outside a real server; keep it out of the table
+    with open(log_path, "w") as log:
+        worker = subprocess.run(
+            [sys.executable, __file__, "--worker", backend, "--repeat", str(repeat), "--result", str(result_path)],
+            env=env,
+            stderr=log,
+        )
+    if worker.returncode:
+        raise SystemExit(f"{scale}/{backend} worker failed, see {log_path}")
+    result = json.loads(result_path.read_text())
+    result_path.unlink()
+    return result
+
+
+def check(results, thresholds, baseline=None, tolerance=0.25):
+    """Human-readable failures for steps over their threshold or slower than baseline."""
+    failures = []
+    for scale, backends in results.items():
+        for backend, result in backends.items():
+            for page, errors in result["errors"].items():
+                failures.append(f"{scale}/{backend}/{page}: page raised {errors}")
+            limits = thresholds.get(scale, {}).get(backend, {})
+            previous = (baseline or {}).get(scale, {}).get(backend, {}).get("timings", {})
+            for step, seconds in result["timings"].items():
+                if step in limits and seconds > limits[step]:
+                    failures.append(f"{scale}/{backend}/{step}: {seconds:.3f}s > threshold {limits[step]:.3f}s")
+                # Ignore sub-5ms noise when comparing against a baseline run
+                if step in previous and seconds > previous[step] * (1 + tolerance) + 0.005:
+                    failures.append(f"{scale}/{backend}/{step}: {seconds:.3f}s vs baseline {previous[step]:.3f}s")
+    return failures
+
+
+def threshold_floor(step):
+    return IO_THRESHOLD_FLOOR if step.startswith(IO_STEPS) else THRESHOLD_FLOOR
+
+
+def record_thresholds(results, thresholds):
+    for scale, backends in results.items():
+        for backend, result in backends.items():
+            thresholds.setdefault(scale, {})[backend] = {
+                step: round(max(seconds * THRESHOLD_HEADROOM, threshold_floor(step)), 3)
+                for step, seconds in sorted(result["timings"].items())
+            }
+    THRESHOLDS.write_text(json.dumps(thresholds, indent=2, sort_keys=True) + "\n")
+
+
+def print_table(scale, backend, result, limits):
+    print(f"\n== {scale} / {backend}")
+    for step, seconds in result["timings"].items():
+        limit = limits.get(step)
+        status = "" if limit is None else ("ok" if seconds <= limit else "SLOW")
+        limit_text = f"{limit:9.3f}s" if limit is not None else " " * 10
+        print(f"  {step:<40} {seconds:9.4f}s {limit_text} {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", default=["10k"], help=f"any of {', '.join(synthetic.SCALES)}")
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per fast step (best is kept)")
+    parser.add_argument("--baseline", type=Path, help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs --baseline")
+    parser.add_argument("--out", type=Path, default=RESULTS_DIR / "latest.json")
+    parser.add_argument("--record-thresholds", action="store_true", help="write thresholds.json from this run")
+    parser.add_argument("--worker", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.repeat, args.result)
+        return
+
+    thresholds = json.loads(THRESHOLDS.read_text()) if THRESHOLDS.exists() else {}
+    results = {}
+    for scale in args.scales:
+        for backend in args.backends:
+            result = run_case(scale, backend, args.repeat)
+            results.setdefault(scale, {})[backend] = result
+            print_table(scale, backend, result, thresholds.get(scale, {}).get(backend, {}))
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nresults -> {args.out}")
+
+    if args.record_thresholds:
+        record_thresholds(results, thresholds)
+        print(f"thresholds -> {THRESHOLDS}")
+        return
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    failures = check(results, thresholds, baseline, args.tolerance)
+    for failure in failures:
+        print("FAIL", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
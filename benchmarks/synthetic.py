@@ -0,0 +1,103 @@
+"""Synthetic datasets for the benchmarks, at any number of transactions.
+
+The tables come from financial_app/generate_data.py, the vectorized version
+of the index.ipynb generator (same schema, lookup lists and distributions,
+with the number of users growing with the requested transaction count).
+After loading, the schema migrations are applied and the six CSV exports the
+dashboard reads are written next to the database, exactly like the
+notebook's export cell (the savings export still measures progress against
+2025-12-31).
+
+    python benchmarks/synthetic.py 1m                 # -> benchmarks/data/1m/
+    python benchmarks/synthetic.py 50000 --out /tmp/fms50k
+"""
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "financial_app"))
+
+import aggregates  # noqa: E402
+import generate_data  # noqa: E402
+import migrations  # noqa: E402
+
+SCALES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+SAVINGS_EXPORT = """
+    SELECT
+        g.goal_id, g.user_id, g.goal_name, g.target_amount, g.current_amount,
+        g.start_date, g.target_date, g.priority_level, g.status,
+        u.annual_income, u.occupation, u.city,
+        (g.current_amount * 1.0 / g.target_amount) AS progress_ratio,
+        JULIANDAY(g.target_date) - JULIANDAY(g.start_date) AS total_days,
+        JULIANDAY('2025-12-31') - JULIANDAY(g.start_date) AS days_passed
+    FROM SavingsGoals g
+    JOIN Users u ON u.user_id = g.user_id;
+"""
+
+
+def export_savings(conn, out_dir):
+    goals = pd.read_sql_query(SAVINGS_EXPORT, conn)
+    goals["on_track"] = (goals["progress_ratio"] >= goals["days_passed"] / goals["total_days"]).astype(int)
+    # Same codes as sklearn's LabelEncoder (sorted classes)
+    for column, encoded in [
+        ("priority_level", "priority_encoded"),
+        ("status", "status_encoded"),
+        ("occupation", "occupation_encoded"),
+        ("city", "city_encoded"),
+    ]:
+        goals[encoded] = pd.Categorical(goals[column]).codes
+    goals.to_csv(Path(out_dir) / "savings_progress.csv", index=False)
+
+
+def export_transactions(conn, out_dir, chunksize=250_000):
+    target = Path(out_dir) / "transactions_full.csv"
+    chunks = pd.read_sql_query("SELECT * FROM Transactions;", conn, chunksize=chunksize)
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(target, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+
+def build(out_dir, n_transactions, n_users=None, seed=42):
+    """Database plus the six dashboard CSVs in `out_dir`; returns the transaction count."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    db_path = out_dir / "fms.db"
+    db_path.unlink(missing_ok=True)
+    counts = generate_data.write_all(
+        generate_data.SqliteWriter(db_path),
+        generate_data.generate(n_transactions, n_users, seed),
+    )
+    migrations.migrate(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        aggregates.export_summaries(conn, out_dir)
+        export_savings(conn, out_dir)
+        export_transactions(conn, out_dir)
+    finally:
+        conn.close()
+    return counts["Transactions"]
+
+
+def parse_scale(value):
+    return SCALES.get(value.lower()) or generate_data.parse_count(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scale", help=f"one of {', '.join(SCALES)} or a transaction count")
+    parser.add_argument("--out", type=Path, help="output folder (default benchmarks/data/<scale>)")
+    parser.add_argument("--users", type=int, help="number of users (default: scales with the row count)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    out_dir = args.out or BENCH_DIR / "data" / args.scale.lower()
+    total = build(out_dir, parse_scale(args.scale), args.users, args.seed)
+    print(f"{total:,} transactions -> {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
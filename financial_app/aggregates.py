@@ -0,0 +1,89 @@
+"""Summary exports built from the trigger-maintained summary tables.
+
+MonthlySummary and CategoryMonthlySpend (migration 2 in migrations.py) are
+kept current bucket by bucket as transactions are inserted, updated or
+deleted. Writing the monthly and category CSVs therefore reads a few rows
+per user instead of re-running GROUP BY over the full Transactions history.
+budget_vs_actual.csv comes from budget_engine.py, which needs a single
+streamed pass over expenses. users.csv is a copy of the user attributes
+(city, occupation, income) the cohort cube groups by.
+
+    python aggregates.py                  # refresh the summary and users CSVs
+    python aggregates.py --out some/dir   # write them elsewhere
+    python aggregates.py --rebuild        # recompute summaries from scratch first
+"""
+import argparse
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+import budget_engine
+import migrations
+from settings import DATA_DIR, DB_PATH
+
+SUMMARY_EXPORTS = {
+    "monthly_summary.csv": """
+        SELECT user_id, full_name, month, total_expenses, total_income
+        FROM vw_monthly_summary
+        ORDER BY user_id, month;
+    """,
+    "category_spending.csv": """
+        SELECT user_id, full_name, category_name, total_spent
+        FROM vw_category_spending
+        ORDER BY user_id, total_spent DESC;
+    """,
+    "users.csv": """
+        SELECT user_id, full_name, occupation, annual_income, country, city
+        FROM Users
+        ORDER BY user_id;
+    """,
+}
+
+
+def rebuild_summaries(conn):
+    """Recompute every summary bucket from Transactions (repair / audit only)."""
+    with conn:
+        conn.execute("DELETE FROM MonthlySummary;")
+        conn.execute("DELETE FROM CategoryMonthlySpend;")
+        for statement in migrations.SUMMARY_BACKFILL:
+            conn.execute(statement)
+
+
+def export_summaries(conn, out_dir=DATA_DIR):
+    """Write the summary CSVs the dashboard reads; returns {file: rows}."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = {}
+    for filename, sql in SUMMARY_EXPORTS.items():
+        frame = pd.read_sql_query(sql, conn)
+        frame.to_csv(out_dir / filename, index=False)
+        written[filename] = len(frame)
+
+    # Budgets need actuals per (user, category, year, month); see budget_engine.py
+    frame = budget_engine.read_budget_vs_actual(conn)
+    frame.to_csv(out_dir / "budget_vs_actual.csv", index=False)
+    written["budget_vs_actual.csv"] = len(frame)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="SQLite database to read")
+    parser.add_argument("--out", type=Path, default=DATA_DIR, help="folder for the CSV exports")
+    parser.add_argument("--rebuild", action="store_true", help="recompute summaries from Transactions first")
+    args = parser.parse_args()
+
+    migrations.migrate(args.db)
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.rebuild:
+            rebuild_summaries(conn)
+        for filename, rows in export_summaries(conn, args.out).items():
+            print(f"{filename:<24} {rows:>8,} rows -> {args.out / filename}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
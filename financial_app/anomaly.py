@@ -0,0 +1,242 @@
+"""Streaming overspend and unusual-amount alerts for newly ingested transactions.
+
+The Budget Analysis page used to flag `utilization > 100` from the static
+budget export, long after the month was over. `Detector` instead looks at
+every chunk ingest.py inserts and raises an alert as soon as
+
+- one expense is unusually large for its user and category: its z-score
+  against every earlier expense of that (user, category) reaches
+  Z_THRESHOLD, once there are at least MIN_HISTORY of them, or
+- month-to-date spend in a budgeted category crosses one of
+  BUDGET_THRESHOLDS percent of that month's budget.
+
+State per key is constant-size: a running count, mean and M2 (Welford) per
+(user, category) in CategoryAmountStats, and the month-to-date totals the
+summary triggers already keep in CategoryMonthlySpend (both in
+migrations.py). A chunk reads and writes only the rows of the keys it
+touches, never the Transactions history. Rows are scored in arrival order,
+so earlier rows of the same chunk count as history and the alerts do not
+depend on --chunksize. Alerts are written to SpendingAlerts inside the
+chunk's transaction, so a dry run or a failed chunk leaves no trace.
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# An expense this many standard deviations above its key's mean is flagged
+Z_THRESHOLD = 3.0
+# ... but only once the key has this many earlier expenses
+MIN_HISTORY = 10
+# Month-to-date utilization (%) levels that raise an alert when crossed
+BUDGET_THRESHOLDS = (80, 100)
+
+KEYS = ["user_id", "category_id"]
+BUCKET_KEYS = ["user_id", "category_id", "year", "month"]
+
+ALERT_COLUMNS = [
+    "user_id", "category_id", "year", "month", "kind", "value", "threshold",
+    "amount", "account_id", "reference_number", "transaction_date",
+]
+
+
+# --------------------------
+# Running statistics
+# --------------------------
+def amount_scores(expenses, state, min_history=MIN_HISTORY):
+    """z-score of each expense against its key's earlier expenses + the keys' new state.
+
+    `expenses` holds user_id, category_id and a positive `spent` column in
+    arrival order; `state` is indexed by (user_id, category_id) with n, mean
+    and m2 (missing keys start empty). Sums are taken relative to each key's
+    stored mean, so the Welford merge stays exact in float64:
+    mean = mean0 + s1 / n and m2 = m2_0 + s2 - s1**2 / n. A key without
+    history is centred on its first expense in the chunk instead of 0, which
+    is just as valid with n0 = 0 and keeps s2 from cancelling out.
+    """
+    # float64 first: an empty state frame from SQL has object columns
+    prior = state.reindex(pd.MultiIndex.from_frame(expenses[KEYS])).astype("float64")
+    n0 = prior["n"].fillna(0).to_numpy()
+    spent = expenses["spent"].to_numpy(dtype="float64")
+    first_spent = (
+        pd.Series(spent, index=expenses.index)
+        .groupby([expenses["user_id"], expenses["category_id"]], sort=False)
+        .transform("first")
+        .to_numpy()
+    )
+    mean0 = np.where(n0 > 0, prior["mean"].fillna(0).to_numpy(), first_spent)
+    m2_0 = prior["m2"].fillna(0).to_numpy()
+
+    # Sums over the earlier rows of the same key in this chunk
+    shifted = pd.DataFrame({"d": spent - mean0, "d2": (spent - mean0) ** 2}, index=expenses.index)
+    group = shifted.groupby([expenses["user_id"], expenses["category_id"]], sort=False)
+    before = group.cumsum() - shifted
+    s1, s2 = before["d"].to_numpy(), before["d2"].to_numpy()
+    n = n0 + group.cumcount().to_numpy()
+
+    safe_n = np.maximum(n, 1)
+    mean = mean0 + s1 / safe_n
+    m2 = np.maximum(m2_0 + s2 - s1 ** 2 / safe_n, 0)
+    std = np.sqrt(m2 / np.maximum(n - 1, 1))
+    scored = (n >= min_history) & (std > 0)
+    z = np.divide(spent - mean, std, out=np.full_like(spent, np.nan), where=scored)
+
+    totals = group.sum()
+    counts = group.size()
+    first = pd.DataFrame({"n": n0, "mean": mean0, "m2": m2_0}, index=expenses.index).groupby(
+        [expenses["user_id"], expenses["category_id"]], sort=False
+    ).first()
+    total_n = first["n"] + counts
+    new_state = pd.DataFrame({
+        "n": total_n.astype("int64"),
+        "mean": first["mean"] + totals["d"] / total_n,
+        "m2": np.maximum(first["m2"] + totals["d2"] - totals["d"] ** 2 / total_n, 0),
+    })
+    new_state.index.names = KEYS
+    return z, new_state
+
+
+def budget_crossings(rows, buckets, thresholds=BUDGET_THRESHOLDS):
+    """(row positions, threshold, utilization) where month-to-date spend crosses a threshold.
+
+    `rows` are the chunk's expenses (amount < 0, the rows the
+    CategoryMonthlySpend trigger sums) in arrival order with BUCKET_KEYS and
+    `spent` (-amount); `buckets` is indexed by BUCKET_KEYS with the month's
+    `total_spent` after the chunk and `budget_amount`.
+    """
+    matched = buckets.reindex(pd.MultiIndex.from_frame(rows[BUCKET_KEYS]))
+    budget = matched["budget_amount"].to_numpy(dtype="float64")
+    spent = rows["spent"].to_numpy(dtype="float64")
+    group = pd.Series(spent, index=rows.index).groupby([rows[key] for key in BUCKET_KEYS], sort=False)
+    running = group.cumsum().to_numpy()
+    # Spend already on the books before this chunk
+    base = matched["total_spent"].fillna(0).to_numpy(dtype="float64") - group.transform("sum").to_numpy()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        after = (base + running) / budget * 100
+        before = (base + running - spent) / budget * 100
+    crossings = []
+    for threshold in thresholds:
+        crossed = np.flatnonzero((budget > 0) & (before < threshold) & (after >= threshold))
+        crossings.append((crossed, threshold, after[crossed]))
+    return crossings
+
+
+# --------------------------
+# Detector (ingest.py)
+# --------------------------
+class Detector:
+    """Scores chunks inserted on one connection and records the alerts they raise."""
+
+    def __init__(self, conn, z_threshold=Z_THRESHOLD, min_history=MIN_HISTORY, budget_thresholds=BUDGET_THRESHOLDS):
+        self.conn = conn
+        self.z_threshold = z_threshold
+        self.min_history = min_history
+        self.budget_thresholds = budget_thresholds
+
+    def stage(self, table, frame, columns):
+        """Load `frame[columns]` into a fresh temp table for joins."""
+        self.conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {table} ({', '.join(columns)});")
+        self.conn.execute(f"DELETE FROM {table};")
+        self.conn.executemany(
+            f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))});",
+            frame[columns].drop_duplicates().itertuples(index=False, name=None),
+        )
+
+    def read_state(self, expenses):
+        self.stage("anomaly_keys", expenses, KEYS)
+        return pd.read_sql_query(
+            """
+            SELECT s.user_id, s.category_id, s.n, s.mean, s.m2
+            FROM anomaly_keys k
+            JOIN CategoryAmountStats s ON s.user_id = k.user_id AND s.category_id = k.category_id;
+            """,
+            self.conn,
+            index_col=KEYS,
+        )
+
+    def write_state(self, state):
+        self.conn.executemany(
+            """
+            INSERT INTO CategoryAmountStats (user_id, category_id, n, mean, m2)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id, category_id) DO UPDATE SET
+                n = excluded.n, mean = excluded.mean, m2 = excluded.m2;
+            """,
+            [
+                (int(user_id), int(category_id), int(n), float(mean), float(m2))
+                for (user_id, category_id), n, mean, m2 in zip(
+                    state.index, state["n"], state["mean"], state["m2"]
+                )
+            ],
+        )
+
+    def read_buckets(self, rows):
+        """Month-to-date spend and budget for the budgeted buckets in `rows`."""
+        self.stage("anomaly_buckets", rows, BUCKET_KEYS)
+        buckets = pd.read_sql_query(
+            """
+            SELECT k.user_id, k.category_id, k.year, k.month,
+                   COALESCE(s.total_spent, 0) AS total_spent, b.budget_amount
+            FROM anomaly_buckets k
+            JOIN Budgets b
+                ON b.user_id = k.user_id AND b.year = k.year
+                AND b.month = k.month AND b.category_id = k.category_id
+            LEFT JOIN CategoryMonthlySpend s
+                ON s.user_id = k.user_id AND s.category_id = k.category_id
+                AND s.year = k.year AND s.month = k.month;
+            """,
+            self.conn,
+        )
+        return buckets.drop_duplicates(BUCKET_KEYS).set_index(BUCKET_KEYS)
+
+    def observe(self, rows):
+        """Score rows just inserted in the open transaction; returns the alerts raised.
+
+        `rows` are the inserted Transactions rows in insert order (user_id,
+        account_id, category_id, amount, transaction_date as YYYY-MM-DD,
+        reference_number), as ingest.Ingestor.load_chunk produces them.
+        """
+        if rows.empty:
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+        rows = rows.reset_index(drop=True)
+        rows = rows.assign(
+            year=rows["transaction_date"].str[:4].astype("int64"),
+            month=rows["transaction_date"].str[5:7].astype("int64"),
+            spent=-rows["amount"].astype("float64"),
+        )
+        alerts = []
+
+        expenses = rows[rows["amount"] < 0]
+        if expenses.empty:
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+        z, state = amount_scores(expenses, self.read_state(expenses), self.min_history)
+        self.write_state(state)
+        unusual = np.flatnonzero(z >= self.z_threshold)
+        alerts.append(expenses.iloc[unusual].assign(kind="amount", value=z[unusual], threshold=self.z_threshold))
+
+        # Refunds and credits never reach CategoryMonthlySpend, so they must
+        # not move the month-to-date spend either
+        buckets = self.read_buckets(expenses)
+        if len(buckets):
+            for positions, threshold, utilization in budget_crossings(expenses, buckets, self.budget_thresholds):
+                alerts.append(expenses.iloc[positions].assign(kind="budget", value=utilization, threshold=threshold))
+
+        alerts = [frame for frame in alerts if len(frame)]
+        if not alerts:
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+        alerts = pd.concat(alerts).sort_index(kind="stable")
+        alerts = alerts.assign(amount=alerts["spent"].round(2), value=alerts["value"].round(2))[ALERT_COLUMNS]
+        self.write_alerts(alerts)
+        return alerts
+
+    def write_alerts(self, alerts):
+        created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.conn.executemany(
+            f"INSERT INTO SpendingAlerts ({', '.join(ALERT_COLUMNS)}, created_at) "
+            f"VALUES ({', '.join('?' * (len(ALERT_COLUMNS) + 1))});",
+            [
+                (*row, created_at)
+                for row in alerts.astype(object).where(alerts.notna(), None).itertuples(index=False, name=None)
+            ],
+        )
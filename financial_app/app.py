@@ -1,154 +1,40 @@
+"""Entry point: page config, navigation and the shared sidebar, set up once per run.
+
+`streamlit run app.py` runs this shell on every rerun and then only the
+selected page's script. The shell itself imports only streamlit and
+instrumentation, which defers its own pandas and plotly imports; each
+page imports the data, engine and plotting modules it uses, so a
+fresh worker only pays for what the first page needs (the Introduction
+loads none of them). `python benchmarks/run.py` times a cold process's
+first render of each page under `startup:`. Each rerun of the page is
+timed by instrumentation.page_run.
+"""
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+
+import instrumentation
 
 st.set_page_config(
     page_title="Financial Dashboard",
     layout="wide",
 )
 
-# HIDE STREAMLIT DEFAULT MULTIPAGE SIDEBAR (all versions)
-st.markdown("""
-    <style>
-        /* Hide default sidebar nav */
-        section[data-testid="stSidebarNav"] {display: none !important;}
-        div[data-testid="stSidebarNavItems"] {display: none !important;}
-        div[data-testid="stSidebarNav"] {display: none !important;}
-    </style>
-""", unsafe_allow_html=True)
-
-
-# HIDE STREAMLIT DEFAULT MULTIPAGE SIDEBAR
-st.markdown("""
-    <style>
-        section[data-testid="stSidebarNav"] {
-            display: none !important;
-        }
-    </style>
-""", unsafe_allow_html=True)
-
-@st.cache_data
-def load_data():
-    monthly = pd.read_csv("monthly_summary.csv")
-    category = pd.read_csv("category_spending.csv")
-    savings = pd.read_csv("savings_progress.csv")
-    budget = pd.read_csv("budget_vs_actual.csv")
-    return monthly, category, savings, budget
-
-st.sidebar.page_link("app.py", label="🏠 Dashboard")
-st.sidebar.page_link("pages/01_User_Profile.py", label="👤 User Profile")
-st.sidebar.page_link("pages/02_Transactions_Explorer.py", label="💳 Transactions Explorer")
-st.sidebar.page_link("pages/03_Budget_Analysis.py", label="📊 Budget Analysis")
-st.sidebar.page_link("pages/04_Savings_and_Goals.py", label="🎯 Savings & Goals")
-
-# Load CSV data
-monthly, category, savings, budget = load_data()
-
-
-# --------------------------
-# Streamlit Layout
-# --------------------------
-st.title("💰 Financial Analytics Dashboard")
-st.markdown("Interactive analytics powered by **Python + Streamlit**")
-
-
-# --------------------------
-# Sidebar Filters
-# --------------------------
-st.sidebar.header("Filters")
-users = monthly["user_id"].unique()
-selected_user = st.sidebar.selectbox("Select User ID", users)
-
-monthly = monthly[monthly["user_id"] == selected_user]
-category = category[category["user_id"] == selected_user]
-savings = savings[savings["user_id"] == selected_user]
-budget = budget[budget["user_id"] == selected_user]
-
-
-# --------------------------
-# KPIs
-# --------------------------
-st.subheader("📊 Key Metrics")
-
-col1, col2, col3 = st.columns(3)
-total_income = monthly["total_income"].sum()
-total_expenses = monthly["total_expenses"].sum()
-total_savings = total_income - total_expenses
-
-col1.metric("Total Income", f"${total_income:,.0f}")
-col2.metric("Total Expenses", f"${total_expenses:,.0f}")
-col3.metric("Net Savings", f"${total_savings:,.0f}")
-
-st.markdown("---")
-
-
-# --------------------------
-# Income vs Expenses Trend
-# --------------------------
-st.subheader("📈 Monthly Income vs Expenses")
-
-fig1 = px.line(
-    monthly,
-    x="month",
-    y=["total_income", "total_expenses"],
-    markers=True,
-    labels={"value": "Amount", "month": "Month"},
-)
-
-st.plotly_chart(fig1, use_container_width=True)
-
-
-# --------------------------
-# Spending by Category
-# --------------------------
-st.subheader("🛒 Spending by Category")
-
-fig2 = px.bar(
-    category.sort_values("total_spent", ascending=True),
-    x="total_spent",
-    y="category_name",
-    orientation="h",
-    color="total_spent",
-    color_continuous_scale="Blues",
-)
-
-st.plotly_chart(fig2, use_container_width=True)
-
-
-# --------------------------
-# Savings Progress
-# --------------------------
-st.subheader("💡 Savings Goal Progress")
-
-fig3 = px.bar(
-    savings,
-    x="progress_ratio",
-    y="goal_name",
-    orientation="h",
-    color="progress_ratio",
-    color_continuous_scale="Viridis",
-    labels={"progress_ratio": "Progress (%)"}
-)
-
-st.plotly_chart(fig3, use_container_width=True)
-
-# --------------------------
-# Budget Utilization Heatmap
-# --------------------------
-st.subheader("🔥 Budget Utilization (Monthly)")
-
-pivot = budget.pivot_table(
-    index="category_name",
-    columns="month",
-    values="utilization"
-)
-
-fig4 = px.imshow(
-    pivot,
-    aspect="auto",
-    color_continuous_scale="RdYlGn_r",
-    labels=dict(x="Month", y="Category Name", color="Utilization %"),
-)
-
-st.plotly_chart(fig4, use_container_width=True)
-
+# (page, sidebar label); the Introduction is reachable by URL only
+PAGES = [
+    (st.Page("pages/dashboard.py", title="Dashboard", default=True), "🏠 Dashboard"),
+    (st.Page("pages/00_Introduction.py", title="Welcome"), None),
+    (st.Page("pages/01_User_Profile.py", title="User Profile"), "👤 User Profile"),
+    (st.Page("pages/02_Transactions_Explorer.py", title="Transactions Explorer"), "💳 Transactions Explorer"),
+    (st.Page("pages/03_Budget_Analysis.py", title="Budget Analysis"), "📊 Budget Analysis"),
+    (st.Page("pages/04_Savings_and_Goals.py", title="Savings & Goals"), "🎯 Savings & Goals"),
+    (st.Page("pages/05_Cohort_Analysis.py", title="Cohort Analysis"), "👥 Cohort Analysis"),
+]
+
+# Our own sidebar links replace Streamlit's generated page list
+page = st.navigation([page for page, _ in PAGES], position="hidden")
+for target, label in PAGES:
+    if label:
+        st.sidebar.page_link(target, label=label)
+
+# Timings for the opt-in debug panel / trace (see instrumentation.py)
+with instrumentation.page_run(page.title):
+    page.run()
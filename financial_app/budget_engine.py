@@ -0,0 +1,134 @@
+"""Budget vs actual, computed with one grouped pass over transactions.
+
+The notebook matched every budget to its transactions with a correlated
+`STRFTIME('%m', ...) = printf('%02d', b.month)` join, which is slow and
+silently left `actual_spent` empty wherever the text/integer year comparison
+failed. Here actual spend is summed once per (user, category, year, month)
+and merged onto the budgets, for one user or all users at once.
+
+The same code backs the budget_vs_actual.csv export (aggregates.py) and, on
+the files backend, the live figures on the dashboard and the Budget Analysis
+page. The sqlite backend reads vw_budget_vs_actual instead, whose actuals
+come from the trigger-maintained CategoryMonthlySpend.
+"""
+import numpy as np
+import pandas as pd
+
+from categories import CATEGORY_IDS
+from settings import BACKEND
+
+KEYS = ["user_id", "category_id", "year", "month"]
+
+EXPORT_COLUMNS = [
+    "user_id", "full_name", "category_name", "month", "year",
+    "budget_amount", "actual_spent", "utilization", "recommended_budget", "category_id",
+]
+
+# Recommendation rules from the notebook's budget optimization cell
+OVERSPEND_UTILIZATION = 120
+UNDERSPEND_UTILIZATION = 60
+OVERSPEND_FACTOR = 1.2
+UNDERSPEND_FACTOR = 0.85
+
+
+def monthly_actuals(transactions):
+    """Expense totals per (user, category, year, month) as positive amounts.
+
+    `transactions` needs user_id, category_id, amount and either
+    txn_year / txn_month or a transaction_date column.
+    """
+    expenses = transactions[transactions["amount"] < 0]
+    if "txn_year" in expenses:
+        year, month = expenses["txn_year"], expenses["txn_month"]
+    else:
+        dates = pd.to_datetime(expenses["transaction_date"])
+        year, month = dates.dt.year, dates.dt.month
+    grouped = (
+        (-expenses["amount"])
+        .groupby([expenses["user_id"], expenses["category_id"], year.rename("year"), month.rename("month")], sort=False)
+        .sum()
+    )
+    return grouped.rename("actual_spent").reset_index()
+
+
+def combine_actuals(partials):
+    """Sum monthly_actuals() results from several chunks of transactions."""
+    partials = [p for p in partials if len(p)]
+    if not partials:
+        return pd.DataFrame(columns=KEYS + ["actual_spent"])
+    return pd.concat(partials).groupby(KEYS, sort=False, as_index=False)["actual_spent"].sum()
+
+
+def budget_vs_actual(budgets, actuals):
+    """Budgets with actual_spent, utilization (%) and recommended_budget.
+
+    `budgets` needs user_id, year, month, budget_amount and category_id (or
+    category_name); other columns such as full_name are carried through.
+    Previously computed actual / utilization / recommendation columns are
+    replaced.
+    """
+    budgets = budgets.drop(columns=["actual_spent", "utilization", "recommended_budget"], errors="ignore")
+    if "category_id" not in budgets:
+        budgets = budgets.assign(category_id=budgets["category_name"].astype(str).map(CATEGORY_IDS))
+
+    key_types = {key: "int64" for key in KEYS}
+    merged = budgets.astype(key_types).merge(
+        actuals.astype(key_types), on=KEYS, how="left", sort=False,
+    )
+    spent = merged["actual_spent"].fillna(0).to_numpy()
+    budget = merged["budget_amount"].to_numpy(dtype="float64")
+    utilization = spent / budget * 100
+    merged["actual_spent"] = spent.round(2)
+    merged["utilization"] = utilization.round(2)
+    merged["recommended_budget"] = np.select(
+        [utilization > OVERSPEND_UTILIZATION, utilization < UNDERSPEND_UTILIZATION],
+        [budget * OVERSPEND_FACTOR, budget * UNDERSPEND_FACTOR],
+        budget,
+    )
+    return merged
+
+
+# --------------------------
+# Live, per user (dashboard pages)
+# --------------------------
+def user_budget(user_id):
+    """One user's budget vs actual from their current transactions.
+
+    On sqlite the budget rows already carry live actuals (O(months x
+    categories) per user); the CSV export's are recomputed from the user's
+    transactions, so older exports still reflect them.
+    """
+    from data_store import get_user_frame
+
+    budget = get_user_frame("budget", user_id)
+    if BACKEND == "sqlite":
+        return budget
+    transactions = get_user_frame("transactions", user_id)
+    return budget_vs_actual(budget, monthly_actuals(transactions))
+
+
+# --------------------------
+# All users (export)
+# --------------------------
+BUDGETS_SQL = """
+    SELECT b.user_id, u.full_name, c.category_name, b.category_id, b.month, b.year, b.budget_amount
+    FROM Budgets b
+    JOIN Users u ON u.user_id = b.user_id
+    JOIN Categories c ON c.category_id = b.category_id;
+"""
+
+EXPENSES_SQL = """
+    SELECT user_id, category_id, txn_year, txn_month, amount
+    FROM Transactions
+    WHERE amount < 0;
+"""
+
+
+def read_budget_vs_actual(conn, chunksize=500_000):
+    """Export-shaped budget vs actual for every user, streaming Transactions."""
+    actuals = combine_actuals(
+        monthly_actuals(chunk)
+        for chunk in pd.read_sql_query(EXPENSES_SQL, conn, chunksize=chunksize)
+    )
+    result = budget_vs_actual(pd.read_sql_query(BUDGETS_SQL, conn), actuals)
+    return result.sort_values(["user_id", "category_id", "year", "month"])[EXPORT_COLUMNS]
@@ -0,0 +1,27 @@
+"""The fixed Categories table, shared by the app and the data generator.
+
+index.ipynb seeds Categories with these rows and nothing adds to them, so
+modules that need a category's name, id or type (e.g. to label the
+category_id of a CSV export) read it from here rather than from the
+database or generate_data.py.
+"""
+# (category_id, category_name, category_type, is_recurring, description)
+CATEGORIES = [
+    (1,  "Salary",              "Income", 1, "Monthly salary payment"),
+    (2,  "Freelance Income",    "Income", 0, "Side jobs and gigs"),
+    (3,  "Rent",                "Expense", 1, "Monthly house rent"),
+    (4,  "Groceries",           "Expense", 1, "Supermarket and market shopping"),
+    (5,  "Transport",           "Expense", 1, "Matatu, boda, Uber, Bolt"),
+    (6,  "Utilities",           "Expense", 1, "Electricity, water, garbage"),
+    (7,  "Internet",            "Expense", 1, "Home WiFi and bundles"),
+    (8,  "Eating Out",          "Expense", 0, "Restaurants, cafes, fast food"),
+    (9,  "Entertainment",       "Expense", 0, "Movies, Netflix, outings"),
+    (10, "Healthcare",          "Expense", 0, "Hospital, pharmacy, NHIF"),
+    (11, "Education",           "Expense", 0, "School fees, courses"),
+    (12, "Airtime & Data",      "Expense", 1, "Phone airtime and data bundles"),
+    (13, "Savings Deposit",     "Expense", 1, "Money moved into savings"),
+    (14, "Loan Repayment",      "Expense", 1, "Loan and credit repayments")
+]
+
+CATEGORY_IDS = {name: cid for cid, name, _, _, _ in CATEGORIES}
+EXPENSE_CATEGORY_NAMES = {cid: name for cid, name, kind, _, _ in CATEGORIES if kind == "Expense"}
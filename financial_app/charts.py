@@ -0,0 +1,188 @@
+"""Memoized Plotly figures shared by the dashboard pages.
+
+Building a figure with plotly.express (and the pivot behind the utilization
+heatmap) is the slowest part of a rerun, yet most reruns are triggered by
+widgets that do not touch a given chart. Each builder below is wrapped with
+`memoized`, which keys the result on
+
+    (builder name, user_id, fingerprint of the input frame, extra args)
+
+and keeps it in one process-wide LRU of CHART_CACHE_SIZE entries. The
+fingerprint hashes the frame's values and labels, so a figure is reused only
+for the same data: re-exported CSVs, new transactions, a fresher snapshot or
+a filtered frame all build a new one. Hashing the small per-user frames a
+chart is drawn from costs far less than building the figure. Cached figures
+are shared between sessions and must not be mutated.
+
+plotly.express (about half a second to import) is only imported by the
+builders themselves, so code that needs just utilization_pivot
+(snapshots.py) starts without it.
+"""
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+from instrumentation import span
+from settings import CHART_CACHE_SIZE
+from timeseries import bound_frame
+
+
+class LRUCache:
+    """A thread-safe mapping that evicts the least recently used key."""
+
+    def __init__(self, max_entries=CHART_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        # Build outside the lock so one slow chart does not block other sessions
+        value = build()
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+@st.cache_resource(show_spinner=False)
+def chart_cache():
+    """The process-wide figure cache shared by every session."""
+    return LRUCache(CHART_CACHE_SIZE)
+
+
+def fingerprint(frame):
+    """Content hash of a chart's input frame: shape, labels and every value in order."""
+    # Digest of the ordered row hashes: the same rows in another order are a
+    # different line or timeline
+    rows = pd.util.hash_pandas_object(frame, index=True).to_numpy()
+    values = hashlib.blake2b(rows.tobytes(), digest_size=16).hexdigest()
+    return frame.shape, tuple(map(str, frame.columns)), values
+
+
+def memoized(build):
+    """Cache `build(frame, *args)` per (user_id, frame contents, args).
+
+    The wrapped function is called as `fn(user_id, frame, *args)`; `args`
+    must be hashable.
+    """
+    @functools.wraps(build)
+    def wrapper(user_id, frame, *args):
+        key = (build.__name__, int(user_id), fingerprint(frame), args)
+        # A cache hit shows up as a near-zero figure span
+        with span("figure", build.__name__):
+            return chart_cache().get_or_build(key, lambda: build(frame, *args))
+    return wrapper
+
+
+# --------------------------
+# Dashboard (pages/dashboard.py)
+# --------------------------
+@memoized
+def income_vs_expenses(monthly):
+    import plotly.express as px
+
+    return px.line(
+        bound_frame(monthly, "month", ["total_income", "total_expenses"]),
+        x="month",
+        y=["total_income", "total_expenses"],
+        markers=True,
+        labels={"value": "Amount", "month": "Month"},
+    )
+
+
+@memoized
+def spending_by_category(category):
+    import plotly.express as px
+
+    return px.bar(
+        category.sort_values("total_spent", ascending=True),
+        x="total_spent",
+        y="category_name",
+        orientation="h",
+        color="total_spent",
+        color_continuous_scale="Blues",
+    )
+
+
+@memoized
+def savings_progress(savings):
+    import plotly.express as px
+
+    return px.bar(
+        savings,
+        x="progress_ratio",
+        y="goal_name",
+        orientation="h",
+        color="progress_ratio",
+        color_continuous_scale="Viridis",
+        labels={"progress_ratio": "Progress (%)"},
+    )
+
+
+# --------------------------
+# Budget charts (dashboard.py, 03_Budget_Analysis.py)
+# --------------------------
+# Fed by budget_engine.user_budget: vw_budget_vs_actual on sqlite, actuals
+# recomputed from transactions on the files backend
+def utilization_pivot(budget):
+    """Category x month utilization, averaged across years."""
+    return budget.pivot_table(
+        index="category_name",
+        columns="month",
+        values="utilization",
+        observed=True,
+    )
+
+
+def heatmap_figure(pivot, y_label):
+    import plotly.express as px
+
+    return px.imshow(
+        pivot,
+        aspect="auto",
+        color_continuous_scale="RdYlGn_r",
+        labels=dict(x="Month", y=y_label, color="Utilization %"),
+    )
+
+
+@memoized
+def utilization_heatmap(budget, y_label="Category"):
+    # The pivot is only ever drawn, so it is cached as part of the figure
+    return heatmap_figure(utilization_pivot(budget), y_label)
+
+
+@memoized
+def pivot_heatmap(pivot, y_label="Category"):
+    """Same figure from a precomputed pivot (see snapshots.py)."""
+    return heatmap_figure(pivot, y_label)
+
+
+@memoized
+def budget_vs_actual(budget):
+    import plotly.express as px
+
+    return px.bar(
+        budget,
+        x="category_name",
+        y=["budget_amount", "actual_spent"],
+        barmode="group",
+        labels={"value": "Amount", "category_name": "Category"},
+        color_discrete_sequence=["#4C9AFF", "#FF4C4C"],
+    )
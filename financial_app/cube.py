@@ -0,0 +1,253 @@
+"""Cross-user spending cube for cohort comparisons.
+
+index.ipynb's org-wide queries (spending by category across all users, the
+month with the highest spending) scan every transaction. The Cohort Analysis
+page reads a precomputed cube instead: expense totals and transaction counts
+summed per (city, occupation, income band, category, month), the finest
+grain the page can ask for. Every roll-up or drill-down is then a groupby
+over those cells, never over Transactions:
+
+    cells = cube.load_cube().cells
+    cube.rollup(cells, ["city"], {"income_band": ["2.25M+"]})
+
+Users per (city, occupation, income band) are stored alongside, so totals
+can be compared per user. On the sqlite backend the cube is built from
+CategoryMonthlySpend (already summed per user, category and month by the
+migration 2 triggers) joined to Users; on the files backend from the
+transactions export joined to the users export.
+
+Both frames are memory-mapped Arrow files in CACHE_DIR tagged with the data
+version they were built from. A stale cube is rebuilt the first time it is
+used, so build it ahead of time after re-exporting or loading new data:
+
+    python cube.py
+"""
+import argparse
+import json
+import time
+import uuid
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+import streamlit as st
+
+import queries
+from data_store import ARROW_TYPES, dataset_version, read_dataset
+from categories import EXPENSE_CATEGORY_NAMES
+from settings import BACKEND, CACHE_DIR
+
+DIMENSIONS = ["city", "occupation", "income_band", "category_name", "month"]
+MEASURES = ["total_spent", "num_transactions"]
+
+# Lower bound of each annual income band; users earn 300k-3M
+INCOME_BANDS = [
+    (0, "Under 750k"),
+    (750_000, "750k-1.5M"),
+    (1_500_000, "1.5M-2.25M"),
+    (2_250_000, "2.25M+"),
+]
+BAND_LABELS = [label for _, label in INCOME_BANDS]
+
+# Everything the cube is derived from
+SOURCES = ("transactions", "users")
+
+CELLS_PATH = CACHE_DIR / "cube.arrow"
+COHORTS_PATH = CACHE_DIR / "cube_cohorts.arrow"
+VERSION_KEY = b"fms_cube_version"
+
+Cube = namedtuple("Cube", ["cells", "cohorts"])
+
+
+def data_version():
+    """Version string of the source data, stored with the cube."""
+    return json.dumps([dataset_version(name) for name in SOURCES])
+
+
+def income_band(annual_income):
+    """Ordered categorical band of each annual income."""
+    edges = [lower for lower, _ in INCOME_BANDS] + [np.inf]
+    return pd.cut(annual_income, edges, right=False, labels=BAND_LABELS)
+
+
+# --------------------------
+# Building
+# --------------------------
+SPEND_SQL = """
+    SELECT s.user_id, c.category_name, PRINTF('%04d-%02d', s.year, s.month) AS month,
+           s.total_spent, s.num_transactions
+    FROM CategoryMonthlySpend s
+    JOIN Categories c ON c.category_id = s.category_id
+    WHERE c.category_type = 'Expense';
+"""
+
+USERS_SQL = "SELECT user_id, city, occupation, annual_income FROM Users;"
+
+
+def frame_spend(transactions):
+    """Expense totals per (user, category, month) from a transactions frame."""
+    expenses = transactions[transactions["amount"] < 0]
+    return (
+        pd.DataFrame({
+            "user_id": expenses["user_id"].to_numpy(dtype="int64"),
+            "category_name": expenses["category_id"].map(EXPENSE_CATEGORY_NAMES).to_numpy(),
+            "month": pd.to_datetime(expenses["transaction_date"]).dt.strftime("%Y-%m").to_numpy(),
+            "spent": -expenses["amount"].to_numpy(dtype="float64"),
+        })
+        .groupby(["user_id", "category_name", "month"], sort=False, dropna=False)["spent"]
+        .agg(total_spent="sum", num_transactions="size")
+        .reset_index()
+    )
+
+
+def read_sources():
+    """(spend per user, category and month; one row of attributes per user)."""
+    if BACKEND == "sqlite":
+        return queries.read_sql(SPEND_SQL), queries.read_sql(USERS_SQL)
+    # Mapped afresh rather than through the process cache, so the cube is
+    # built from the files as they are now, never older than data_version()
+    users = read_dataset("users")[["user_id", "city", "occupation", "annual_income"]]
+    return frame_spend(read_dataset("transactions")), users
+
+
+def build_cube(spend, users):
+    """Sum per-user spend into cube cells and count users per cohort."""
+    users = pd.DataFrame({
+        "user_id": users["user_id"].to_numpy(dtype="int64"),
+        "city": users["city"].astype(str).to_numpy(),
+        "occupation": users["occupation"].astype(str).to_numpy(),
+        "income_band": income_band(users["annual_income"].astype("float64")).to_numpy(),
+    })
+    cohorts = (
+        users.groupby(["city", "occupation", "income_band"], observed=True)
+        .size()
+        .rename("users")
+        .reset_index()
+    )
+    cells = (
+        spend.merge(users, on="user_id")
+        .groupby(DIMENSIONS, observed=True)[MEASURES]
+        .sum()
+        .reset_index()
+    )
+    return Cube(compact(cells), compact(cohorts))
+
+
+def compact(frame):
+    """Dimensions as categoricals (dictionary-encoded in Arrow), bands kept in order."""
+    frame = frame.copy()
+    for column in frame.columns.intersection(DIMENSIONS):
+        if column == "income_band":
+            frame[column] = pd.Categorical(frame[column], categories=BAND_LABELS, ordered=True)
+        else:
+            frame[column] = frame[column].astype(str).astype("category")
+    if "num_transactions" in frame:
+        frame["num_transactions"] = frame["num_transactions"].astype("int64")
+    return frame
+
+
+# --------------------------
+# Storage
+# --------------------------
+def write_frame(frame, path, version):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, VERSION_KEY: version.encode()})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per writer, so processes rebuilding together never share a temp file
+    tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    feather.write_feather(table, tmp, compression="uncompressed", chunksize=max(len(frame), 1))
+    tmp.replace(path)
+
+
+def stored_version(path):
+    if not path.exists():
+        return None
+    metadata = ipc.open_file(pa.memory_map(str(path), "r")).schema.metadata or {}
+    value = metadata.get(VERSION_KEY)
+    return None if value is None else value.decode()
+
+
+def map_frame(path):
+    table = ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    return table.to_pandas(split_blocks=True, types_mapper=ARROW_TYPES.get)
+
+
+def precompute():
+    """Build the cube from the current data and write it; returns it."""
+    # Read the version first: data changing mid-build leaves the cube stale
+    version = data_version()
+    cube = build_cube(*read_sources())
+    write_frame(cube.cohorts, COHORTS_PATH, version)
+    write_frame(cube.cells, CELLS_PATH, version)
+    return cube
+
+
+# At most two data versions stay mapped; older cubes are released as data changes
+@st.cache_resource(max_entries=2, show_spinner=False)
+def read_cube(version):
+    """The mapped cube for `version`, rebuilt first if the files are older."""
+    if stored_version(CELLS_PATH) != version or stored_version(COHORTS_PATH) != version:
+        precompute()
+    return Cube(map_frame(CELLS_PATH), map_frame(COHORTS_PATH))
+
+
+def load_cube():
+    """The cube for the current data, shared by every session (read-only)."""
+    return read_cube(data_version())
+
+
+# --------------------------
+# Roll-up / drill-down
+# --------------------------
+def select(frame, filters=None):
+    """Rows whose dimensions are in `filters` ({dimension: values}; empty = all)."""
+    mask = np.ones(len(frame), dtype=bool)
+    for dimension, values in (filters or {}).items():
+        if values and dimension in frame:
+            mask &= frame[dimension].isin(values).to_numpy()
+    return frame[mask]
+
+
+def rollup(cells, by, filters=None):
+    """MEASURES summed over every dimension not in `by`."""
+    selected = select(cells, filters)
+    if not by:
+        return selected[MEASURES].sum().to_frame().T
+    return selected.groupby(by, observed=True)[MEASURES].sum().reset_index()
+
+
+def cohort_sizes(cohorts, by, filters=None):
+    """Users per value of `by` (city / occupation / income_band dimensions only)."""
+    selected = select(cohorts, filters)
+    if not by:
+        return pd.DataFrame({"users": [int(selected["users"].sum())]})
+    return selected.groupby(by, observed=True)["users"].sum().reset_index()
+
+
+def per_user(rolled, sizes):
+    """`rolled` with users and spend_per_user, joined on the cohort dimensions of `sizes`."""
+    keys = [column for column in sizes.columns if column != "users"]
+    merged = rolled.merge(sizes, on=keys) if keys else rolled.assign(users=sizes["users"].iloc[0])
+    return merged.assign(spend_per_user=merged["total_spent"] / merged["users"].where(merged["users"] > 0))
+
+
+# --------------------------
+# CLI
+# --------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    start = time.perf_counter()
+    cube = precompute()
+    print(
+        f"{len(cube.cells):,} cells, {len(cube.cohorts):,} cohorts ({BACKEND} backend) "
+        f"-> {CELLS_PATH} in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
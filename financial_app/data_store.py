@@ -0,0 +1,319 @@
+"""Shared data access layer for the dashboard pages.
+
+Every CSV export from index.ipynb is parsed once with explicit dtypes and
+written to a typed Arrow IPC (Feather) file in CACHE_DIR, already sorted by
+user and stored as a single record batch. Pages never hold their own copy:
+`load_dataset(name)` memory-maps that file and wraps the Arrow buffers in a
+DataFrame without copying, once per process and data version via
+`st.cache_resource`, so a re-export is picked up on the next call. Every
+session and every server process therefore reads the same page-cache pages,
+so RAM no longer grows with sessions x dataset size. The mapped columns are
+read-only.
+
+For per-user views, `get_user_frame(name, user_id)` slices that frame using
+a precomputed user -> row range table instead of a boolean scan of every
+row.
+
+With FMS_BACKEND=sqlite the same two calls are answered by parameterized
+queries against the live database instead (see queries.py).
+
+Run `python data_store.py` after re-exporting the CSVs to rebuild the
+columnar files ahead of time.
+"""
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+import streamlit as st
+
+import queries
+from instrumentation import span
+from settings import BACKEND, CACHE_DIR, DATA_DIR, DB_PATH
+
+# --------------------------
+# Dataset schemas
+# --------------------------
+# Money stays float64 so totals match the exports to the cent; ratios,
+# counters and ids are narrowed, repeated strings become categoricals.
+DATASETS = {
+    "monthly": {
+        "file": "monthly_summary.csv",
+        "dtypes": {
+            "user_id": "int32",
+            "full_name": "category",
+            "month": "category",
+            "total_expenses": "float64",
+            "total_income": "float64",
+        },
+        "dates": [],
+    },
+    "category": {
+        "file": "category_spending.csv",
+        "dtypes": {
+            "user_id": "int32",
+            "full_name": "category",
+            "category_name": "category",
+            "total_spent": "float64",
+        },
+        "dates": [],
+    },
+    "budget": {
+        "file": "budget_vs_actual.csv",
+        "dtypes": {
+            "user_id": "int32",
+            "full_name": "category",
+            "category_name": "category",
+            "month": "int8",
+            "year": "int16",
+            "budget_amount": "float64",
+            "actual_spent": "float64",
+            "utilization": "float32",
+            "recommended_budget": "float64",
+            "category_id": "int16",
+        },
+        "dates": [],
+    },
+    "savings": {
+        "file": "savings_progress.csv",
+        "dtypes": {
+            "goal_id": "int32",
+            "user_id": "int32",
+            "goal_name": "category",
+            "target_amount": "float64",
+            "current_amount": "float64",
+            "priority_level": "category",
+            "status": "category",
+            "annual_income": "float64",
+            "occupation": "category",
+            "city": "category",
+            "progress_ratio": "float32",
+            "total_days": "float32",
+            "days_passed": "float32",
+            "on_track": "int8",
+            "priority_encoded": "int8",
+            "status_encoded": "int8",
+            "occupation_encoded": "int8",
+            "city_encoded": "int8",
+        },
+        "dates": ["start_date", "target_date"],
+    },
+    "users": {
+        "file": "users.csv",
+        "dtypes": {
+            "user_id": "int32",
+            "full_name": "category",
+            "occupation": "category",
+            "annual_income": "float64",
+            "country": "category",
+            "city": "category",
+        },
+        "dates": [],
+    },
+    "transactions": {
+        "file": "transactions_full.csv",
+        "dtypes": {
+            "transaction_id": "int32",
+            "user_id": "int32",
+            "account_id": "int32",
+            "category_id": "int16",
+            "amount": "float64",
+            "transaction_time": "category",
+            "description": "category",
+            "payment_method": "category",
+            "merchant_name": "category",
+            "location_city": "category",
+            "location_country": "category",
+            "reference_number": "object",
+            "is_recurring": "int8",
+        },
+        "dates": ["transaction_date", "created_at"],
+        "partition_sort": ["transaction_date", "transaction_id"],
+    },
+}
+
+
+def csv_path(name):
+    return DATA_DIR / DATASETS[name]["file"]
+
+
+def columnar_path(name):
+    return CACHE_DIR / f"{name}.arrow"
+
+
+def read_csv_typed(name):
+    """Parse a CSV export with the dataset's declared dtypes."""
+    spec = DATASETS[name]
+    return pd.read_csv(
+        csv_path(name),
+        dtype=spec["dtypes"],
+        parse_dates=spec["dates"],
+    )
+
+
+# Schema metadata marking files written in the layout below; older cache
+# files without it are rebuilt
+LAYOUT_KEY = b"fms_layout"
+LAYOUT = b"user-sorted/single-batch"
+
+# Plain strings stay Arrow-backed instead of becoming Python objects
+ARROW_TYPES = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+
+
+def sort_keys(name):
+    return ["user_id", *DATASETS[name].get("partition_sort", ())]
+
+
+def build_columnar(name):
+    """(Re)write the Arrow IPC copy of one CSV export."""
+    df = read_csv_typed(name).sort_values(sort_keys(name), kind="stable")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, LAYOUT_KEY: LAYOUT})
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Unique per writer: processes cold-starting together each publish a
+    # complete file instead of racing on one temp path
+    target = columnar_path(name)
+    tmp = target.with_name(f"{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+    # One record batch, uncompressed: each column maps to a single contiguous
+    # buffer that pandas can wrap as-is
+    feather.write_feather(table, tmp, compression="uncompressed", chunksize=max(len(df), 1))
+    tmp.replace(target)
+
+
+def map_columnar(name):
+    """Zero-copy, read-only DataFrame over the memory-mapped Arrow file."""
+    table = ipc.open_file(pa.memory_map(str(columnar_path(name)), "r")).read_all()
+    return table.to_pandas(split_blocks=True, types_mapper=ARROW_TYPES.get)
+
+
+def is_stale(name):
+    target = columnar_path(name)
+    if not target.exists():
+        return True
+    source = csv_path(name)
+    if source.exists() and source.stat().st_mtime > target.stat().st_mtime:
+        return True
+    metadata = ipc.open_file(pa.memory_map(str(target), "r")).schema.metadata or {}
+    return metadata.get(LAYOUT_KEY) != LAYOUT
+
+
+def read_dataset(name):
+    """Map a dataset's columnar file, rebuilding it first if the CSV changed."""
+    if name not in DATASETS:
+        raise KeyError(f"Unknown dataset {name!r}; expected one of {sorted(DATASETS)}")
+    if is_stale(name):
+        build_columnar(name)
+    return map_columnar(name)
+
+
+# Keyed on the data version so a re-export is mapped afresh; the two newest
+# versions of each dataset stay mapped while older sessions finish
+@st.cache_resource(max_entries=2 * len(DATASETS), show_spinner=False)
+def mapped_dataset(name, version):
+    """The mapped frame of `name` at `version` (dataset_version)."""
+    return read_dataset(name)
+
+
+def load_dataset(name):
+    """The process-wide mapped frame shared by every session (read-only)."""
+    return mapped_dataset(name, dataset_version(name))
+
+
+# --------------------------
+# Per-user partitions
+# --------------------------
+class UserPartition:
+    """A dataset sorted by user_id plus a user_id -> (start, stop) offset table.
+
+    Slices handed out by `get` share memory with the partition, so callers
+    must treat them as read-only.
+    """
+
+    def __init__(self, frame, sort_by=(), presorted=False):
+        # Stable sort keeps each user's rows in their original export order
+        # unless the dataset asks for extra sort keys. Columnar files are
+        # written in this order already, so mapped frames skip the copy.
+        if not presorted:
+            keys = ["user_id", *sort_by]
+            frame = frame.sort_values(keys, kind="stable").reset_index(drop=True)
+        user_ids = frame["user_id"].to_numpy()
+        users, starts = np.unique(user_ids, return_index=True)
+        stops = np.append(starts[1:], len(user_ids))
+
+        self.frame = frame
+        self.users = users.tolist()
+        self.offsets = dict(zip(self.users, zip(starts.tolist(), stops.tolist())))
+        self.categorical = frame.select_dtypes("category").columns.tolist()
+        # user_id -> slice with trimmed categoricals; at most one copy of the
+        # category codes across all users, the other columns stay shared
+        self._slices = {}
+
+    def get(self, user_id):
+        user_id = int(user_id)
+        rows = self._slices.get(user_id)
+        if rows is None:
+            rows = self._slices.setdefault(user_id, self.slice(user_id))
+        # Shallow: a caller adding a column must not change the cached slice
+        return rows.copy(deep=False)
+
+    def slice(self, user_id):
+        start, stop = self.offsets.get(user_id, (0, 0))
+        rows = self.frame.iloc[start:stop].copy(deep=False)
+        # plotly.express builds one trace per category of a categorical
+        # column, so categories this user never uses must not be carried over
+        for column in self.categorical:
+            rows[column] = rows[column].cat.remove_unused_categories()
+        return rows
+
+
+def build_partition(name):
+    return UserPartition(read_dataset(name), DATASETS[name].get("partition_sort", ()), presorted=True)
+
+
+@st.cache_resource(max_entries=2 * len(DATASETS), show_spinner=False)
+def mapped_partition(name, version):
+    """User-partitioned view of the mapped frame of `name` at `version`."""
+    return UserPartition(mapped_dataset(name, version), DATASETS[name].get("partition_sort", ()), presorted=True)
+
+
+def load_partition(name):
+    """One shared, user-partitioned view of the mapped dataset per process."""
+    return mapped_partition(name, dataset_version(name))
+
+
+def dataset_version(name):
+    """Token that changes whenever the data behind `name` changes.
+
+    Files backend: the CSV export's mtime. sqlite backend: the database and
+    WAL mtimes, so any committed write bumps every dataset.
+    """
+    if BACKEND == "sqlite":
+        paths = [DB_PATH, DB_PATH.with_name(DB_PATH.name + "-wal")]
+    else:
+        paths = [csv_path(name)]
+    return tuple(path.stat().st_mtime_ns for path in paths if path.exists())
+
+
+def list_users(name):
+    """Sorted user ids present in a dataset."""
+    if BACKEND == "sqlite":
+        return queries.list_users(name)
+    return load_partition(name).users
+
+
+def get_user_frame(name, user_id):
+    """Rows of `name` belonging to `user_id` (read-only slice)."""
+    with span("load", name) as current:
+        if BACKEND == "sqlite":
+            return current.payload(queries.user_frame(name, user_id, dataset_version(name)))
+        return current.payload(load_partition(name).get(user_id))
+
+
+if __name__ == "__main__":
+    for dataset in DATASETS:
+        build_columnar(dataset)
+        frame = map_columnar(dataset)
+        size_mb = frame.memory_usage(deep=True).sum() / 1e6
+        print(f"{dataset:<13} {len(frame):>10,} rows  {size_mb:8.2f} MB  -> {columnar_path(dataset)}")
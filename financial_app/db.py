@@ -0,0 +1,73 @@
+"""SQLite connections for the dashboard.
+
+Pages never open the database themselves: they borrow a read-only connection
+from a small per-process pool so concurrent sessions reuse the same handles
+instead of reconnecting (and re-reading the schema) on every rerun. The pool
+is only created once the schema is up to date; migrations are applied at
+deploy time with `python migrations.py`, never by the dashboard.
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import streamlit as st
+
+import migrations
+from settings import DB_PATH, DB_POOL_SIZE
+
+
+def connect_read_only(path=DB_PATH):
+    """Open `path` read-only; writes fail at the SQLite level."""
+    conn = sqlite3.connect(
+        f"{path.resolve().as_uri()}?mode=ro",
+        uri=True,
+        check_same_thread=False,
+    )
+    conn.execute("PRAGMA query_only = ON;")
+    return conn
+
+
+class ConnectionPool:
+    """Hands out up to `size` read-only connections, blocking when all are busy."""
+
+    def __init__(self, path=DB_PATH, size=DB_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+        if can_open:
+            return connect_read_only(self.path)
+        return self._idle.get()
+
+
+@st.cache_resource(show_spinner=False)
+def get_pool():
+    """The process-wide pool shared by every session."""
+    if not DB_PATH.exists():
+        raise FileNotFoundError(f"SQLite database not found at {DB_PATH}")
+    conn = connect_read_only(DB_PATH)
+    try:
+        migrations.require_latest(conn, DB_PATH)
+    finally:
+        conn.close()
+    return ConnectionPool(DB_PATH, DB_POOL_SIZE)
@@ -0,0 +1,192 @@
+"""Streaming export of the Transactions Explorer's filtered rows.
+
+The explorer only ever holds one page of rows, and an export keeps it that
+way: a source's `chunks()` yields the matching rows EXPORT_CHUNK_ROWS at a
+time (fetchmany over one SQLite cursor, or slices of the per-user frame on
+the files backend) and each chunk is compressed and appended to the file
+before the next one is read.
+
+- csv:     gzip-compressed CSV, header written once
+- parquet: zstd-compressed Parquet, one row group per chunk
+
+Memory stays at about one chunk however many rows match. Files are written
+to EXPORT_DIR, named after the user, filters, format and data version, so
+preparing the same export twice reuses the first file. Exports unused for
+EXPORT_MAX_AGE (and never less than a session's lifetime) are removed when
+the next one is written. Session state only remembers the file's path: the
+page hands st.download_button an open handle on each rerun, and files larger
+than EXPORT_MAX_DOWNLOAD_BYTES are not offered in the app at all. The CLI
+writes those straight to any path:
+
+    python export.py 42 --format parquet --start 2025-01-01 --out user42.parquet
+"""
+import argparse
+import gzip
+import hashlib
+import os
+import shlex
+import time
+import uuid
+from collections import namedtuple
+from datetime import date
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from settings import BACKEND, CACHE_DIR
+
+EXPORT_CHUNK_ROWS = 50_000
+EXPORT_DIR = CACHE_DIR / "exports"
+# Seconds an export is kept for download
+EXPORT_MAX_AGE = 3600
+# Largest file offered by the explorer's download button; bigger exports
+# are pointed at the CLI
+EXPORT_MAX_DOWNLOAD_BYTES = 64 * 1024 * 1024
+
+
+# --------------------------
+# Writers
+# --------------------------
+def write_csv(chunks, path):
+    """Append each chunk to a gzip CSV; returns rows written."""
+    rows = 0
+    with gzip.open(path, "wt", encoding="utf-8", newline="", compresslevel=6) as handle:
+        for index, chunk in enumerate(chunks):
+            chunk.to_csv(handle, header=index == 0, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def write_parquet(chunks, path):
+    """Write each chunk as a zstd Parquet row group; returns rows written."""
+    rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+ExportFormat = namedtuple("ExportFormat", ["label", "suffix", "mime", "write"])
+
+FORMATS = {
+    "csv": ExportFormat("CSV (gzip)", ".csv.gz", "application/gzip", write_csv),
+    "parquet": ExportFormat("Parquet (zstd)", ".parquet", "application/vnd.apache.parquet", write_parquet),
+}
+
+
+def export(source, filters, fmt, path, size=EXPORT_CHUNK_ROWS):
+    """Stream the rows of `source` matching `filters` into `path`; returns rows written."""
+    path = Path(path)
+    # Unique per writer: two sessions may prepare the same export at once
+    tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        rows = FORMATS[fmt].write(source.chunks(filters, size), tmp)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    tmp.replace(path)
+    return rows
+
+
+# --------------------------
+# Explorer downloads
+# --------------------------
+def export_path(user_id, filters, fmt):
+    """Where the export of this query over the current data lives in EXPORT_DIR."""
+    from data_store import dataset_version
+
+    key = repr((BACKEND, user_id, tuple(filters), fmt, dataset_version("transactions")))
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return EXPORT_DIR / f"transactions-{user_id}-{digest}{FORMATS[fmt].suffix}"
+
+
+def prune(max_age=EXPORT_MAX_AGE):
+    """Remove exports (and abandoned partial files) unused for `max_age` seconds.
+
+    Never prunes files younger than a disconnected session's TTL, so a file
+    another session has just prepared is still there when it reads it.
+    """
+    import streamlit as st
+
+    if not EXPORT_DIR.exists():
+        return
+    cutoff = time.time() - max(max_age, st.get_option("server.disconnectedSessionTTL"))
+    for path in EXPORT_DIR.iterdir():
+        if path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+
+
+def prepare(source, filters, fmt):
+    """The export file for the explorer's current query, written if missing."""
+    path = export_path(source.user_id, filters, fmt)
+    try:
+        # Reused: restart its age so prune() keeps it while it is read
+        os.utime(path)
+    except FileNotFoundError:
+        prune()
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+        export(source, filters, fmt, path)
+    return path
+
+
+def cli_command(user_id, filters, fmt):
+    """The `python export.py` call writing this export outside the app.
+
+    Category and type filters have no CLI option and are left out.
+    """
+    args = ["python", "export.py", str(user_id), "--format", fmt]
+    if filters.start is not None:
+        args += ["--start", filters.start.isoformat()]
+    if filters.end is not None:
+        args += ["--end", filters.end.isoformat()]
+    if filters.search:
+        args += ["--search", filters.search]
+    # Shell-quoted: the search text is whatever the user typed
+    return shlex.join(args)
+
+
+# --------------------------
+# CLI
+# --------------------------
+def cli_source(user_id):
+    from transaction_sources import FrameSource, SqlSource
+
+    if BACKEND == "sqlite":
+        return SqlSource(user_id)
+    from data_store import get_user_frame
+
+    # Column names of the raw transactions export
+    return FrameSource(get_user_frame("transactions", user_id), "transaction_date", "category_id", None, "amount", user_id=user_id)
+
+
+def main():
+    from transaction_sources import TransactionFilter
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("user_id", type=int)
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("--start", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="last day (YYYY-MM-DD)")
+    parser.add_argument("--search", help="search box text")
+    parser.add_argument("--chunksize", type=int, default=EXPORT_CHUNK_ROWS, help="rows per chunk")
+    parser.add_argument("--out", type=Path, help="default: transactions-<user><suffix>")
+    args = parser.parse_args()
+
+    out = args.out or Path(f"transactions-{args.user_id}{FORMATS[args.format].suffix}")
+    filters = TransactionFilter(args.start, args.end, None, None, args.search)
+    start = time.perf_counter()
+    rows = export(cli_source(args.user_id), filters, args.format, out, args.chunksize)
+    print(f"{rows:,} rows -> {out} ({out.stat().st_size / 1024:,.0f} KB) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Monthly per-user ML features, read as contiguous NumPy arrays.
+
+The MonthlyFeatures table (migration 4 in migrations.py) keeps additive
+running totals per (user_id, year, month) and is updated by triggers as
+transactions are inserted, updated or deleted, so retraining never
+re-aggregates the Transactions history. `read_features(conn)` turns it into
+a FeatureMatrix: one C-contiguous float64 block of FEATURES, ordered by user
+then month, with parallel user_id and period arrays. The notebook's
+`next_month_expense` label and each user's latest row are derived from
+that ordering with array operations instead of a pandas groupby/shift.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+FEATURES = [
+    "total_income",
+    "total_expenses",
+    "num_transactions",
+    "avg_transaction_amount",
+    "recurring_ratio",
+]
+
+# period = year * 12 + month - 1, so consecutive months differ by one
+FeatureMatrix = namedtuple("FeatureMatrix", ["user_ids", "periods", "values"])
+
+FEATURES_SQL = """
+    SELECT
+        user_id,
+        year * 12 + month - 1,
+        total_income,
+        total_expenses,
+        num_transactions,
+        total_abs_amount / num_transactions,
+        num_recurring * 1.0 / num_transactions
+    FROM MonthlyFeatures
+    ORDER BY user_id, year, month;
+"""
+
+ROW_DTYPE = np.dtype([("user_id", "i8"), ("period", "i8")] + [(name, "f8") for name in FEATURES])
+
+
+def read_features(conn):
+    """Every user's feature rows straight from the cursor into arrays."""
+    rows = np.fromiter(conn.execute(FEATURES_SQL), dtype=ROW_DTYPE)
+    values = np.empty((len(rows), len(FEATURES)), dtype="float64")
+    for i, name in enumerate(FEATURES):
+        values[:, i] = rows[name]
+    return FeatureMatrix(rows["user_id"].copy(), rows["period"].copy(), values)
+
+
+def training_set(matrix):
+    """(X, y): each row labelled with the same user's next row's expenses."""
+    same_user = matrix.user_ids[1:] == matrix.user_ids[:-1]
+    X = matrix.values[:-1][same_user]
+    y = matrix.values[1:, FEATURES.index("total_expenses")][same_user]
+    return X, y
+
+
+def latest(matrix):
+    """Each user's most recent row: (user_ids, periods, X)."""
+    last = np.flatnonzero(np.append(matrix.user_ids[1:] != matrix.user_ids[:-1], True))
+    if not len(matrix.user_ids):
+        last = last[:0]
+    return matrix.user_ids[last], matrix.periods[last], matrix.values[last]
+
+
+def period_label(period):
+    """'YYYY-MM' for a period number."""
+    return f"{period // 12:04d}-{period % 12 + 1:02d}"
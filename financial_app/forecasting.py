@@ -0,0 +1,290 @@
+"""Next-month expense forecaster: training, batch scoring and cached lookups.
+
+index.ipynb fits LinearRegression and RandomForestRegressor models that
+predict a user's next-month expenses from that month's totals, transaction
+count, average transaction size and recurring ratio. Those features come
+from the incrementally maintained feature store (feature_store.py). This
+module turns the model into a serving path:
+
+    python forecasting.py train            # fit on the database, save a new model version
+    python forecasting.py score            # batch-score every user with the current model
+
+Models are pickled to MODEL_DIR under a content-hash version, and
+`current.json` points at the one in use. Scoring runs one vectorized
+`predict` over every user's latest month and stores the results in
+MODEL_DIR/predictions.db keyed by (model version, user, month). The
+dashboard only looks predictions up and never runs a model: a user the
+current model has not scored yet (no batch run since the last `train`)
+gets the latest prediction an earlier model stored, or a pending state,
+until the next `score` run.
+
+The random forest needs scikit-learn, imported only when a forest is built.
+Without it, training falls back to ordinary least squares, the notebook's
+LinearRegression.
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import pickle
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import feature_store
+import migrations
+from db import ConnectionPool
+from feature_store import FEATURES
+from settings import DB_PATH, DB_POOL_SIZE, MODEL_DIR
+
+CURRENT_MODEL = MODEL_DIR / "current.json"
+PREDICTIONS_PATH = MODEL_DIR / "predictions.db"
+
+
+def next_month(month):
+    """'YYYY-MM' of the month after `month`."""
+    return (pd.Period(month, freq="M") + 1).strftime("%Y-%m")
+
+
+# --------------------------
+# Models
+# --------------------------
+class LinearModel:
+    """Ordinary least squares, used when scikit-learn is not installed."""
+
+    def fit(self, X, y):
+        design = np.column_stack([X, np.ones(len(X))])
+        solution, *_ = np.linalg.lstsq(design, y, rcond=None)
+        self.coef_, self.intercept_ = solution[:-1], solution[-1]
+        return self
+
+    def predict(self, X):
+        return np.asarray(X, dtype="float64") @ self.coef_ + self.intercept_
+
+
+def forest_available():
+    """Whether scikit-learn is installed, without importing it."""
+    return importlib.util.find_spec("sklearn") is not None
+
+
+def make_model(kind):
+    if kind == "forest":
+        try:
+            from sklearn.ensemble import RandomForestRegressor
+        except ImportError:  # optional dependency
+            raise RuntimeError("The random forest model needs scikit-learn (pip install scikit-learn)") from None
+        return RandomForestRegressor(n_estimators=200, random_state=42, n_jobs=-1)
+    return LinearModel()
+
+
+def holdout_metrics(model, X, y):
+    predicted = model.predict(X)
+    errors = predicted - y
+    return {
+        "mae": float(np.abs(errors).mean()),
+        "rmse": float(np.sqrt((errors ** 2).mean())),
+        "r2": float(1 - (errors ** 2).sum() / ((y - y.mean()) ** 2).sum()),
+    }
+
+
+def train(matrix, kind=None, test_size=0.2, seed=42):
+    """Fit a model on a FeatureMatrix's labelled rows; returns (model, metadata)."""
+    kind = kind or ("forest" if forest_available() else "linear")
+    X, y = feature_store.training_set(matrix)
+
+    # Same 80/20 random split as the notebook, then refit on everything
+    order = np.random.default_rng(seed).permutation(len(X))
+    n_test = int(len(X) * test_size)
+    test, fit = order[:n_test], order[n_test:]
+    metrics = holdout_metrics(make_model(kind).fit(X[fit], y[fit]), X[test], y[test])
+    model = make_model(kind).fit(X, y)
+
+    metadata = {
+        "kind": kind,
+        "features": FEATURES,
+        "rows": len(X),
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "holdout": metrics,
+    }
+    return model, metadata
+
+
+# --------------------------
+# Persistence
+# --------------------------
+def model_path(version):
+    return MODEL_DIR / f"expense_forecaster-{version}.pkl"
+
+
+def save_model(model, metadata):
+    """Pickle `model` under its content hash and make it current; returns the version."""
+    payload = pickle.dumps(model)
+    version = hashlib.sha256(payload).hexdigest()[:12]
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    model_path(version).write_bytes(payload)
+    tmp = CURRENT_MODEL.with_suffix(".tmp")
+    tmp.write_text(json.dumps({**metadata, "version": version}, indent=2))
+    tmp.replace(CURRENT_MODEL)
+    return version
+
+
+def current_version():
+    """Version of the model in use, or None before the first training run."""
+    if not CURRENT_MODEL.exists():
+        return None
+    return json.loads(CURRENT_MODEL.read_text())["version"]
+
+
+@st.cache_resource(show_spinner=False)
+def load_model(version):
+    """The unpickled model for `version`, once per process."""
+    return pickle.loads(model_path(version).read_bytes())
+
+
+# --------------------------
+# Prediction cache
+# --------------------------
+PREDICTIONS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS predictions (
+        model_version     TEXT NOT NULL,
+        user_id           INTEGER NOT NULL,
+        month             TEXT NOT NULL,
+        predicted_expense REAL NOT NULL,
+        based_on          TEXT NOT NULL,
+        scored_at         TEXT NOT NULL,
+        PRIMARY KEY (model_version, user_id, month)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_predictions_user_month ON predictions (user_id, month);
+"""
+
+
+def score(model, matrix):
+    """Next-month predictions for every user in `matrix` in one predict call."""
+    user_ids, periods, X = feature_store.latest(matrix)
+    predicted = model.predict(X)
+    return pd.DataFrame({
+        "user_id": user_ids,
+        "month": [feature_store.period_label(period + 1) for period in periods],
+        "predicted_expense": np.maximum(predicted, 0).round(2),
+        "based_on": [feature_store.period_label(period) for period in periods],
+    })
+
+
+def write_predictions(version, predictions, path=PREDICTIONS_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    scored_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(PREDICTIONS_SCHEMA)
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO predictions "
+                "(model_version, user_id, month, predicted_expense, based_on, scored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?);",
+                [
+                    (version, int(row.user_id), row.month, float(row.predicted_expense), row.based_on, scored_at)
+                    for row in predictions.itertuples(index=False)
+                ],
+            )
+    finally:
+        conn.close()
+    return len(predictions)
+
+
+# --------------------------
+# Dashboard lookup
+# --------------------------
+@st.cache_resource(show_spinner=False)
+def predictions_pool():
+    """Read-only connections to the prediction cache (retried until it exists)."""
+    if not PREDICTIONS_PATH.exists():
+        raise FileNotFoundError(f"No prediction cache at {PREDICTIONS_PATH}")
+    return ConnectionPool(PREDICTIONS_PATH, DB_POOL_SIZE)
+
+
+def stored_prediction(version, user_id, month):
+    """(predicted_expense, model_version) for the user's month, or None if never scored.
+
+    Prefers `version`'s score; otherwise the latest one an earlier model stored.
+    """
+    try:
+        with predictions_pool().connection() as conn:
+            return conn.execute(
+                "SELECT predicted_expense, model_version FROM predictions "
+                "WHERE user_id = ? AND month = ? "
+                "ORDER BY model_version = ? DESC, scored_at DESC LIMIT 1;",
+                (int(user_id), month, version),
+            ).fetchone()
+    except (FileNotFoundError, sqlite3.OperationalError):
+        return None
+
+
+def user_forecast(user_id):
+    """The user's next-month forecast from the batch-scored predictions.
+
+    None without a trained model. Otherwise {"month", "predicted_expense",
+    "pending"}: `pending` is True until `python forecasting.py score` has
+    scored the user with the current model, and `predicted_expense` is then
+    an earlier model's prediction or None.
+    """
+    from data_store import get_user_frame
+
+    version = current_version()
+    monthly = get_user_frame("monthly", user_id)
+    if version is None or monthly.empty:
+        return None
+    month = next_month(monthly["month"].astype(str).max())
+
+    stored = stored_prediction(version, user_id, month)
+    if stored is None:
+        return {"month": month, "predicted_expense": None, "pending": True}
+    predicted, scored_by = stored
+    return {"month": month, "predicted_expense": predicted, "pending": scored_by != version}
+
+
+# --------------------------
+# CLI
+# --------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["train", "score"])
+    parser.add_argument("--db", type=Path, default=DB_PATH, help=f"SQLite database (default {DB_PATH})")
+    parser.add_argument("--model", choices=["forest", "linear"], help="default: forest if scikit-learn is installed")
+    args = parser.parse_args()
+    if args.model == "forest" and not forest_available():
+        parser.error("--model forest needs scikit-learn (pip install scikit-learn)")
+
+    migrations.migrate(args.db)
+    conn = sqlite3.connect(args.db)
+    try:
+        matrix = feature_store.read_features(conn)
+    finally:
+        conn.close()
+
+    if args.command == "train":
+        model, metadata = train(matrix, args.model)
+        version = save_model(model, metadata)
+        holdout = metadata["holdout"]
+        print(
+            f"{metadata['kind']} model {version} on {metadata['rows']:,} rows: "
+            f"MAE {holdout['mae']:,.0f}  RMSE {holdout['rmse']:,.0f}  R² {holdout['r2']:.3f}"
+        )
+        return
+
+    version = current_version()
+    if version is None:
+        parser.error("no trained model yet; run `python forecasting.py train` first")
+    written = write_predictions(version, score(load_model(version), matrix))
+    print(f"{written:,} predictions from model {version} -> {PREDICTIONS_PATH}")
+
+
+if __name__ == "__main__":
+    # Go through the importable module so pickles reference
+    # forecasting.LinearModel rather than __main__.LinearModel
+    import forecasting
+
+    forecasting.main()
@@ -0,0 +1,519 @@
+"""Vectorized synthetic data generator (the index.ipynb generator at scale).
+
+Produces the notebook's six tables with the same lookup lists and
+distributions, but samples whole columns at once with NumPy instead of
+calling `random` per field. Users are processed in chunks so memory stays
+bounded, and each chunk is written either
+
+- to SQLite with one `executemany` per table inside a single transaction
+  (WAL + synchronous=OFF while loading, back to a rollback journal after),
+- or to one Parquet file per table, one row group per chunk.
+
+Output is deterministic for a given --seed and --chunk-users. Unlike the
+notebook, user ids are not limited to 1000-4999 and emails end in the user
+id so they stay unique with any number of users.
+
+    python generate_data.py --transactions 10m --db /tmp/fms_10m.db
+    python generate_data.py --transactions 1m --parquet /tmp/fms_parquet
+    python generate_data.py --transactions 50000 --users 200 --db /tmp/small.db --force
+"""
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+
+from categories import CATEGORIES
+
+# --------------------------
+# Schema (index.ipynb, cell 3)
+# --------------------------
+SCHEMA = """
+CREATE TABLE Users (
+    user_id INTEGER PRIMARY KEY,
+    full_name TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    date_of_birth TEXT,
+    gender TEXT,
+    occupation TEXT,
+    annual_income REAL,
+    registration_date TEXT,
+    country TEXT,
+    city TEXT
+);
+CREATE TABLE Accounts (
+    account_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    account_name TEXT NOT NULL,
+    account_type TEXT NOT NULL,
+    bank_name TEXT,
+    currency TEXT,
+    opened_date TEXT,
+    status TEXT,
+    current_balance REAL DEFAULT 0,
+    FOREIGN KEY(user_id) REFERENCES Users(user_id)
+);
+CREATE TABLE Categories (
+    category_id INTEGER PRIMARY KEY,
+    category_name TEXT NOT NULL,
+    category_type TEXT CHECK(category_type IN ('Income', 'Expense')) NOT NULL,
+    is_recurring INTEGER DEFAULT 0,
+    description TEXT,
+    created_at TEXT
+);
+CREATE TABLE Transactions (
+    transaction_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    account_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    amount REAL NOT NULL,
+    transaction_date TEXT NOT NULL,
+    transaction_time TEXT,
+    description TEXT,
+    payment_method TEXT,
+    merchant_name TEXT,
+    location_city TEXT,
+    location_country TEXT,
+    reference_number TEXT,
+    is_recurring INTEGER DEFAULT 0,
+    created_at TEXT,
+    FOREIGN KEY(user_id) REFERENCES Users(user_id),
+    FOREIGN KEY(account_id) REFERENCES Accounts(account_id),
+    FOREIGN KEY(category_id) REFERENCES Categories(category_id)
+);
+CREATE TABLE Budgets (
+    budget_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    budget_amount REAL NOT NULL,
+    created_at TEXT,
+    updated_at TEXT,
+    notes TEXT,
+    FOREIGN KEY(user_id) REFERENCES Users(user_id),
+    FOREIGN KEY(category_id) REFERENCES Categories(category_id)
+);
+CREATE TABLE SavingsGoals (
+    goal_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    goal_name TEXT NOT NULL,
+    target_amount REAL NOT NULL,
+    current_amount REAL DEFAULT 0,
+    start_date TEXT,
+    target_date TEXT,
+    priority_level TEXT,
+    status TEXT,
+    notes TEXT,
+    FOREIGN KEY(user_id) REFERENCES Users(user_id)
+);
+"""
+
+# Column order of every table, as inserted
+COLUMNS = {
+    "Users": [
+        "user_id", "full_name", "email", "date_of_birth", "gender",
+        "occupation", "annual_income", "registration_date", "country", "city",
+    ],
+    "Accounts": [
+        "account_id", "user_id", "account_name", "account_type", "bank_name",
+        "currency", "opened_date", "status", "current_balance",
+    ],
+    "Categories": [
+        "category_id", "category_name", "category_type", "is_recurring", "description", "created_at",
+    ],
+    "SavingsGoals": [
+        "goal_id", "user_id", "goal_name", "target_amount", "current_amount",
+        "start_date", "target_date", "priority_level", "status", "notes",
+    ],
+    "Budgets": [
+        "budget_id", "user_id", "category_id", "month", "year",
+        "budget_amount", "created_at", "updated_at", "notes",
+    ],
+    "Transactions": [
+        "transaction_id", "user_id", "account_id", "category_id", "amount",
+        "transaction_date", "transaction_time", "description",
+        "payment_method", "merchant_name", "location_city", "location_country",
+        "reference_number", "is_recurring", "created_at",
+    ],
+}
+
+# --------------------------
+# Lookup lists (index.ipynb, cell 5)
+# --------------------------
+first_names_female = [
+    "Aisha", "Mwende", "Wanja", "Faith", "Naomi", "Linet", "Joy", "Brenda",
+    "Mary", "Grace", "Cynthia", "Terry", "Mercy", "Ruth", "Ann", "Jane"
+]
+first_names_male = [
+    "Brian", "Kevin", "John", "Peter", "Michael", "Daniel", "Sammy", "Collins",
+    "George", "Allan", "Steve", "James", "Ian", "Eric", "David", "Tom"
+]
+surnames = [
+    "Kamau", "Otieno", "Mutiso", "Njoroge", "Wafula", "Ouma", "Kariuki",
+    "Kilonzo", "Chebet", "Mwangi", "Ochieng", "Mutua", "Obiero", "Koech"
+]
+kenyan_cities = [
+    "Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret", "Thika", "Machakos",
+    "Naivasha", "Nyeri", "Meru", "Kakamega", "Kitale", "Kiambu", "Ruiru"
+]
+occupations = [
+    "Software Developer", "Teacher", "Nurse", "Accountant", "Data Analyst",
+    "Sales Representative", "Customer Support", "Civil Engineer",
+    "Student", "Entrepreneur", "Graphic Designer", "HR Officer"
+]
+banks = [
+    "Equity Bank", "KCB", "Co-operative Bank", "Absa Kenya",
+    "Standard Chartered", "NCBA", "Family Bank"
+]
+mobile_money = ["M-Pesa"]
+merchants = [
+    "Naivas", "Quickmart", "Carrefour", "Uber", "Bolt", "Shell Petrol Station",
+    "TotalEnergies", "Jumia", "Gikomba Market", "Chicken Inn",
+    "Java House", "KFC", "Huduma Centre", "Nairobi Hospital",
+    "Equity ATM", "KCB ATM", "M-Pesa Agent"
+]
+payment_methods = ["mobile_money", "card", "cash", "bank_transfer"]
+savings_goal_names = [
+    "Emergency Fund", "New Phone", "Rent Deposit", "Business Capital",
+    "School Fees", "Travel Fund", "Car Purchase", "House Renovation"
+]
+recurring_category_ids = [3, 4, 5, 6, 7, 12, 13, 14]
+
+# 12 salaries + randint(20, 50) extra transactions per user in the notebook
+SALARIES_PER_USER = 12
+EXTRA_PER_USER = (20, 50)
+TRANSACTIONS_PER_USER = SALARIES_PER_USER + sum(EXTRA_PER_USER) / 2
+
+# First id of each table, as in the notebook
+FIRST_IDS = {"Accounts": 2000, "SavingsGoals": 3000, "Budgets": 4000, "Transactions": 5000}
+
+# --------------------------
+# Vectorized helpers
+# --------------------------
+# Every date the generator can produce, as ISO strings, so a column of day
+# offsets becomes a column of dates with one fancy-index.
+DATE_BASE = np.datetime64("2018-01-01")
+DATES = np.datetime_as_string(np.arange(DATE_BASE, np.datetime64("2027-01-01")), unit="D").astype(object)
+
+# Every "HH:MM:SS" between 06:00:00 and 22:59:59 (notebook's random_time)
+TIMES = np.array(
+    [f"{h:02d}:{m:02d}:{s:02d}" for h in range(6, 23) for m in range(60) for s in range(60)],
+    dtype=object,
+)
+
+CATEGORY_IDS = np.array([c[0] for c in CATEGORIES])
+CATEGORY_NAMES = np.array([c[1] for c in CATEGORIES], dtype=object)
+CATEGORY_IS_INCOME = np.array([c[2] == "Income" for c in CATEGORIES])
+EXPENSE_CATEGORY_IDS = CATEGORY_IDS[~CATEGORY_IS_INCOME]
+CATEGORY_RECURRING = np.isin(CATEGORY_IDS, recurring_category_ids)
+
+
+def day(value):
+    """Offset of an ISO date into DATES."""
+    return int((np.datetime64(value) - DATE_BASE).astype(int))
+
+
+def random_dates(rng, start, end, size):
+    """Vectorized random_date(start, end) -> ISO strings."""
+    return DATES[rng.integers(day(start), day(end) + 1, size)]
+
+
+def pick(rng, options, size):
+    """Vectorized random.choice(options)."""
+    return np.asarray(options, dtype=object)[rng.integers(0, len(options), size)]
+
+
+def numbered(prefix, numbers):
+    return np.char.add(prefix, numbers.astype("U6")).astype(object)
+
+
+# --------------------------
+# One chunk of users -> rows of every table
+# --------------------------
+def users_chunk(rng, user_ids):
+    n = len(user_ids)
+    female = rng.integers(0, 2, n) == 0
+    first = np.where(female, pick(rng, first_names_female, n), pick(rng, first_names_male, n))
+    surname = pick(rng, surnames, n)
+    dob_year = rng.integers(1975, 2006, n)
+    dob_month = rng.integers(1, 13, n)
+    dob_day = rng.integers(1, 29, n)
+    dob = (
+        (dob_year - 1970).astype("datetime64[Y]")
+        + (dob_month - 1).astype("timedelta64[M]")
+    ).astype("datetime64[D]") + (dob_day - 1).astype("timedelta64[D]")
+    lower = np.vectorize(str.lower, otypes=[object])
+    return {
+        "user_id": user_ids,
+        "full_name": first + " " + surname,
+        "email": lower(first) + "." + lower(surname) + user_ids.astype(str).astype(object) + "@example.com",
+        "date_of_birth": np.datetime_as_string(dob, unit="D").astype(object),
+        "gender": np.where(female, "Female", "Male").astype(object),
+        "occupation": pick(rng, occupations, n),
+        "annual_income": rng.integers(300_000, 3_000_001, n).astype("float64"),
+        "registration_date": random_dates(rng, "2024-01-01", "2025-01-31", n),
+        "country": np.full(n, "Kenya", dtype=object),
+        "city": pick(rng, kenyan_cities, n),
+    }
+
+
+def accounts_chunk(rng, user_ids, first_id):
+    per_user = rng.integers(2, 5, len(user_ids))
+    owner = np.repeat(user_ids, per_user)
+    n = len(owner)
+    # First account of each user is the main one
+    is_main = np.zeros(n, dtype=bool)
+    is_main[np.cumsum(per_user) - per_user] = True
+    statuses = ["active"] * 8 + ["dormant", "active"]
+    accounts = {
+        "account_id": np.arange(first_id, first_id + n),
+        "user_id": owner,
+        "account_name": np.where(
+            is_main, "Main Account", pick(rng, ["Savings Account", "Mobile Money", "Emergency Fund"], n)
+        ).astype(object),
+        "account_type": np.where(
+            is_main, pick(rng, ["checking", "salary"], n), pick(rng, ["savings", "mobile_money"], n)
+        ).astype(object),
+        "bank_name": pick(rng, banks + mobile_money, n),
+        "currency": np.full(n, "KES", dtype=object),
+        "opened_date": random_dates(rng, "2018-01-01", "2024-12-31", n),
+        "status": pick(rng, statuses, n),
+        "current_balance": np.round(rng.uniform(5_000, 300_000, n), 2),
+    }
+    return accounts, per_user
+
+
+def goals_chunk(rng, user_ids, annual_income, first_id):
+    per_user = rng.integers(1, 4, len(user_ids))
+    n = int(per_user.sum())
+    income = np.repeat(annual_income, per_user)
+    target = np.round(rng.uniform(0.1, 0.6, n) * (income / 3), 2)
+    return {
+        "goal_id": np.arange(first_id, first_id + n),
+        "user_id": np.repeat(user_ids, per_user),
+        "goal_name": pick(rng, savings_goal_names, n),
+        "target_amount": target,
+        "current_amount": np.round(target * rng.uniform(0.0, 0.8, n), 2),
+        "start_date": random_dates(rng, "2024-01-01", "2025-03-31", n),
+        "target_date": random_dates(rng, "2025-04-01", "2026-12-31", n),
+        "priority_level": pick(rng, ["High", "Medium", "Low"], n),
+        "status": pick(rng, ["active"] * 5 + ["paused", "completed"], n),
+        "notes": np.full(n, "", dtype=object),
+    }
+
+
+def budgets_chunk(rng, user_ids, monthly_income, first_id, year=2025):
+    per_user = 12 * len(EXPENSE_CATEGORY_IDS)
+    n = len(user_ids) * per_user
+    month = np.tile(np.repeat(np.arange(1, 13), len(EXPENSE_CATEGORY_IDS)), len(user_ids))
+    month_text = np.array([f"{year}-{m:02d}" for m in range(1, 13)], dtype=object)[month - 1]
+    return {
+        "budget_id": np.arange(first_id, first_id + n),
+        "user_id": np.repeat(user_ids, per_user),
+        "category_id": np.tile(EXPENSE_CATEGORY_IDS, 12 * len(user_ids)),
+        "month": month,
+        "year": np.full(n, year),
+        "budget_amount": np.round(np.repeat(monthly_income, per_user) * rng.uniform(0.02, 0.25, n), 2),
+        "created_at": month_text + "-01",
+        "updated_at": month_text + "-15",
+        "notes": np.full(n, "", dtype=object),
+    }
+
+
+def transactions_chunk(rng, user_ids, monthly_income, accounts_per_user, first_account, extra_range, first_id):
+    extra = rng.integers(extra_range[0], extra_range[1] + 1, len(user_ids))
+    per_user = SALARIES_PER_USER + extra
+    n = int(per_user.sum())
+    owner = np.repeat(np.arange(len(user_ids)), per_user)
+    # Position within the user's block: the first 12 are the monthly salaries
+    position = np.arange(n) - np.repeat(np.cumsum(per_user) - per_user, per_user)
+    salary = position < SALARIES_PER_USER
+    income = monthly_income[owner]
+
+    category = rng.integers(0, len(CATEGORIES), n)
+    category[salary] = 0
+    is_income = CATEGORY_IS_INCOME[category]
+    amount = np.where(
+        salary,
+        rng.uniform(0.9, 1.1, n) * income,
+        np.where(is_income, rng.uniform(0.05, 0.4, n) * income, -rng.uniform(200, 20_000, n)),
+    )
+
+    # Salaries land on the 1st-5th of their month, everything else anywhere in 2025
+    month_start = np.array([day(f"2025-{m:02d}-01") for m in range(1, 13)])
+    salary_day = month_start[np.minimum(position, 11)] + rng.integers(0, 5, n)
+    dates = DATES[np.where(salary, salary_day, rng.integers(day("2025-01-01"), day("2025-12-31") + 1, n))]
+
+    account_offset = np.repeat(np.cumsum(accounts_per_user) - accounts_per_user, per_user)
+    account = first_account + account_offset + rng.integers(0, np.repeat(accounts_per_user, per_user))
+
+    return {
+        "transaction_id": np.arange(first_id, first_id + n),
+        "user_id": user_ids[owner],
+        "account_id": account,
+        "category_id": CATEGORY_IDS[category],
+        "amount": np.round(amount, 2),
+        "transaction_date": dates,
+        "transaction_time": TIMES[rng.integers(0, len(TIMES), n)],
+        "description": np.where(salary, "Monthly salary", CATEGORY_NAMES[category]).astype(object),
+        "payment_method": np.where(
+            salary, pick(rng, ["bank_transfer", "mobile_money"], n), pick(rng, payment_methods, n)
+        ).astype(object),
+        "merchant_name": np.where(
+            salary, pick(rng, ["Employer Ltd", "HR Payroll"], n), pick(rng, merchants, n)
+        ).astype(object),
+        "location_city": pick(rng, kenyan_cities, n),
+        "location_country": np.full(n, "Kenya", dtype=object),
+        "reference_number": np.where(
+            salary,
+            numbered("PAY", rng.integers(100000, 1000000, n)),
+            numbered("TX", rng.integers(100000, 1000000, n)),
+        ).astype(object),
+        "is_recurring": (salary | CATEGORY_RECURRING[category]).astype(np.int64),
+        "created_at": dates,
+    }
+
+
+def generate(n_transactions, n_users=None, seed=42, chunk_users=20_000):
+    """Yield {table: {column: array}} one chunk of users at a time."""
+    rng = np.random.default_rng(seed)
+    n_users = n_users or max(80, round(n_transactions / TRANSACTIONS_PER_USER))
+    # Scale the 20-50 extra transactions so the total lands near the target
+    scale = max(n_transactions / n_users - SALARIES_PER_USER, 0) / (sum(EXTRA_PER_USER) / 2)
+    extra_range = (round(EXTRA_PER_USER[0] * scale), round(EXTRA_PER_USER[1] * scale))
+
+    yield {"Categories": {
+        name: np.array(values, dtype=object)
+        for name, values in zip(COLUMNS["Categories"], zip(*[(*c, "2025-01-01") for c in CATEGORIES]))
+    }}
+
+    user_ids = rng.choice(np.arange(1000, 1000 + max(4000, n_users * 50)), n_users, replace=False)
+    next_id = dict(FIRST_IDS)
+    for start in range(0, n_users, chunk_users):
+        ids = user_ids[start:start + chunk_users]
+        users = users_chunk(rng, ids)
+        monthly_income = users["annual_income"] / 12
+        accounts, accounts_per_user = accounts_chunk(rng, ids, next_id["Accounts"])
+        chunk = {
+            "Users": users,
+            "Accounts": accounts,
+            "SavingsGoals": goals_chunk(rng, ids, users["annual_income"], next_id["SavingsGoals"]),
+            "Budgets": budgets_chunk(rng, ids, monthly_income, next_id["Budgets"]),
+            "Transactions": transactions_chunk(
+                rng, ids, monthly_income, accounts_per_user, next_id["Accounts"],
+                extra_range, next_id["Transactions"],
+            ),
+        }
+        for table in next_id:
+            next_id[table] += len(chunk[table][COLUMNS[table][0]])
+        yield chunk
+
+
+# --------------------------
+# Writers
+# --------------------------
+class SqliteWriter:
+    """Bulk-load chunks into a fresh database file."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        # Loading a throwaway file: skip fsyncs, restore a plain journal at the end
+        self.conn.execute("PRAGMA journal_mode = WAL;")
+        self.conn.execute("PRAGMA synchronous = OFF;")
+        self.conn.executescript(SCHEMA)
+
+    def write(self, chunk):
+        self.conn.execute("BEGIN;")
+        for table, columns in chunk.items():
+            names = COLUMNS[table]
+            rows = zip(*(columns[name].tolist() for name in names))
+            self.conn.executemany(
+                f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                rows,
+            )
+        self.conn.execute("COMMIT;")
+
+    def close(self):
+        self.conn.execute("PRAGMA journal_mode = DELETE;")
+        self.conn.close()
+
+
+class ParquetWriter:
+    """One Parquet file per table in `out_dir`, one row group per chunk."""
+
+    def __init__(self, out_dir):
+        import pyarrow  # noqa: F401 - fail before generating anything
+
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.writers = {}
+
+    def write(self, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        for table, columns in chunk.items():
+            batch = pa.table({name: columns[name] for name in COLUMNS[table]})
+            if table not in self.writers:
+                self.writers[table] = pq.ParquetWriter(self.out_dir / f"{table}.parquet", batch.schema)
+            self.writers[table].write_table(batch)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+
+
+def write_all(writer, chunks):
+    """Drain `chunks` into `writer`; returns rows written per table."""
+    counts = {}
+    try:
+        for chunk in chunks:
+            writer.write(chunk)
+            for table, columns in chunk.items():
+                counts[table] = counts.get(table, 0) + len(columns[COLUMNS[table][0]])
+    finally:
+        writer.close()
+    return counts
+
+
+def parse_count(value):
+    """'10k', '1m', '2_500_000' -> int."""
+    value = value.lower().replace("_", "")
+    for suffix, factor in (("k", 1_000), ("m", 1_000_000)):
+        if value.endswith(suffix):
+            return int(float(value[:-1]) * factor)
+    return int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transactions", type=parse_count, required=True, help="target row count, e.g. 10m")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--db", type=Path, help="SQLite file to create")
+    target.add_argument("--parquet", type=Path, help="folder for one Parquet file per table")
+    parser.add_argument("--users", type=int, help="number of users (default: scales with --transactions)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-users", type=int, default=20_000, help="users generated per batch")
+    parser.add_argument("--force", action="store_true", help="replace an existing --db file")
+    args = parser.parse_args()
+
+    if args.db:
+        if args.db.exists() and not args.force:
+            parser.error(f"{args.db} exists; pass --force to replace it")
+        args.db.unlink(missing_ok=True)
+        writer = SqliteWriter(args.db)
+    else:
+        writer = ParquetWriter(args.parquet)
+
+    started = time.perf_counter()
+    counts = write_all(writer, generate(args.transactions, args.users, args.seed, args.chunk_users))
+    elapsed = time.perf_counter() - started
+    for table, rows in counts.items():
+        print(f"{table:<13} {rows:>12,} rows")
+    print(f"done in {elapsed:.1f}s -> {args.db or args.parquet}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""Append bank statement files to Transactions without rebuilding the database.
+
+Statements are streamed in chunks (CSV via pandas, OFX by scanning the tag
+stream block by block), so memory depends on --chunksize, not file size.
+Each chunk is
+
+1. normalized to the Transactions columns,
+2. validated (parseable date and amount, reference present, known account,
+   user matching the account owner, a category that can be resolved),
+3. mapped to a category_id from category_id / category_name columns or, failing
+   that, keyword rules over merchant and description,
+4. deduped on (account_id, reference_number) against the database and the
+   rest of the chunk,
+5. inserted in one write transaction (rolled back with --dry-run, which
+   remembers each file's keys so later chunks still dedupe against them;
+   its alert count only reflects the database as it was before the run),
+6. scored by anomaly.Detector in that same transaction, which records
+   unusually large expenses and budget thresholds crossed month-to-date in
+   SpendingAlerts,
+7. counted into the top-merchant summaries by merchants.MerchantTracker,
+   also in that transaction.
+
+The summary triggers from migrations.py keep MonthlySummary and
+CategoryMonthlySpend current, so the sqlite backend sees new rows right away.
+Files-backend users still need `python aggregates.py` to refresh the CSVs.
+
+    python ingest.py feed.csv                      # CSV shaped like transactions_full.csv
+    python ingest.py statement.ofx --account 2001  # OFX, rows go to account 2001
+    python ingest.py feed.csv --rejects rejected.csv --dry-run
+"""
+import argparse
+import re
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+import anomaly
+import merchants
+import migrations
+from settings import DB_PATH
+
+INSERT_COLUMNS = [
+    "user_id", "account_id", "category_id", "amount",
+    "transaction_date", "transaction_time", "description",
+    "payment_method", "merchant_name", "location_city", "location_country",
+    "reference_number", "is_recurring", "created_at",
+]
+
+# Alternative headers seen in bank exports -> Transactions column
+CSV_ALIASES = {
+    "date": "transaction_date",
+    "posted_date": "transaction_date",
+    "time": "transaction_time",
+    "reference": "reference_number",
+    "ref": "reference_number",
+    "fitid": "reference_number",
+    "merchant": "merchant_name",
+    "payee": "merchant_name",
+    "category": "category_name",
+    "memo": "description",
+    "city": "location_city",
+    "country": "location_country",
+}
+
+# Keyword rules tried when a row carries no usable category (first match wins)
+CATEGORY_RULES = [
+    (r"salary|payroll|employer", "Salary"),
+    (r"naivas|quickmart|carrefour|gikomba|supermarket", "Groceries"),
+    (r"uber|bolt|matatu|shell|totalenergies|petrol|fuel", "Transport"),
+    (r"java house|kfc|chicken inn|restaurant|cafe", "Eating Out"),
+    (r"hospital|pharmacy|clinic|nhif", "Healthcare"),
+    (r"kplc|electricity|water|garbage", "Utilities"),
+    (r"wifi|internet|zuku|home fibre", "Internet"),
+    (r"airtime|bundle", "Airtime & Data"),
+    (r"netflix|showmax|cinema", "Entertainment"),
+    (r"school|tuition|course", "Education"),
+    (r"rent|landlord", "Rent"),
+    (r"loan|fuliza|repayment", "Loan Repayment"),
+    (r"savings", "Savings Deposit"),
+]
+
+# OFX <TRNTYPE> -> payment_method used by the rest of the data
+OFX_PAYMENT_METHODS = {
+    "ATM": "cash",
+    "CASH": "cash",
+    "POS": "card",
+    "CHECK": "bank_transfer",
+    "XFER": "bank_transfer",
+    "DIRECTDEP": "bank_transfer",
+    "DIRECTDEBIT": "bank_transfer",
+    "PAYMENT": "bank_transfer",
+}
+
+
+# --------------------------
+# Readers: file -> chunks of raw rows
+# --------------------------
+def read_csv_chunks(path, chunksize):
+    for chunk in pd.read_csv(path, dtype=str, chunksize=chunksize, keep_default_na=False):
+        chunk.columns = [c.strip().lower() for c in chunk.columns]
+        yield chunk.rename(columns=CSV_ALIASES)
+
+
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def ofx_rows(path, block_size=1 << 20):
+    """Yield one dict per <STMTTRN>, reading `path` a block at a time."""
+    account, current, carry = None, None, ""
+    with open(path, encoding="utf-8", errors="replace") as handle:
+        while True:
+            block = handle.read(block_size)
+            text = carry + block
+            # Keep a trailing partial tag for the next block
+            cut = text.rfind("<") if block else len(text)
+            text, carry = text[:cut], text[cut:]
+            for match in OFX_TAG.finditer(text):
+                closing, tag, value = match.group(1), match.group(2).upper(), match.group(3).strip()
+                if tag == "STMTTRN":
+                    if closing and current is not None:
+                        yield current
+                        current = None
+                    elif not closing:
+                        current = {"ofx_account": account}
+                elif tag == "ACCTID" and not closing:
+                    account = value
+                elif current is not None and not closing and value:
+                    current[tag] = value
+            if not block:
+                break
+
+
+def read_ofx_chunks(path, chunksize, account_id=None):
+    rows = []
+    for row in ofx_rows(path):
+        rows.append(row)
+        if len(rows) >= chunksize:
+            yield ofx_frame(rows, account_id)
+            rows = []
+    if rows:
+        yield ofx_frame(rows, account_id)
+
+
+def ofx_frame(rows, account_id=None):
+    raw = pd.DataFrame(rows)
+    posted = raw.get("DTPOSTED", pd.Series("", index=raw.index)).fillna("")
+    name = raw.get("NAME", pd.Series("", index=raw.index)).fillna("")
+    memo = raw.get("MEMO", pd.Series("", index=raw.index)).fillna("")
+    return pd.DataFrame({
+        "account_id": account_id if account_id is not None else raw["ofx_account"],
+        "transaction_date": posted.str[:8],
+        "transaction_time": (
+            posted.str[8:10] + ":" + posted.str[10:12] + ":" + posted.str[12:14]
+        ).where(posted.str.len() >= 14, ""),
+        "amount": raw.get("TRNAMT", pd.Series("", index=raw.index)),
+        "reference_number": raw.get("FITID", pd.Series("", index=raw.index)),
+        "merchant_name": name,
+        "description": memo.where(memo != "", name),
+        "payment_method": raw.get("TRNTYPE", pd.Series("", index=raw.index)).map(OFX_PAYMENT_METHODS),
+    })
+
+
+# --------------------------
+# Validation + category mapping
+# --------------------------
+class Ingestor:
+    """Validates, dedupes and inserts chunks into one database connection."""
+
+    def __init__(self, conn, dry_run=False):
+        self.conn = conn
+        self.dry_run = dry_run
+        self.account_owner = dict(conn.execute("SELECT account_id, user_id FROM Accounts;"))
+        categories = conn.execute("SELECT category_id, category_name, is_recurring FROM Categories;").fetchall()
+        self.category_ids = {cid for cid, _, _ in categories}
+        self.category_by_name = {name.lower(): cid for cid, name, _ in categories}
+        self.category_recurring = {cid: rec for cid, _, rec in categories}
+        self.rules = [
+            (re.compile(pattern, re.IGNORECASE), self.category_by_name[name.lower()])
+            for pattern, name in CATEGORY_RULES
+            if name.lower() in self.category_by_name
+        ]
+        self.detector = anomaly.Detector(conn)
+        self.merchants = merchants.MerchantTracker(conn)
+        self.stats = {"read": 0, "inserted": 0, "duplicates": 0, "rejected": 0, "alerts": 0}
+        # A dry run rolls every chunk back, so the database can't show the
+        # keys of earlier chunks; they are kept here instead
+        self.dry_run_keys = set()
+
+    def map_categories(self, df):
+        """category_id per row from explicit ids, names, then keyword rules."""
+        category = pd.to_numeric(df["category_id"], errors="coerce")
+        category = category.where(category.isin(self.category_ids))
+
+        if "category_name" in df:
+            category = category.fillna(df["category_name"].str.strip().str.lower().map(self.category_by_name))
+
+        missing = category.isna()
+        if missing.any():
+            text = (df["merchant_name"].fillna("") + " " + df["description"].fillna(""))[missing]
+            # Notebook-style rows describe themselves with the category name
+            guessed = text.str.strip().str.lower().map(self.category_by_name)
+            for pattern, cid in self.rules:
+                unresolved = guessed.isna()
+                if not unresolved.any():
+                    break
+                guessed = guessed.where(~(unresolved & text.str.contains(pattern)), cid)
+            category = category.fillna(guessed)
+        return category
+
+    def prepare(self, raw):
+        """Typed rows ready to insert + rejected rows with a reason column."""
+        df = raw.copy()
+        for column in INSERT_COLUMNS:
+            if column not in df:
+                df[column] = None
+        df = df.replace({"": None})
+
+        amount = pd.to_numeric(df["amount"], errors="coerce")
+        dates = pd.to_datetime(df["transaction_date"], errors="coerce", format="mixed")
+        account = pd.to_numeric(df["account_id"], errors="coerce")
+        owner = account.map(self.account_owner)
+        user = pd.to_numeric(df["user_id"], errors="coerce")
+        category = self.map_categories(df)
+
+        reason = pd.Series(None, index=df.index, dtype=object)
+        checks = [
+            (amount.isna(), "amount is not a number"),
+            (dates.isna(), "unparseable transaction_date"),
+            (df["reference_number"].isna(), "missing reference_number"),
+            (owner.isna(), "unknown account_id"),
+            (user.notna() & (user != owner), "user_id does not own account_id"),
+            (category.isna(), "no matching category"),
+        ]
+        for failed, message in checks:
+            reason = reason.where(~(failed & reason.isna()), message)
+        bad = reason.notna()
+
+        rows = pd.DataFrame({
+            "user_id": owner,
+            "account_id": account,
+            "category_id": category,
+            "amount": amount.round(2),
+            "transaction_date": dates.dt.strftime("%Y-%m-%d"),
+            "transaction_time": df["transaction_time"],
+            "description": df["description"],
+            "payment_method": df["payment_method"],
+            "merchant_name": df["merchant_name"],
+            "location_city": df["location_city"],
+            "location_country": df["location_country"],
+            "reference_number": df["reference_number"].astype("string").str.strip(),
+            "is_recurring": pd.to_numeric(df["is_recurring"], errors="coerce"),
+            "created_at": date.today().isoformat(),
+        })[~bad]
+        rows = rows.astype({"user_id": "int64", "account_id": "int64", "category_id": "int64"})
+        rows["is_recurring"] = rows["is_recurring"].fillna(
+            rows["category_id"].map(self.category_recurring)
+        ).astype("int64")
+
+        rejected = raw[bad].assign(reject_reason=reason[bad])
+        return rows, rejected
+
+    def existing_keys(self, rows):
+        """(account_id, reference_number) pairs of `rows` already in Transactions."""
+        self.conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS ingest_keys (account_id INTEGER, reference_number TEXT);"
+        )
+        self.conn.execute("DELETE FROM ingest_keys;")
+        self.conn.executemany(
+            "INSERT INTO ingest_keys VALUES (?, ?);",
+            rows[["account_id", "reference_number"]].itertuples(index=False, name=None),
+        )
+        return set(self.conn.execute(
+            """
+            SELECT k.account_id, k.reference_number
+            FROM ingest_keys k
+            WHERE EXISTS (
+                SELECT 1 FROM Transactions t
+                WHERE t.reference_number = k.reference_number AND t.account_id = k.account_id
+            );
+            """
+        ).fetchall())
+
+    def load_chunk(self, raw):
+        """Insert one chunk; returns (inserted rows, rejected rows)."""
+        rows, rejected = self.prepare(raw)
+        self.stats["read"] += len(raw)
+        self.stats["rejected"] += len(rejected)
+
+        # IMMEDIATE: the duplicate check and the insert see the same table state
+        self.conn.execute("BEGIN IMMEDIATE;")
+        try:
+            rows = rows.drop_duplicates(["account_id", "reference_number"])
+            keys = pd.Series(list(zip(rows["account_id"].tolist(), rows["reference_number"])), index=rows.index)
+            known = self.existing_keys(rows)
+            if self.dry_run:
+                known |= self.dry_run_keys.intersection(keys)
+            if known:
+                rows = rows[~keys.isin(known)]
+            self.conn.executemany(
+                f"INSERT INTO Transactions ({', '.join(INSERT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(INSERT_COLUMNS))});",
+                rows[INSERT_COLUMNS].astype(object).where(rows[INSERT_COLUMNS].notna(), None)
+                .itertuples(index=False, name=None),
+            )
+            # Scored before COMMIT so alerts land (or roll back) with their rows
+            alerts = self.detector.observe(rows)
+            self.merchants.observe(rows)
+            self.conn.execute("ROLLBACK;" if self.dry_run else "COMMIT;")
+        except Exception:
+            self.conn.execute("ROLLBACK;")
+            raise
+
+        if self.dry_run:
+            self.dry_run_keys.update(keys[rows.index])
+        self.stats["duplicates"] += len(raw) - len(rejected) - len(rows)
+        self.stats["inserted"] += len(rows)
+        self.stats["alerts"] += len(alerts)
+        return rows, rejected
+
+
+def statement_chunks(path, fmt, chunksize, account_id=None):
+    fmt = fmt or ("ofx" if Path(path).suffix.lower() in {".ofx", ".qfx"} else "csv")
+    if fmt == "ofx":
+        return read_ofx_chunks(path, chunksize, account_id)
+    chunks = read_csv_chunks(path, chunksize)
+    if account_id is None:
+        return chunks
+    return (chunk.assign(account_id=str(account_id)) for chunk in chunks)
+
+
+def ingest_file(conn, path, fmt=None, chunksize=50_000, account_id=None, rejects=None, dry_run=False):
+    """Stream one statement file into Transactions; returns the counters."""
+    ingestor = Ingestor(conn, dry_run=dry_run)
+    for chunk in statement_chunks(path, fmt, chunksize, account_id):
+        _, rejected = ingestor.load_chunk(chunk)
+        if rejects is not None and len(rejected):
+            rejected.assign(source_file=Path(path).name).to_csv(
+                rejects, mode="a", header=not Path(rejects).exists(), index=False,
+            )
+    return ingestor.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="+", type=Path, help="CSV or OFX statement files")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="SQLite database to append to")
+    parser.add_argument("--format", choices=["csv", "ofx"], help="default: from the file suffix")
+    parser.add_argument("--account", type=int, help="account_id for every row (OFX ACCTID otherwise)")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="rows per batch / transaction")
+    parser.add_argument("--rejects", type=Path, help="write rejected rows + reason here (CSV)")
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="validate and dedupe (against the database and earlier chunks of the file), then roll back",
+    )
+    args = parser.parse_args()
+
+    if args.rejects is not None:
+        args.rejects.unlink(missing_ok=True)
+    migrations.migrate(args.db)
+    conn = sqlite3.connect(args.db, timeout=30, isolation_level=None)
+    try:
+        for path in args.files:
+            stats = ingest_file(
+                conn, path, args.format, args.chunksize, args.account, args.rejects, args.dry_run,
+            )
+            print(
+                f"{path.name}: {stats['read']:,} read, {stats['inserted']:,} inserted, "
+                f"{stats['duplicates']:,} duplicates, {stats['rejected']:,} rejected, "
+                f"{stats['alerts']:,} alerts"
+                + (" (dry run)" if args.dry_run else "")
+            )
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
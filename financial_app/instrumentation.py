@@ -0,0 +1,237 @@
+"""Lightweight timing spans for the dashboard's hot paths.
+
+Pages wrap each stage of a rerun in a span, using the same stage names as
+benchmarks/run.py (load, filter, aggregate, figure, render):
+
+    with instrumentation.span("aggregate", "budget") as s:
+        df = s.payload(budget_engine.user_budget(user_id))
+
+    instrumentation.plotly_chart(fig, "budget_vs_actual", use_container_width=True)
+
+Functions can be decorated with `@timed(stage)` instead. app.py opens one
+`page_run()` around every rerun of the selected page; when it ends, that
+rerun's spans are
+
+- shown in a sidebar panel when FMS_DEBUG_PANEL=1, or for one session by
+  adding ?debug=1 to the URL, and
+- appended to FMS_TRACE_PATH as JSON lines, one per span plus the page
+  total, when that is set.
+
+    python instrumentation.py trace.jsonl      # count / p50 / p95 / max per span
+
+Spans outside a page run (CLIs, benchmarks) record nothing. Payload sizes
+(rows, in-memory bytes, serialized figure size) are only measured when the
+panel or the trace will show them.
+"""
+import argparse
+import functools
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import streamlit as st
+
+from settings import DEBUG_PANEL, TRACE_PATH
+
+# The script thread of each session holds its current page run
+_local = threading.local()
+_trace_lock = threading.Lock()
+
+
+class Span:
+    """One timed stage of a rerun."""
+
+    def __init__(self, stage, name, depth, detailed):
+        self.stage = stage
+        self.name = name
+        self.depth = depth
+        self.detailed = detailed
+        self.ms = None
+        self.rows = None
+        self.bytes = None
+
+    def payload(self, obj):
+        """Record the size of `obj` (when sizes are wanted) and return it unchanged."""
+        if self.detailed:
+            self.rows, self.bytes = payload_size(obj)
+        return obj
+
+    def record(self):
+        return {
+            "stage": self.stage, "name": self.name, "depth": self.depth,
+            "ms": self.ms, "rows": self.rows, "bytes": self.bytes,
+        }
+
+
+def payload_size(obj):
+    """(rows, bytes) of a DataFrame / Series, a Plotly figure or a sized container."""
+    if hasattr(obj, "to_plotly_json"):
+        import plotly.io
+
+        return None, len(plotly.io.to_json(obj, validate=False))
+    if hasattr(obj, "memory_usage"):
+        usage = obj.memory_usage(index=True, deep=False)
+        return len(obj), int(getattr(usage, "sum", lambda: usage)())
+    if hasattr(obj, "__len__"):
+        return len(obj), None
+    return None, None
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+@contextmanager
+def span(stage, name):
+    """Time the enclosed block as `stage`/`name` in the current page run.
+
+    Spans nest: a load inside an aggregate is recorded one level deeper,
+    and only top-level spans count towards the page total.
+    """
+    run = current_run()
+    if run is None:
+        yield Span(stage, name, 0, False)
+        return
+    current = Span(stage, name, run["depth"], run["detailed"])
+    # Recorded in start order so nested spans follow their parent
+    run["spans"].append(current)
+    run["depth"] += 1
+    started = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.ms = (time.perf_counter() - started) * 1000
+        run["depth"] -= 1
+
+
+def timed(stage, name=None):
+    """Decorator form of `span`; records the size of the return value."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage, name or fn.__name__) as current:
+                return current.payload(fn(*args, **kwargs))
+        return wrapper
+    return decorate
+
+
+def plotly_chart(fig, name, **kwargs):
+    """st.plotly_chart timed as a render span, with the figure's JSON size."""
+    with span("render", name) as current:
+        result = st.plotly_chart(fig, **kwargs)
+    # Sized after the timer stops: it serializes the figure a second time
+    current.payload(fig)
+    return result
+
+
+# --------------------------
+# Page runs (app.py)
+# --------------------------
+def panel_requested():
+    return DEBUG_PANEL or st.query_params.get("debug") == "1"
+
+
+def session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+@contextmanager
+def page_run(page):
+    """Collect the spans of one rerun of `page`, then report them."""
+    show_panel = panel_requested()
+    run = {"page": page, "spans": [], "depth": 0, "detailed": show_panel or TRACE_PATH is not None}
+    _local.run = run
+    started = time.perf_counter()
+    try:
+        yield run
+    finally:
+        _local.run = None
+        total_ms = (time.perf_counter() - started) * 1000
+        if TRACE_PATH is not None:
+            write_trace(run, total_ms)
+    # Not reached when the page raised or called st.rerun / st.stop
+    if show_panel:
+        render_panel(run, total_ms)
+
+
+def write_trace(run, total_ms, path=None):
+    path = Path(path or TRACE_PATH)
+    common = {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "session": session_id(),
+        "run": uuid.uuid4().hex[:12],
+        "page": run["page"],
+    }
+    records = [span.record() for span in run["spans"]]
+    records.append({"stage": "page", "name": "total", "depth": -1, "ms": total_ms, "rows": None, "bytes": None})
+    lines = "".join(
+        json.dumps({**common, **record, "ms": round(record["ms"], 3)}) + "\n" for record in records
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _trace_lock, open(path, "a", encoding="utf-8") as handle:
+        handle.write(lines)
+
+
+def render_panel(run, total_ms):
+    spans = [span.record() for span in run["spans"]]
+    traced_ms = sum(record["ms"] for record in spans if record["depth"] == 0)
+    with st.sidebar.expander("⏱️ Rerun timings", expanded=True):
+        st.caption(f"**{run['page']}**: {total_ms:,.1f} ms total, {total_ms - traced_ms:,.1f} ms outside spans")
+        st.dataframe(
+            [
+                {
+                    "stage": record["stage"],
+                    "name": "· " * record["depth"] + record["name"],
+                    "ms": round(record["ms"], 1),
+                    "rows": record["rows"],
+                    "KB": None if record["bytes"] is None else round(record["bytes"] / 1024, 1),
+                }
+                for record in spans
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+
+
+# --------------------------
+# Offline summary
+# --------------------------
+def summarize(path):
+    """Per (page, stage, name): runs, p50 / p95 / max ms and median size."""
+    import pandas as pd
+
+    trace = pd.read_json(path, lines=True)
+    grouped = trace.groupby(["page", "stage", "name"], sort=False)
+    summary = grouped["ms"].agg(
+        runs="size",
+        p50=lambda ms: ms.quantile(0.5),
+        p95=lambda ms: ms.quantile(0.95),
+        max="max",
+        total="sum",
+    )
+    summary["median_kb"] = grouped["bytes"].median() / 1024
+    return summary.sort_values("total", ascending=False).round(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace", type=Path, nargs="?", default=TRACE_PATH, help="JSON-lines trace (default FMS_TRACE_PATH)")
+    args = parser.parse_args()
+    if args.trace is None:
+        parser.error("no trace file given and FMS_TRACE_PATH is not set")
+
+    import pandas as pd
+
+    with pd.option_context("display.width", 200, "display.max_rows", None, "display.max_columns", None):
+        print(summarize(args.trace))
+
+
+if __name__ == "__main__":
+    main()
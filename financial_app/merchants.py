@@ -0,0 +1,234 @@
+"""Top merchants by spend and by number of transactions, in bounded memory.
+
+index.ipynb ranks "Top Expense Merchants" with a GROUP BY over every
+transaction. Here each scope, meaning one user or all users (scope 0),
+keeps a weighted Space-Saving summary in MerchantCounters (migration 7 in
+migrations.py): at most MERCHANT_USER_CAPACITY or MERCHANT_GLOBAL_CAPACITY
+counters, however many merchants the feed contains.
+
+- A merchant already counted adds its expense spend or transaction count.
+- A new merchant takes a free counter, or replaces the smallest one and
+  inherits that counter's value as its `error`.
+
+So `value` never undercounts, overcounts by at most `error`, and
+`value - error` is the exact total since the merchant was last admitted;
+counters with error 0 are exact. Any merchant holding more than
+1 / capacity of a scope's total is guaranteed a counter.
+
+`MerchantTracker` updates the summaries for each chunk ingest.py inserts,
+inside the chunk's transaction, reading and writing only the scopes the
+chunk touches. The files backend has no ingest, so it ranks the export
+exactly instead.
+"""
+import heapq
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import queries
+from migrations import MERCHANT_GLOBAL_CAPACITY, MERCHANT_USER_CAPACITY
+from settings import BACKEND
+
+# Scope of the all-users summary (user ids start at 1)
+ALL_USERS = 0
+
+METRICS = ["spend", "count"]
+
+# Merchants shown in the explorer panel
+TOP_K = 10
+
+TOP_SQL = """
+    SELECT merchant_name, value, error
+    FROM MerchantCounters
+    WHERE scope = ? AND metric = ?
+    ORDER BY value DESC, merchant_name
+    LIMIT ?;
+"""
+
+
+# --------------------------
+# Space-Saving
+# --------------------------
+def space_saving(counters, weights, capacity):
+    """Merge `weights` ({merchant: weight}) into `counters` in place.
+
+    `counters` maps merchant -> [value, error]. New merchants are admitted
+    in descending weight order. Returns the merchants evicted.
+    """
+    new = []
+    for merchant, weight in weights.items():
+        if merchant in counters:
+            counters[merchant][0] += weight
+        else:
+            new.append((weight, merchant))
+    new.sort(key=lambda item: (-item[0], item[1]))
+
+    # Replacing the minimum with min + weight keeps the heap order valid
+    heap = [(value, merchant) for merchant, (value, _) in counters.items()]
+    heapq.heapify(heap)
+    evicted = []
+    for weight, merchant in new:
+        if len(counters) < capacity:
+            counters[merchant] = [weight, 0.0]
+            heapq.heappush(heap, (weight, merchant))
+            continue
+        floor, smallest = heapq.heappop(heap)
+        del counters[smallest]
+        evicted.append(smallest)
+        counters[merchant] = [floor + weight, floor]
+        heapq.heappush(heap, (floor + weight, merchant))
+    return evicted
+
+
+def chunk_weights(expenses):
+    """Spend and count per (scope, metric, merchant) for every user in the chunk and ALL_USERS."""
+    spend = -expenses["amount"].astype("float64")
+    per_user = spend.groupby([expenses["user_id"], expenses["merchant_name"]], sort=False).agg(["sum", "size"])
+    overall = per_user.groupby(level="merchant_name", sort=False).sum()
+    overall.index = pd.MultiIndex.from_arrays(
+        [np.full(len(overall), ALL_USERS), overall.index], names=per_user.index.names
+    )
+    totals = pd.concat([per_user, overall]).rename(columns={"sum": "spend", "size": "count"})
+    weights = totals.stack().rename("weight").reset_index()
+    weights.columns = ["scope", "merchant_name", "metric", "weight"]
+    return weights.astype({"scope": "int64", "weight": "float64"})
+
+
+# --------------------------
+# Tracker (ingest.py)
+# --------------------------
+class MerchantTracker:
+    """Keeps the MerchantCounters summaries current for chunks inserted on one connection.
+
+    Most summaries have free counters, so nothing can be evicted: their
+    weights are added in SQL. Only summaries that would overflow are read
+    back and merged with `space_saving`.
+    """
+
+    def __init__(self, conn, user_capacity=MERCHANT_USER_CAPACITY, global_capacity=MERCHANT_GLOBAL_CAPACITY):
+        self.conn = conn
+        self.user_capacity = user_capacity
+        self.global_capacity = global_capacity
+
+    def stage(self, scopes):
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS merchant_scopes (scope INTEGER PRIMARY KEY);")
+        self.conn.execute("DELETE FROM merchant_scopes;")
+        self.conn.executemany("INSERT INTO merchant_scopes VALUES (?);", [(int(scope),) for scope in scopes])
+
+    def read_sizes(self, scopes):
+        """Counters in use per (scope, metric)."""
+        self.stage(scopes)
+        return pd.read_sql_query(
+            """
+            SELECT c.scope, c.metric, COUNT(*) AS size
+            FROM merchant_scopes k
+            JOIN MerchantCounters c ON c.scope = k.scope
+            GROUP BY c.scope, c.metric;
+            """,
+            self.conn,
+        )
+
+    def read_counters(self, scopes):
+        """{(scope, metric): {merchant: [value, error]}} for `scopes`."""
+        self.stage(scopes)
+        counters = {}
+        for scope, metric, merchant, value, error in self.conn.execute(
+            """
+            SELECT c.scope, c.metric, c.merchant_name, c.value, c.error
+            FROM merchant_scopes k
+            JOIN MerchantCounters c ON c.scope = k.scope;
+            """
+        ):
+            counters.setdefault((scope, metric), {})[merchant] = [value, error]
+        return counters
+
+    def observe(self, rows):
+        """Count rows just inserted in the open transaction; returns the counters written."""
+        expenses = rows[(rows["amount"] < 0) & rows["merchant_name"].notna()]
+        if expenses.empty:
+            return 0
+        weights = chunk_weights(expenses)
+        keys = weights.groupby(["scope", "metric"], sort=False).size().rename("incoming").reset_index()
+        keys = keys.merge(self.read_sizes(keys["scope"].unique()), on=["scope", "metric"], how="left")
+        capacity = np.where(keys["scope"] == ALL_USERS, self.global_capacity, self.user_capacity)
+        keys["room"] = keys["size"].astype("float64").fillna(0) + keys["incoming"] <= capacity
+        weights = weights.merge(keys[["scope", "metric", "room"]], on=["scope", "metric"])
+
+        roomy = weights[weights["room"]]
+        self.conn.executemany(
+            """
+            INSERT INTO MerchantCounters (scope, metric, merchant_name, value, error)
+            VALUES (?, ?, ?, ?, 0)
+            ON CONFLICT(scope, metric, merchant_name) DO UPDATE SET value = value + excluded.value;
+            """,
+            roomy[["scope", "metric", "merchant_name", "weight"]].itertuples(index=False, name=None),
+        )
+
+        full = weights[~weights["room"]]
+        upserts, deletes = [], []
+        if len(full):
+            counters = self.read_counters(full["scope"].unique())
+            for (scope, metric), group in full.groupby(["scope", "metric"], sort=False):
+                # Plain ints: sqlite3 would bind numpy scalars as blobs
+                scope = int(scope)
+                summary = counters.setdefault((scope, metric), {})
+                merchant_weights = dict(zip(group["merchant_name"], group["weight"]))
+                evicted = space_saving(summary, merchant_weights, self.global_capacity if scope == ALL_USERS else self.user_capacity)
+                deletes.extend((scope, metric, merchant) for merchant in evicted)
+                upserts.extend(
+                    (scope, metric, merchant, *summary[merchant])
+                    for merchant in merchant_weights
+                    if merchant in summary
+                )
+        self.conn.executemany(
+            "DELETE FROM MerchantCounters WHERE scope = ? AND metric = ? AND merchant_name = ?;", deletes
+        )
+        self.conn.executemany(
+            """
+            INSERT INTO MerchantCounters (scope, metric, merchant_name, value, error)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(scope, metric, merchant_name) DO UPDATE SET
+                value = excluded.value, error = excluded.error;
+            """,
+            upserts,
+        )
+        return len(roomy) + len(upserts)
+
+
+# --------------------------
+# Explorer panel
+# --------------------------
+def exact_totals(transactions, metric):
+    """Every merchant's exact spend or count in a transactions frame."""
+    expenses = transactions[transactions["amount"].to_numpy() < 0]
+    grouped = (-expenses["amount"]).groupby(expenses["merchant_name"], observed=True, sort=False)
+    totals = grouped.sum() if metric == "spend" else grouped.size().astype("float64")
+    return pd.DataFrame({
+        "merchant_name": totals.index.astype(str),
+        "value": totals.to_numpy(dtype="float64"),
+        "error": np.zeros(len(totals)),
+    })
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def export_totals(version, metric):
+    """exact_totals over the whole files-backend export, once per CSV version."""
+    from data_store import load_dataset
+
+    return exact_totals(load_dataset("transactions"), metric)
+
+
+def top_merchants(user_id, metric, k=TOP_K):
+    """The `k` largest merchants of one user (or ALL_USERS) with value, error and guaranteed (value - error)."""
+    if BACKEND == "sqlite":
+        top = queries.read_sql(TOP_SQL, (int(user_id), metric, int(k)))
+    else:
+        from data_store import dataset_version, get_user_frame
+
+        if user_id == ALL_USERS:
+            totals = export_totals(dataset_version("transactions"), metric)
+        else:
+            totals = exact_totals(get_user_frame("transactions", user_id), metric)
+        top = totals.sort_values(["value", "merchant_name"], ascending=[False, True], kind="stable").head(k)
+    return top.reset_index(drop=True).assign(guaranteed=top["value"].to_numpy() - top["error"].to_numpy())
@@ -0,0 +1,680 @@
+"""Versioned schema migrations for fms_multi_user.db.
+
+index.ipynb creates the base tables; everything added afterwards (indexes,
+derived columns, summary and feature tables) lives here as numbered migrations. The
+applied version is kept in `PRAGMA user_version`, so running `migrate()` is
+idempotent. Migrating is a deploy step: the dashboard only opens read-only
+connections and refuses to start on an out-of-date schema (`require_latest`).
+
+    python migrations.py                # apply pending migrations
+    python migrations.py --check        # also verify the dashboard query plans
+    python migrations.py --db other.db  # target another database
+"""
+import argparse
+import sqlite3
+from pathlib import Path
+
+from settings import DB_PATH
+
+# --------------------------
+# Migrations: (version, description, statements)
+# --------------------------
+MIGRATIONS = [
+    (
+        1,
+        "Integer year/month on Transactions + composite indexes",
+        [
+            # Virtual generated columns cost no storage in the table itself;
+            # the indexes below hold their values, so period lookups no
+            # longer evaluate STRFTIME per row.
+            """
+            ALTER TABLE Transactions ADD COLUMN txn_year INTEGER
+                GENERATED ALWAYS AS (CAST(SUBSTR(transaction_date, 1, 4) AS INTEGER)) VIRTUAL;
+            """,
+            """
+            ALTER TABLE Transactions ADD COLUMN txn_month INTEGER
+                GENERATED ALWAYS AS (CAST(SUBSTR(transaction_date, 6, 2) AS INTEGER)) VIRTUAL;
+            """,
+            # Explorer rows / daily + monthly totals: covering for (date, amount)
+            """
+            CREATE INDEX IF NOT EXISTS idx_transactions_user_date
+                ON Transactions(user_id, transaction_date, amount);
+            """,
+            # Budget actuals and category totals per user
+            """
+            CREATE INDEX IF NOT EXISTS idx_transactions_user_category_period
+                ON Transactions(user_id, category_id, txn_year, txn_month, amount);
+            """,
+            # Org-wide category and month rollups in the notebook
+            """
+            CREATE INDEX IF NOT EXISTS idx_transactions_category_period
+                ON Transactions(category_id, txn_year, txn_month);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_budgets_user_period
+                ON Budgets(user_id, year, month, category_id);
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_savings_goals_user ON SavingsGoals(user_id);",
+            "CREATE INDEX IF NOT EXISTS idx_accounts_user ON Accounts(user_id);",
+            "ANALYZE;",
+        ],
+    ),
+]
+
+# --------------------------
+# Migration 2: incrementally maintained summaries
+# --------------------------
+# Each trigger touches only the (user, year, month[, category]) bucket of the
+# row that changed, so new transactions never force a full GROUP BY.
+SUMMARY_BUCKET_UPSERTS = {
+    "monthly": """
+        INSERT INTO MonthlySummary (user_id, year, month, total_income, total_expenses, num_transactions)
+        VALUES ({row}.user_id, {row}.txn_year, {row}.txn_month,
+                {sign} MAX({row}.amount, 0), {sign} MAX(-{row}.amount, 0), {sign} 1)
+        ON CONFLICT(user_id, year, month) DO UPDATE SET
+            total_income = total_income + excluded.total_income,
+            total_expenses = total_expenses + excluded.total_expenses,
+            num_transactions = num_transactions + excluded.num_transactions;
+    """,
+    "category": """
+        INSERT INTO CategoryMonthlySpend (user_id, category_id, year, month, total_spent, num_transactions)
+        VALUES ({row}.user_id, {row}.category_id, {row}.txn_year, {row}.txn_month,
+                {sign} -{row}.amount, {sign} 1)
+        ON CONFLICT(user_id, category_id, year, month) DO UPDATE SET
+            total_spent = total_spent + excluded.total_spent,
+            num_transactions = num_transactions + excluded.num_transactions;
+    """,
+}
+
+SUMMARY_BUCKET_CLEANUP = {
+    "monthly": """
+        DELETE FROM MonthlySummary
+        WHERE user_id = OLD.user_id AND year = OLD.txn_year AND month = OLD.txn_month
+          AND num_transactions <= 0;
+    """,
+    "category": """
+        DELETE FROM CategoryMonthlySpend
+        WHERE user_id = OLD.user_id AND category_id = OLD.category_id
+          AND year = OLD.txn_year AND month = OLD.txn_month
+          AND num_transactions <= 0;
+    """,
+}
+
+TRACKED_COLUMNS = "user_id, category_id, amount, transaction_date"
+
+
+def summary_triggers():
+    add = {name: sql.format(row="NEW", sign="+") for name, sql in SUMMARY_BUCKET_UPSERTS.items()}
+    remove = {name: sql.format(row="OLD", sign="-") for name, sql in SUMMARY_BUCKET_UPSERTS.items()}
+    return [
+        f"""
+        CREATE TRIGGER trg_monthly_summary_insert AFTER INSERT ON Transactions
+        BEGIN {add["monthly"]} END;
+        """,
+        f"""
+        CREATE TRIGGER trg_monthly_summary_delete AFTER DELETE ON Transactions
+        BEGIN {remove["monthly"]} {SUMMARY_BUCKET_CLEANUP["monthly"]} END;
+        """,
+        f"""
+        CREATE TRIGGER trg_monthly_summary_update AFTER UPDATE OF {TRACKED_COLUMNS} ON Transactions
+        BEGIN {remove["monthly"]} {SUMMARY_BUCKET_CLEANUP["monthly"]} {add["monthly"]} END;
+        """,
+        # Category spend only tracks expenses (negative amounts)
+        f"""
+        CREATE TRIGGER trg_category_spend_insert AFTER INSERT ON Transactions
+        WHEN NEW.amount < 0
+        BEGIN {add["category"]} END;
+        """,
+        f"""
+        CREATE TRIGGER trg_category_spend_delete AFTER DELETE ON Transactions
+        WHEN OLD.amount < 0
+        BEGIN {remove["category"]} {SUMMARY_BUCKET_CLEANUP["category"]} END;
+        """,
+        f"""
+        CREATE TRIGGER trg_category_spend_update_old AFTER UPDATE OF {TRACKED_COLUMNS} ON Transactions
+        WHEN OLD.amount < 0
+        BEGIN {remove["category"]} {SUMMARY_BUCKET_CLEANUP["category"]} END;
+        """,
+        f"""
+        CREATE TRIGGER trg_category_spend_update_new AFTER UPDATE OF {TRACKED_COLUMNS} ON Transactions
+        WHEN NEW.amount < 0
+        BEGIN {add["category"]} END;
+        """,
+    ]
+
+
+SUMMARY_TABLES = [
+    """
+    CREATE TABLE MonthlySummary (
+        user_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        total_income REAL NOT NULL DEFAULT 0,
+        total_expenses REAL NOT NULL DEFAULT 0,
+        num_transactions INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, year, month)
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE CategoryMonthlySpend (
+        user_id INTEGER NOT NULL,
+        category_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        total_spent REAL NOT NULL DEFAULT 0,
+        num_transactions INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, category_id, year, month)
+    ) WITHOUT ROWID;
+    """,
+]
+
+SUMMARY_BACKFILL = [
+    """
+    INSERT INTO MonthlySummary (user_id, year, month, total_income, total_expenses, num_transactions)
+    SELECT
+        user_id, txn_year, txn_month,
+        SUM(MAX(amount, 0)), SUM(MAX(-amount, 0)), COUNT(*)
+    FROM Transactions
+    GROUP BY user_id, txn_year, txn_month;
+    """,
+    """
+    INSERT INTO CategoryMonthlySpend (user_id, category_id, year, month, total_spent, num_transactions)
+    SELECT user_id, category_id, txn_year, txn_month, -SUM(amount), COUNT(*)
+    FROM Transactions
+    WHERE amount < 0
+    GROUP BY user_id, category_id, txn_year, txn_month;
+    """,
+]
+
+# Same columns as the CSV exports the pages were built on
+SUMMARY_VIEWS = [
+    """
+    CREATE VIEW vw_monthly_summary AS
+    SELECT
+        s.user_id,
+        u.full_name,
+        PRINTF('%04d-%02d', s.year, s.month) AS month,
+        ROUND(s.total_expenses, 2) AS total_expenses,
+        ROUND(s.total_income, 2) AS total_income
+    FROM MonthlySummary s
+    JOIN Users u ON u.user_id = s.user_id;
+    """,
+    """
+    CREATE VIEW vw_category_spending AS
+    SELECT
+        s.user_id,
+        u.full_name,
+        c.category_name,
+        ROUND(SUM(s.total_spent), 2) AS total_spent
+    FROM CategoryMonthlySpend s
+    JOIN Users u ON u.user_id = s.user_id
+    JOIN Categories c ON c.category_id = s.category_id
+    GROUP BY s.user_id, s.category_id;
+    """,
+    """
+    CREATE VIEW vw_budget_vs_actual AS
+    SELECT
+        b.user_id,
+        u.full_name,
+        c.category_name,
+        b.month,
+        b.year,
+        b.budget_amount,
+        ROUND(COALESCE(s.total_spent, 0), 2) AS actual_spent,
+        ROUND(COALESCE(s.total_spent, 0) / b.budget_amount * 100, 2) AS utilization,
+        CASE
+            WHEN COALESCE(s.total_spent, 0) / b.budget_amount * 100 > 120 THEN b.budget_amount * 1.2
+            WHEN COALESCE(s.total_spent, 0) / b.budget_amount * 100 < 60 THEN b.budget_amount * 0.85
+            ELSE b.budget_amount
+        END AS recommended_budget,
+        b.category_id
+    FROM Budgets b
+    JOIN Users u ON u.user_id = b.user_id
+    JOIN Categories c ON c.category_id = b.category_id
+    LEFT JOIN CategoryMonthlySpend s
+        ON s.user_id = b.user_id
+        AND s.category_id = b.category_id
+        AND s.year = b.year
+        AND s.month = b.month;
+    """,
+]
+
+MIGRATIONS.append(
+    (
+        2,
+        "Trigger-maintained monthly and category summaries",
+        SUMMARY_TABLES + SUMMARY_BACKFILL + summary_triggers() + SUMMARY_VIEWS + ["ANALYZE;"],
+    )
+)
+
+# --------------------------
+# Migration 3: ingest dedupe lookups
+# --------------------------
+# Bank references are only unique per account (the notebook's random
+# references already repeat across users), so ingest.py dedupes on the pair.
+# Not UNIQUE: existing databases may hold legacy repeats.
+MIGRATIONS.append(
+    (
+        3,
+        "Index Transactions by (reference_number, account_id) for ingest dedupe",
+        [
+            """
+            CREATE INDEX IF NOT EXISTS idx_transactions_reference
+                ON Transactions(reference_number, account_id);
+            """,
+        ],
+    )
+)
+
+# --------------------------
+# Migration 4: monthly ML feature store
+# --------------------------
+# Running totals behind forecasting.py's features, kept per (user, month) by
+# the same bucket-upsert triggers as migration 2; averages and ratios are
+# derived when read (feature_store.py), so every column stays additive.
+FEATURE_BUCKET_UPSERT = """
+    INSERT INTO MonthlyFeatures (
+        user_id, year, month, total_income, total_expenses,
+        num_transactions, total_abs_amount, num_recurring
+    )
+    VALUES ({row}.user_id, {row}.txn_year, {row}.txn_month,
+            {sign} MAX({row}.amount, 0), {sign} MAX(-{row}.amount, 0), {sign} 1,
+            {sign} ABS({row}.amount), {sign} COALESCE({row}.is_recurring, 0))
+    ON CONFLICT(user_id, year, month) DO UPDATE SET
+        total_income = total_income + excluded.total_income,
+        total_expenses = total_expenses + excluded.total_expenses,
+        num_transactions = num_transactions + excluded.num_transactions,
+        total_abs_amount = total_abs_amount + excluded.total_abs_amount,
+        num_recurring = num_recurring + excluded.num_recurring;
+"""
+
+FEATURE_BUCKET_CLEANUP = """
+    DELETE FROM MonthlyFeatures
+    WHERE user_id = OLD.user_id AND year = OLD.txn_year AND month = OLD.txn_month
+      AND num_transactions <= 0;
+"""
+
+FEATURE_TRACKED_COLUMNS = "user_id, amount, transaction_date, is_recurring"
+
+
+def feature_triggers():
+    add = FEATURE_BUCKET_UPSERT.format(row="NEW", sign="+")
+    remove = FEATURE_BUCKET_UPSERT.format(row="OLD", sign="-")
+    return [
+        f"""
+        CREATE TRIGGER trg_monthly_features_insert AFTER INSERT ON Transactions
+        BEGIN {add} END;
+        """,
+        f"""
+        CREATE TRIGGER trg_monthly_features_delete AFTER DELETE ON Transactions
+        BEGIN {remove} {FEATURE_BUCKET_CLEANUP} END;
+        """,
+        f"""
+        CREATE TRIGGER trg_monthly_features_update AFTER UPDATE OF {FEATURE_TRACKED_COLUMNS} ON Transactions
+        BEGIN {remove} {FEATURE_BUCKET_CLEANUP} {add} END;
+        """,
+    ]
+
+
+FEATURE_TABLE = """
+    CREATE TABLE MonthlyFeatures (
+        user_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        total_income REAL NOT NULL DEFAULT 0,
+        total_expenses REAL NOT NULL DEFAULT 0,
+        num_transactions INTEGER NOT NULL DEFAULT 0,
+        total_abs_amount REAL NOT NULL DEFAULT 0,
+        num_recurring INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, year, month)
+    ) WITHOUT ROWID;
+"""
+
+FEATURE_BACKFILL = """
+    INSERT INTO MonthlyFeatures (
+        user_id, year, month, total_income, total_expenses,
+        num_transactions, total_abs_amount, num_recurring
+    )
+    SELECT
+        user_id, txn_year, txn_month,
+        SUM(MAX(amount, 0)), SUM(MAX(-amount, 0)), COUNT(*),
+        SUM(ABS(amount)), SUM(COALESCE(is_recurring, 0))
+    FROM Transactions
+    GROUP BY user_id, txn_year, txn_month;
+"""
+
+MIGRATIONS.append(
+    (
+        4,
+        "Trigger-maintained monthly feature store for forecasting",
+        [FEATURE_TABLE, FEATURE_BACKFILL] + feature_triggers() + ["ANALYZE;"],
+    )
+)
+
+# --------------------------
+# Migration 5: streaming spend-anomaly state
+# --------------------------
+# Running count / mean / M2 (Welford) of expense amounts per (user, category),
+# updated by anomaly.py as ingest.py commits each chunk, plus the alerts it
+# raises. The backfill centres on each key's mean before squaring so M2 does
+# not lose precision on large amounts.
+ANOMALY_TABLES = [
+    """
+    CREATE TABLE CategoryAmountStats (
+        user_id INTEGER NOT NULL,
+        category_id INTEGER NOT NULL,
+        n INTEGER NOT NULL DEFAULT 0,
+        mean REAL NOT NULL DEFAULT 0,
+        m2 REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, category_id)
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE SpendingAlerts (
+        alert_id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        category_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        value REAL NOT NULL,
+        threshold REAL NOT NULL,
+        amount REAL NOT NULL,
+        account_id INTEGER,
+        reference_number TEXT,
+        transaction_date TEXT,
+        created_at TEXT NOT NULL
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_spending_alerts_user ON SpendingAlerts(user_id, alert_id);",
+]
+
+ANOMALY_BACKFILL = """
+    INSERT INTO CategoryAmountStats (user_id, category_id, n, mean, m2)
+    SELECT t.user_id, t.category_id, COUNT(*), k.mean, SUM((-t.amount - k.mean) * (-t.amount - k.mean))
+    FROM Transactions t
+    JOIN (
+        SELECT user_id, category_id, AVG(-amount) AS mean
+        FROM Transactions
+        WHERE amount < 0
+        GROUP BY user_id, category_id
+    ) k ON k.user_id = t.user_id AND k.category_id = t.category_id
+    WHERE t.amount < 0
+    GROUP BY t.user_id, t.category_id;
+"""
+
+MIGRATIONS.append(
+    (
+        5,
+        "Per-category amount statistics and spending alerts for anomaly.py",
+        ANOMALY_TABLES + [ANOMALY_BACKFILL, "ANALYZE;"],
+    )
+)
+
+# --------------------------
+# Migration 6: full-text search over transactions
+# --------------------------
+# External-content FTS5 index: the text lives only in Transactions and the
+# index holds tokens. user_id is indexed as a column of its own, so the
+# explorer's `user_id : 42 AND nai*` is answered from the index without
+# visiting other users' matches. Prefix indexes keep 2-3 letter prefixes
+# (the first keystrokes in the search box) from merging long term lists.
+SEARCH_COLUMNS = "user_id, description, merchant_name, reference_number"
+
+SEARCH_TABLE = f"""
+    CREATE VIRTUAL TABLE TransactionSearch USING fts5(
+        {SEARCH_COLUMNS},
+        content = 'Transactions',
+        content_rowid = 'transaction_id',
+        prefix = '2 3'
+    );
+"""
+
+
+def search_triggers():
+    new = ", ".join(f"NEW.{column}" for column in SEARCH_COLUMNS.split(", "))
+    old = ", ".join(f"OLD.{column}" for column in SEARCH_COLUMNS.split(", "))
+    add = f"""
+        INSERT INTO TransactionSearch (rowid, {SEARCH_COLUMNS})
+        VALUES (NEW.transaction_id, {new});
+    """
+    # External-content tables are told which tokens to drop
+    remove = f"""
+        INSERT INTO TransactionSearch (TransactionSearch, rowid, {SEARCH_COLUMNS})
+        VALUES ('delete', OLD.transaction_id, {old});
+    """
+    return [
+        f"CREATE TRIGGER trg_transaction_search_insert AFTER INSERT ON Transactions BEGIN {add} END;",
+        f"CREATE TRIGGER trg_transaction_search_delete AFTER DELETE ON Transactions BEGIN {remove} END;",
+        f"""
+        CREATE TRIGGER trg_transaction_search_update
+        AFTER UPDATE OF transaction_id, {SEARCH_COLUMNS} ON Transactions
+        BEGIN {remove} {add} END;
+        """,
+    ]
+
+
+MIGRATIONS.append(
+    (
+        6,
+        "FTS5 search over transaction descriptions, merchants and references",
+        [SEARCH_TABLE, "INSERT INTO TransactionSearch (TransactionSearch) VALUES ('rebuild');"]
+        + search_triggers(),
+    )
+)
+
+# --------------------------
+# Migration 7: top-merchant counters
+# --------------------------
+# Space-Saving summaries of expense spend and transaction count per merchant,
+# one per user (scope = user_id) and one across all users (scope = 0),
+# updated by merchants.py as ingest.py commits each chunk. A summary keeps at
+# most this many merchants, however many the feed contains.
+MERCHANT_USER_CAPACITY = 32
+MERCHANT_GLOBAL_CAPACITY = 512
+
+MERCHANT_TABLE = """
+    CREATE TABLE MerchantCounters (
+        scope INTEGER NOT NULL,
+        metric TEXT NOT NULL,
+        merchant_name TEXT NOT NULL,
+        value REAL NOT NULL,
+        error REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (scope, metric, merchant_name)
+    ) WITHOUT ROWID;
+"""
+
+# The history so far is counted exactly (error 0), keeping each scope's
+# largest merchants up to its capacity
+MERCHANT_BACKFILL = f"""
+    INSERT INTO MerchantCounters (scope, metric, merchant_name, value, error)
+    SELECT scope, metric, merchant_name, value, 0
+    FROM (
+        SELECT *, ROW_NUMBER() OVER (
+            PARTITION BY scope, metric ORDER BY value DESC, merchant_name
+        ) AS position
+        FROM (
+            SELECT user_id AS scope, 'spend' AS metric, merchant_name, SUM(-amount) AS value
+            FROM Transactions WHERE amount < 0 AND merchant_name IS NOT NULL
+            GROUP BY user_id, merchant_name
+            UNION ALL
+            SELECT user_id, 'count', merchant_name, COUNT(*)
+            FROM Transactions WHERE amount < 0 AND merchant_name IS NOT NULL
+            GROUP BY user_id, merchant_name
+            UNION ALL
+            SELECT 0, 'spend', merchant_name, SUM(-amount)
+            FROM Transactions WHERE amount < 0 AND merchant_name IS NOT NULL
+            GROUP BY merchant_name
+            UNION ALL
+            SELECT 0, 'count', merchant_name, COUNT(*)
+            FROM Transactions WHERE amount < 0 AND merchant_name IS NOT NULL
+            GROUP BY merchant_name
+        )
+    )
+    WHERE position <= CASE scope WHEN 0 THEN {MERCHANT_GLOBAL_CAPACITY} ELSE {MERCHANT_USER_CAPACITY} END;
+"""
+
+MIGRATIONS.append(
+    (
+        7,
+        "Space-Saving top-merchant counters for merchants.py",
+        [MERCHANT_TABLE, MERCHANT_BACKFILL],
+    )
+)
+
+# --------------------------
+# Migration 8: per-user change counters
+# --------------------------
+# Bumped for a user whenever a row the dashboard snapshot is built from
+# changes, so snapshots.py can tell which users a write touched instead of
+# treating every commit as a change to everyone's data.
+USER_VERSION_TABLE = """
+    CREATE TABLE UserDataVersions (
+        user_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    );
+"""
+
+USER_VERSION_BUMP = """
+    INSERT INTO UserDataVersions (user_id, version) VALUES ({row}.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+"""
+
+# Tables behind the snapshot's monthly, category, savings and budget views
+USER_VERSION_SOURCES = ["Transactions", "SavingsGoals", "Budgets", "Users"]
+
+
+def user_version_triggers():
+    new, old = USER_VERSION_BUMP.format(row="NEW"), USER_VERSION_BUMP.format(row="OLD")
+    statements = []
+    for table in USER_VERSION_SOURCES:
+        name = f"trg_user_version_{table.lower()}"
+        statements += [
+            f"CREATE TRIGGER {name}_insert AFTER INSERT ON {table} BEGIN {new} END;",
+            f"CREATE TRIGGER {name}_delete AFTER DELETE ON {table} BEGIN {old} END;",
+            # A row moved to another user changes both users' data
+            f"CREATE TRIGGER {name}_update AFTER UPDATE ON {table} BEGIN {old} {new} END;",
+        ]
+    return statements
+
+
+MIGRATIONS.append(
+    (
+        8,
+        "Per-user change counters for snapshot versioning",
+        [USER_VERSION_TABLE, "INSERT INTO UserDataVersions (user_id, version) SELECT user_id, 1 FROM Users;"]
+        + user_version_triggers(),
+    )
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def require_latest(conn, path=DB_PATH):
+    """Raise if the database behind `conn` has migrations still to apply."""
+    version = schema_version(conn)
+    if version < LATEST_VERSION:
+        raise RuntimeError(
+            f"{path} is at schema version {version}, the app needs {LATEST_VERSION}; "
+            f"run `python migrations.py --db {path}` before starting it"
+        )
+
+
+def migrate(path=DB_PATH):
+    """Apply every pending migration to `path`; returns the versions applied."""
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    applied = []
+    try:
+        for version, _, statements in MIGRATIONS:
+            if schema_version(conn) >= version:
+                continue
+            # IMMEDIATE takes the write lock up front, so two app processes
+            # starting together cannot both apply the same migration.
+            conn.execute("BEGIN IMMEDIATE;")
+            try:
+                if schema_version(conn) >= version:
+                    conn.execute("COMMIT;")
+                    continue
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {version};")
+                conn.execute("COMMIT;")
+            except Exception:
+                conn.execute("ROLLBACK;")
+                raise
+            applied.append(version)
+    finally:
+        conn.close()
+    return applied
+
+
+# --------------------------
+# Query-plan check
+# --------------------------
+# A full SCAN over one of these (by table name or query alias) means a
+# dashboard query is not using the indexes above.
+LARGE_TABLE_ALIASES = {"Transactions", "t", "Budgets", "b"}
+
+
+def dashboard_plans(conn):
+    """EXPLAIN QUERY PLAN for each dashboard query -> {name: [detail, ...]}."""
+    import queries
+    from transaction_sources import TransactionFilter
+
+    row = conn.execute("SELECT user_id FROM Users ORDER BY user_id LIMIT 1;").fetchone()
+    user_id = row[0] if row else 0
+
+    plans = {}
+    for name, sql in queries.USER_QUERIES.items():
+        plans[name] = [r[3] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", {"user_id": user_id})]
+
+    filters = TransactionFilter(None, None, ("Groceries",), ("Expense",), "nai")
+    where, params = queries.transaction_where(user_id, filters)
+    for name, sql in queries.explorer_sql(where).items():
+        plans[f"explorer_{name}"] = [r[3] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    return plans
+
+
+def full_scans(plans):
+    """(query, detail) pairs where a large table is scanned end to end."""
+    problems = []
+    for name, details in plans.items():
+        for detail in details:
+            words = detail.split()
+            if len(words) >= 2 and words[0] == "SCAN" and words[1] in LARGE_TABLE_ALIASES:
+                problems.append((name, detail))
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="SQLite database to migrate")
+    parser.add_argument("--check", action="store_true", help="verify dashboard query plans use indexes")
+    args = parser.parse_args()
+
+    applied = migrate(args.db)
+    print(f"Applied migrations: {applied or 'none'} (schema version {LATEST_VERSION})")
+
+    if args.check:
+        conn = sqlite3.connect(args.db)
+        plans = dashboard_plans(conn)
+        conn.close()
+        for name, details in plans.items():
+            print(f"\n{name}")
+            for detail in details:
+                print(f"    {detail}")
+        problems = full_scans(plans)
+        if problems:
+            print("\nFull table scans found:")
+            for name, detail in problems:
+                print(f"    {name}: {detail}")
+            raise SystemExit(1)
+        print("\nAll dashboard queries use indexes.")
+
+
+if __name__ == "__main__":
+    main()
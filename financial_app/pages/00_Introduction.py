@@ -1,27 +1,5 @@
 import streamlit as st
 
-st.set_page_config(
-    page_title="Welcome",
-    layout="wide",
-)
-
-# SAFE hiding of Streamlit's default page list
-st.markdown("""
-<style>
-/* Hide only the inner list of pages */
-section[data-testid="stSidebarNav"] ul {
-    display: none !important;
-}
-</style>
-""", unsafe_allow_html=True)
-
-# Custom Navigation
-st.sidebar.page_link("app.py", label="🏠 Dashboard")
-st.sidebar.page_link("pages/01_User_Profile.py", label="👤 User Profile")
-st.sidebar.page_link("pages/02_Transactions_Explorer.py", label="💳 Transactions Explorer")
-st.sidebar.page_link("pages/03_Budget_Analysis.py", label="📊 Budget Analysis")
-st.sidebar.page_link("pages/04_Savings_and_Goals.py", label="🎯 Savings & Goals")
-
 # Page Content
 st.title("✨ Financial Management System")
 st.markdown("""
@@ -49,6 +27,6 @@ Visualize goals, progress % and target completion dates.
 
 col1, col2, col3 = st.columns([1,2,1])
 with col2:
-    st.page_link("app.py", label="➡️ Launch Dashboard")
+    st.page_link("pages/dashboard.py", label="➡️ Launch Dashboard")
 
 
@@ -1,61 +1,31 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
-# HIDE STREAMLIT DEFAULT MULTIPAGE SIDEBAR (all versions)
-st.markdown("""
-    <style>
-        /* Hide default sidebar nav */
-        section[data-testid="stSidebarNav"] {display: none !important;}
-        div[data-testid="stSidebarNavItems"] {display: none !important;}
-        div[data-testid="stSidebarNav"] {display: none !important;}
-    </style>
-""", unsafe_allow_html=True)
-
-
-st.set_page_config(
-    page_title="Financial Dashboard",
-    layout="wide",
-)
-
-# HIDE STREAMLIT DEFAULT MULTIPAGE SIDEBAR
-st.markdown("""
-    <style>
-        section[data-testid="stSidebarNav"] {
-            display: none !important;
-        }
-    </style>
-""", unsafe_allow_html=True)
-
-# ----------------------------------------
-# Load Data
-# ----------------------------------------
-@st.cache_data
-def load_savings():
-    return pd.read_csv("savings_progress.csv")
-
-savings = load_savings()
+import instrumentation
+import savings_engine
+from data_store import list_users
 
 # ----------------------------------------
 # Page Layout
 # ----------------------------------------
-st.set_page_config(page_title="User Profile", layout="wide")
-
 st.title("👤 User Profile Overview")
 
-st.sidebar.page_link("app.py", label="🏠 Dashboard")
-st.sidebar.page_link("pages/01_User_Profile.py", label="👤 User Profile")
-st.sidebar.page_link("pages/02_Transactions_Explorer.py", label="💳 Transactions Explorer")
-st.sidebar.page_link("pages/03_Budget_Analysis.py", label="📊 Budget Analysis")
-st.sidebar.page_link("pages/04_Savings_and_Goals.py", label="🎯 Savings & Goals")
-
 # Sidebar user selector
 st.sidebar.header("Select User")
-users = savings["user_id"].unique()
+users = list_users("savings")
 selected_user = st.sidebar.selectbox("User ID", users)
-
-# Filter data for selected user
-user_data = savings[savings["user_id"] == selected_user].iloc[0]
+if selected_user is None:
+    st.info("No user has savings goals yet.")
+    st.stop()
+
+# The user's goals with progress and on-track status projected to today
+with instrumentation.span("aggregate", "goal_projections") as span:
+    savings = span.payload(savings_engine.user_goals(selected_user))
+# Goals live in their own table; a user can have transactions but none yet
+if savings.empty:
+    st.info("This user has no savings goals yet.")
+    st.stop()
+user_data = savings.iloc[0]
 
 # ----------------------------------------
 # Basic Information
@@ -83,7 +53,7 @@ st.markdown("---")
 # ----------------------------------------
 st.subheader("🎯 Savings Goals")
 
-goals = savings[savings["user_id"] == selected_user][["goal_name", "current_amount", "target_amount", "progress_ratio"]]
+goals = savings[["goal_name", "current_amount", "target_amount", "progress_ratio"]]
 
 for idx, row in goals.iterrows():
     st.write(f"**{row['goal_name']}**")
@@ -98,17 +68,18 @@ st.markdown("---")
 # ----------------------------------------
 st.subheader("📊 Goal Priority & Status")
 
-fig_priority = px.bar(
-    goals,
-    x="goal_name",
-    y="progress_ratio",
-    color="progress_ratio",
-    color_continuous_scale="Blues",
-    labels={"progress_ratio": "Progress"},
-    height=400,
-)
+with instrumentation.span("figure", "goal_priority"):
+    fig_priority = px.bar(
+        goals,
+        x="goal_name",
+        y="progress_ratio",
+        color="progress_ratio",
+        color_continuous_scale="Blues",
+        labels={"progress_ratio": "Progress"},
+        height=400,
+    )
 
-st.plotly_chart(fig_priority, use_container_width=True)
+instrumentation.plotly_chart(fig_priority, "goal_priority", use_container_width=True)
 
 st.markdown("---")
 
@@ -118,8 +89,8 @@ st.markdown("---")
 st.subheader("💡 Personalized Insights")
 
 # On track or behind
-on_track_goals = savings[(savings["user_id"] == selected_user) & (savings["on_track"] == 1)]
-off_track_goals = savings[(savings["user_id"] == selected_user) & (savings["on_track"] == 0)]
+on_track_goals = savings[savings["on_track"] == 1]
+off_track_goals = savings[savings["on_track"] == 0]
 
 if len(on_track_goals) > 0:
     st.success(f"👍 {len(on_track_goals)} goals are on track!")
@@ -2,41 +2,24 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-# HIDE STREAMLIT DEFAULT MULTIPAGE SIDEBAR (all versions)
-st.markdown("""
-    <style>
-        /* Hide default sidebar nav */
-        section[data-testid="stSidebarNav"] {display: none !important;}
-        div[data-testid="stSidebarNavItems"] {display: none !important;}
-        div[data-testid="stSidebarNav"] {display: none !important;}
-    </style>
-""", unsafe_allow_html=True)
-
-
-st.set_page_config(
-    page_title="Financial Dashboard",
-    layout="wide",
-)
-
-# HIDE STREAMLIT DEFAULT MULTIPAGE SIDEBAR
-st.markdown("""
-    <style>
-        section[data-testid="stSidebarNav"] {
-            display: none !important;
-        }
-    </style>
-""", unsafe_allow_html=True)
-
-st.sidebar.page_link("app.py", label="🏠 Dashboard")
-st.sidebar.page_link("pages/01_User_Profile.py", label="👤 User Profile")
-st.sidebar.page_link("pages/02_Transactions_Explorer.py", label="💳 Transactions Explorer")
-st.sidebar.page_link("pages/03_Budget_Analysis.py", label="📊 Budget Analysis")
-st.sidebar.page_link("pages/04_Savings_and_Goals.py", label="🎯 Savings & Goals")
-
-@st.cache_data
+from data_store import dataset_version, get_user_frame, list_users, load_partition
+import export
+import instrumentation
+import merchants
+import timeseries
+from settings import BACKEND
+from transaction_sources import SORT_ORDERS, FrameSource, SqlSource, TransactionFilter
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+# Radio label -> merchants.METRICS entry
+MERCHANT_METRICS = {"Spend": "spend", "Transactions": "count"}
+
+
 def load_transactions():
-    # Load the CSV that holds all raw transactions
-    return pd.read_csv("transactions_full.csv")
+    # Raw transactions come typed (dates already datetime64) and pre-split per user
+    with instrumentation.span("load", "transactions_partition") as span:
+        return span.payload(load_partition("transactions").frame)
 
 # Helper to guess common column names safely
 def pick_column(cols, candidates):
@@ -52,13 +35,13 @@ def pick_column(cols, candidates):
     return None
 
 
-def main():
-    st.title("📂 Transactions Explorer")
-    st.markdown(
-        "Drill down into individual transactions with filters, tables and charts."
-    )
+def select_source():
+    """Sidebar user picker + the row source for the chosen backend."""
+    if BACKEND == "sqlite":
+        selected_user = st.sidebar.selectbox("Select User ID", list_users("transactions"))
+        st.caption("Querying the live **SQLite** database; filters run as SQL.")
+        return SqlSource(selected_user)
 
-    # Load data
     df = load_transactions()
     cols = df.columns
 
@@ -71,22 +54,182 @@ def main():
     type_col = pick_column(cols, ["transaction_type", "type"])
     amount_col = pick_column(cols, ["amount", "transaction_amount", "value"])
 
-    # Sidebar filters
-    st.sidebar.header("Filters")
-
     # User filter (if column exists)
+    selected_user = None
     if user_col:
-        users = sorted(df[user_col].unique())
+        users = list_users("transactions")
         selected_user = st.sidebar.selectbox("Select User ID", users)
-        df = df[df[user_col] == selected_user]
+        df = get_user_frame("transactions", selected_user)
 
-    # Date filter (if column exists)
-    if date_col:
-        # Convert to datetime once
-        df[date_col] = pd.to_datetime(df[date_col])
+    rollups = None
+    if selected_user is not None and date_col and amount_col:
+        with instrumentation.span("aggregate", "rollups"):
+            rollups = timeseries.user_rollups(selected_user, dataset_version("transactions"))
+    return FrameSource(
+        df, date_col, cat_col, type_col, amount_col,
+        user_id=selected_user, rollups=rollups,
+    )
+
+
+def show_paged_table(source, filters):
+    """Render one window of the filtered rows with sort + prev/next controls."""
+    col_sort, col_size = st.columns([3, 1])
+    sort_label = col_sort.selectbox("Sort by", list(SORT_ORDERS))
+    page_size = col_size.selectbox("Rows per page", PAGE_SIZES, index=1)
+    sort_by, descending = SORT_ORDERS[sort_label]
+
+    # cursors[i] opens page i + 1; start over whenever the query changes
+    query_key = (source.user_id, filters, sort_label, page_size)
+    if st.session_state.get("txn_query_key") != query_key:
+        st.session_state["txn_query_key"] = query_key
+        st.session_state["txn_cursors"] = [None]
+    cursors = st.session_state["txn_cursors"]
+
+    with instrumentation.span("filter", "count"):
+        total = source.count(filters)
+    with instrumentation.span("filter", "page") as span:
+        window, next_cursor = source.page(filters, sort_by, descending, page_size, cursors[-1])
+        span.payload(window)
+
+    first_row = (len(cursors) - 1) * page_size + 1
+    if total:
+        st.caption(
+            f"Showing rows **{first_row:,}–{first_row + len(window) - 1:,}** "
+            f"of **{total:,}** matching rows."
+        )
+    else:
+        st.caption("Showing **0** matching rows.")
+    with instrumentation.span("render", "table"):
+        st.dataframe(window, use_container_width=True, hide_index=True)
+
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    col_prev.button(
+        "◀ Previous",
+        disabled=len(cursors) == 1,
+        on_click=cursors.pop,
+        use_container_width=True,
+    )
+    col_page.markdown(
+        f"<div style='text-align:center'>Page {len(cursors):,} of {max(1, -(-total // page_size)):,}</div>",
+        unsafe_allow_html=True,
+    )
+    col_next.button(
+        "Next ▶",
+        disabled=next_cursor is None,
+        on_click=cursors.append,
+        args=(next_cursor,),
+        use_container_width=True,
+    )
+
+
+def show_export(source, filters):
+    """Stream every filtered row to a compressed file on request, then offer it for download."""
+    with st.expander("⬇️ Export filtered transactions"):
+        formats = {fmt.label: name for name, fmt in export.FORMATS.items()}
+        fmt = formats[st.radio("Format", list(formats), horizontal=True)]
+        # Only the path is kept: the file is written once, on "Prepare export",
+        # and reruns reuse it until the query, format or data changes
+        path = export.export_path(source.user_id, filters, fmt)
+        if st.session_state.get("txn_export") != path or not path.exists():
+            st.session_state.pop("txn_export", None)
+            if not st.button("Prepare export"):
+                st.caption("Writes every row matching the filters, not just this page, in chunks.")
+                return
+            with instrumentation.span("filter", "export"):
+                path = st.session_state["txn_export"] = export.prepare(source, filters, fmt)
+
+        size = path.stat().st_size
+        if size > export.EXPORT_MAX_DOWNLOAD_BYTES:
+            st.warning(
+                f"This export is {size / 1024 ** 2:,.0f} MB, too large to download here. "
+                "Write it from the `financial_app` folder instead "
+                "(category and type filters are not CLI options):"
+            )
+            st.code(export.cli_command(source.user_id, filters, fmt), language="bash")
+            return
+        with path.open("rb") as handle:
+            st.download_button(
+                f"Download ({size / 1024:,.0f} KB)",
+                data=handle,
+                file_name=f"transactions-{source.user_id}{export.FORMATS[fmt].suffix}",
+                mime=export.FORMATS[fmt].mime,
+                on_click="ignore",
+            )
 
-        min_date = df[date_col].min()
-        max_date = df[date_col].max()
+
+def show_top_merchants(user_id):
+    """Top merchants of the selected user or everyone, from the MerchantCounters summaries."""
+    col_metric, col_scope = st.columns(2)
+    metric_label = col_metric.radio("Rank by", list(MERCHANT_METRICS), horizontal=True)
+    scope_label = col_scope.radio("Merchants of", ["This user", "All users"], horizontal=True)
+    metric = MERCHANT_METRICS[metric_label]
+    scope = merchants.ALL_USERS if scope_label == "All users" or user_id is None else user_id
+
+    with instrumentation.span("aggregate", "top_merchants") as span:
+        top = span.payload(merchants.top_merchants(scope, metric))
+    if top.empty:
+        st.info("No expense transactions with a merchant yet.")
+        return
+
+    with instrumentation.span("figure", "top_merchants"):
+        fig = px.bar(
+            top.iloc[::-1],
+            x="value",
+            y="merchant_name",
+            orientation="h",
+            error_x="error" if top["error"].any() else None,
+            labels={"value": metric_label, "merchant_name": "Merchant"},
+            title=f"Top {len(top)} Merchants by {metric_label}",
+        )
+    instrumentation.plotly_chart(fig, "top_merchants", use_container_width=True)
+
+    money = "$%.0f" if metric == "spend" else "%.0f"
+    st.dataframe(
+        top,
+        column_config={
+            "merchant_name": "Merchant",
+            "value": st.column_config.NumberColumn(metric_label, format=money),
+            "error": st.column_config.NumberColumn("± Overcount", format=money),
+            "guaranteed": st.column_config.NumberColumn("At Least", format=money),
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+    st.caption(
+        "Counted over all expense history as transactions arrive; the filters above do not apply. "
+        "A total is exact when its overcount is 0."
+    )
+
+
+def main():
+    st.title("📂 Transactions Explorer")
+    st.markdown(
+        "Drill down into individual transactions with filters, tables and charts."
+    )
+
+    # Sidebar filters
+    st.sidebar.header("Filters")
+
+    source = select_source()
+    with instrumentation.span("aggregate", "filter_options"):
+        options = source.options()
+    date_col, cat_col, type_col, amount_col = (
+        source.date_col, source.cat_col, source.type_col, source.amount_col
+    )
+
+    start_date = end_date = chosen_cats = chosen_types = None
+
+    # Word-prefix search, e.g. "nai" finds Naivas; indexed with FTS5 on sqlite
+    search = st.sidebar.text_input(
+        "Search",
+        placeholder="Merchant, description or reference",
+        help="Every word must start a word of the description, merchant name or reference number.",
+    )
+
+    # Date filter (if column exists)
+    if date_col and options["min_date"] is not None:
+        min_date = options["min_date"]
+        max_date = options["max_date"]
 
         start_date, end_date = st.sidebar.date_input(
             "Date range",
@@ -101,31 +244,29 @@ def main():
         if isinstance(end_date, pd.Timestamp):
             end_date = end_date.date()
 
-        df = df[
-            (df[date_col].dt.date >= start_date)
-            & (df[date_col].dt.date <= end_date)
-        ]
-
     # Category filter (if column exists)
     if cat_col:
-        categories = sorted(df[cat_col].unique())
+        categories = options["categories"]
         chosen_cats = st.sidebar.multiselect(
             "Filter by category", options=categories, default=categories
         )
-        df = df[df[cat_col].isin(chosen_cats)]
+        # Everything selected -> no IN (...) filter needed
+        chosen_cats = None if len(chosen_cats) == len(categories) else tuple(chosen_cats)
 
     # Transaction type filter (Income / Expense) if available
     if type_col:
-        types = sorted(df[type_col].unique())
+        types = options["types"]
         chosen_types = st.sidebar.multiselect(
             "Filter by type", options=types, default=types
         )
-        df = df[df[type_col].isin(chosen_types)]
+        chosen_types = None if len(chosen_types) == len(types) else tuple(chosen_types)
+
+    filters = TransactionFilter(start_date, end_date, chosen_cats, chosen_types, search.strip() or None)
 
     st.markdown("### 🔍 Filtered Transactions")
 
-    st.caption(f"Showing **{len(df):,}** matching rows.")
-    st.dataframe(df, use_container_width=True)
+    show_paged_table(source, filters)
+    show_export(source, filters)
 
     # Summary + charts only if we have amount column
     if amount_col:
@@ -136,40 +277,37 @@ def main():
         # Spending by category
         with col1:
             if cat_col:
-                cat_summary = (
-                    df.groupby(cat_col)[amount_col]
-                    .sum()
-                    .reset_index()
-                    .sort_values(amount_col, ascending=False)
-                )
-                fig_cat = px.bar(
-                    cat_summary,
-                    x=amount_col,
-                    y=cat_col,
-                    orientation="h",
-                    title="Total Amount by Category",
-                )
-                st.plotly_chart(fig_cat, use_container_width=True)
+                with instrumentation.span("aggregate", "category_totals") as span:
+                    cat_summary = span.payload(source.category_totals(filters))
+                with instrumentation.span("figure", "category_totals"):
+                    fig_cat = px.bar(
+                        cat_summary,
+                        x=amount_col,
+                        y=cat_col,
+                        orientation="h",
+                        title="Total Amount by Category",
+                    )
+                instrumentation.plotly_chart(fig_cat, "category_totals", use_container_width=True)
             else:
                 st.info("No category column found – cannot plot category spending.")
 
         # Time series
         with col2:
             if date_col:
-                time_summary = (
-                    df.groupby(date_col)[amount_col]
-                    .sum()
-                    .reset_index()
-                    .sort_values(date_col)
-                )
-                fig_time = px.line(
-                    time_summary,
-                    x=date_col,
-                    y=amount_col,
-                    markers=True,
-                    title="Amount Over Time",
-                )
-                st.plotly_chart(fig_time, use_container_width=True)
+                # At most timeseries.MAX_CHART_POINTS points, bucketed by range
+                with instrumentation.span("aggregate", "time_series") as span:
+                    series, bucket_label = source.time_series(filters)
+                    span.payload(series)
+                time_summary = series.rename_axis(date_col).reset_index(name=amount_col)
+                with instrumentation.span("figure", "time_series"):
+                    fig_time = px.line(
+                        time_summary,
+                        x=date_col,
+                        y=amount_col,
+                        markers=True,
+                        title=f"Amount Over Time ({bucket_label})",
+                    )
+                instrumentation.plotly_chart(fig_time, "time_series", use_container_width=True)
             else:
                 st.info("No date column found – cannot plot time series.")
     else:
@@ -178,6 +316,9 @@ def main():
             "Charts are disabled but the raw table is available above."
         )
 
+    st.markdown("### 🏪 Top Merchants")
+    show_top_merchants(source.user_id)
+
 
 if __name__ == "__main__":
     main()
@@ -1,40 +1,11 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-
-# HIDE STREAMLIT DEFAULT MULTIPAGE SIDEBAR (all versions)
-st.markdown("""
-    <style>
-        /* Hide default sidebar nav */
-        section[data-testid="stSidebarNav"] {display: none !important;}
-        div[data-testid="stSidebarNavItems"] {display: none !important;}
-        div[data-testid="stSidebarNav"] {display: none !important;}
-    </style>
-""", unsafe_allow_html=True)
-
-
-st.set_page_config(
-    page_title="Financial Dashboard",
-    layout="wide",
-)
-
-# HIDE STREAMLIT DEFAULT MULTIPAGE SIDEBAR
-st.markdown("""
-    <style>
-        section[data-testid="stSidebarNav"] {
-            display: none !important;
-        }
-    </style>
-""", unsafe_allow_html=True)
 
-# -------------------------------
-# Load Data
-# -------------------------------
-@st.cache_data
-def load_budget():
-    return pd.read_csv("budget_vs_actual.csv")
-
-budget = load_budget()
+import budget_engine
+import charts
+import instrumentation
+import queries
+from data_store import list_users
+from settings import BACKEND
 
 # -------------------------------
 # Page Layout
@@ -42,19 +13,14 @@ budget = load_budget()
 st.title("📊 Budget Analysis Dashboard")
 st.markdown("Compare **budgeted spending** vs **actual spending** and detect overspending risks.")
 
-st.sidebar.page_link("app.py", label="🏠 Dashboard")
-st.sidebar.page_link("pages/01_User_Profile.py", label="👤 User Profile")
-st.sidebar.page_link("pages/02_Transactions_Explorer.py", label="💳 Transactions Explorer")
-st.sidebar.page_link("pages/03_Budget_Analysis.py", label="📊 Budget Analysis")
-st.sidebar.page_link("pages/04_Savings_and_Goals.py", label="🎯 Savings & Goals")
-
 # -------------------------------
 # User Filter
 # -------------------------------
-users = budget["user_id"].unique()
+users = list_users("budget")
 selected_user = st.selectbox("Select User ID", users)
 
-df = budget[budget["user_id"] == selected_user]
+with instrumentation.span("aggregate", "budget_vs_actual") as span:
+    df = span.payload(budget_engine.user_budget(selected_user))
 
 # -------------------------------
 # KPI Section
@@ -78,46 +44,49 @@ st.markdown("---")
 # -------------------------------
 st.subheader("📉 Budget vs Actual Spending per Category")
 
-fig1 = px.bar(
-    df,
-    x="category_name",
-    y=["budget_amount", "actual_spent"],
-    barmode="group",
-    labels={"value": "Amount", "category_name": "Category"},
-    color_discrete_sequence=["#4C9AFF", "#FF4C4C"]
-)
+fig1 = charts.budget_vs_actual(selected_user, df)
 
-st.plotly_chart(fig1, use_container_width=True)
+instrumentation.plotly_chart(fig1, "budget_vs_actual", use_container_width=True)
 
 # -------------------------------
 # 2. Utilization Heatmap
 # -------------------------------
 st.subheader("🔥 Budget Utilization Heatmap")
 
-pivot = df.pivot_table(
-    index="category_name",
-    columns="month",
-    values="utilization"
-)
-
-fig2 = px.imshow(
-    pivot,
-    aspect="auto",
-    color_continuous_scale="RdYlGn_r",
-    labels=dict(x="Month", y="Category", color="Utilization %"),
-)
+fig2 = charts.utilization_heatmap(selected_user, df)
 
-st.plotly_chart(fig2, use_container_width=True)
+instrumentation.plotly_chart(fig2, "utilization_heatmap", use_container_width=True)
 
 # -------------------------------
 # Overspending Alerts
 # -------------------------------
 st.subheader("⚠️ Overspending Alerts")
 
-alerts = df[df["utilization"] > 100]
+with instrumentation.span("filter", "overspending") as span:
+    alerts = span.payload(df[df["utilization"] > 100])
 
 if alerts.empty:
     st.success("No overspending detected. All categories are within budget.")
 else:
     st.error("Overspending detected in the following categories:")
     st.dataframe(alerts[["month", "category_name", "utilization"]])
+
+# -------------------------------
+# Live Alerts (raised during ingest)
+# -------------------------------
+st.subheader("🚨 Live Spending Alerts")
+
+if BACKEND != "sqlite":
+    st.caption("Live alerts are raised as statements are ingested; run with FMS_BACKEND=sqlite to see them.")
+else:
+    with instrumentation.span("load", "alerts") as span:
+        live = span.payload(queries.user_alerts(selected_user))
+    if live.empty:
+        st.success("No unusual expenses or budget thresholds crossed so far.")
+    else:
+        live["alert"] = live["kind"].map({"amount": "Unusual amount (z-score)", "budget": "Budget threshold (%)"})
+        st.dataframe(
+            live[["created_at", "transaction_date", "category_name", "alert", "value", "threshold", "amount"]],
+            use_container_width=True,
+            hide_index=True,
+        )
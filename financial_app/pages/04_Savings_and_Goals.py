@@ -1,40 +1,9 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
-# HIDE STREAMLIT DEFAULT MULTIPAGE SIDEBAR (all versions)
-st.markdown("""
-    <style>
-        /* Hide default sidebar nav */
-        section[data-testid="stSidebarNav"] {display: none !important;}
-        div[data-testid="stSidebarNavItems"] {display: none !important;}
-        div[data-testid="stSidebarNav"] {display: none !important;}
-    </style>
-""", unsafe_allow_html=True)
-
-
-st.set_page_config(
-    page_title="Financial Dashboard",
-    layout="wide",
-)
-
-# HIDE STREAMLIT DEFAULT MULTIPAGE SIDEBAR
-st.markdown("""
-    <style>
-        section[data-testid="stSidebarNav"] {
-            display: none !important;
-        }
-    </style>
-""", unsafe_allow_html=True)
-
-# -------------------------------
-# Load Data
-# -------------------------------
-@st.cache_data
-def load_savings():
-    return pd.read_csv("savings_progress.csv")
-
-savings = load_savings()
+import instrumentation
+import savings_engine
+from data_store import list_users
 
 # -------------------------------
 # Page Layout
@@ -42,19 +11,15 @@ savings = load_savings()
 st.title("💰 Savings & Goals Dashboard")
 st.markdown("Track savings goals, progress percentages, and timelines.")
 
-st.sidebar.page_link("app.py", label="🏠 Dashboard")
-st.sidebar.page_link("pages/01_User_Profile.py", label="👤 User Profile")
-st.sidebar.page_link("pages/02_Transactions_Explorer.py", label="💳 Transactions Explorer")
-st.sidebar.page_link("pages/03_Budget_Analysis.py", label="📊 Budget Analysis")
-st.sidebar.page_link("pages/04_Savings_and_Goals.py", label="🎯 Savings & Goals")
-
 # -------------------------------
 # User Filter
 # -------------------------------
-users = savings["user_id"].unique()
+users = list_users("savings")
 selected_user = st.selectbox("Select User ID", users)
 
-df = savings[savings["user_id"] == selected_user]
+# Progress and on-track status are projected to today, not read from the export
+with instrumentation.span("aggregate", "goal_projections") as span:
+    df = span.payload(savings_engine.user_goals(selected_user))
 
 # -------------------------------
 # KPI Section
@@ -78,47 +43,76 @@ st.markdown("---")
 # -------------------------------
 st.subheader("📈 Savings Goal Progress")
 
-fig1 = px.bar(
-    df,
-    x="progress_ratio",
-    y="goal_name",
-    orientation="h",
-    labels={"progress_ratio": "Progress %"},
-    color="progress_ratio",
-    color_continuous_scale="Viridis"
+with instrumentation.span("figure", "goal_progress"):
+    fig1 = px.bar(
+        df,
+        x="progress_ratio",
+        y="goal_name",
+        orientation="h",
+        labels={"progress_ratio": "Progress %"},
+        color="progress_ratio",
+        color_continuous_scale="Viridis"
+    )
+
+instrumentation.plotly_chart(fig1, "goal_progress", use_container_width=True)
+
+# -------------------------------
+# Projections
+# -------------------------------
+st.subheader("🔮 Projected Completion")
+st.caption(
+    f"Contribution rate: average monthly savings deposits over the last "
+    f"{savings_engine.RATE_MONTHS} months, split across active goals."
 )
 
-st.plotly_chart(fig1, use_container_width=True)
+st.dataframe(
+    df[[
+        "goal_name", "status", "target_date", "required_monthly",
+        "monthly_contribution", "projected_completion",
+    ]],
+    column_config={
+        "goal_name": "Goal",
+        "status": "Status",
+        "target_date": st.column_config.DateColumn("Target Date"),
+        "required_monthly": st.column_config.NumberColumn("Required / Month", format="$%.0f"),
+        "monthly_contribution": st.column_config.NumberColumn("Saving / Month", format="$%.0f"),
+        "projected_completion": st.column_config.DateColumn("Projected Completion"),
+    },
+    hide_index=True,
+    use_container_width=True,
+)
 
 # -------------------------------
 # 2. Timeline (Start → Target Date)
 # -------------------------------
 st.subheader("📆 Savings Timeline")
 
-fig2 = px.timeline(
-    df,
-    x_start="start_date",
-    x_end="target_date",
-    y="goal_name",
-    color="goal_name"
-)
-
-fig2.update_yaxes(autorange="reversed")
+with instrumentation.span("figure", "goal_timeline"):
+    fig2 = px.timeline(
+        df,
+        x_start="start_date",
+        x_end="target_date",
+        y="goal_name",
+        color="goal_name"
+    )
+    fig2.update_yaxes(autorange="reversed")
 
-st.plotly_chart(fig2, use_container_width=True)
+instrumentation.plotly_chart(fig2, "goal_timeline", use_container_width=True)
 
 # -------------------------------
 # 3. On-track vs Behind
 # -------------------------------
 st.subheader("🚦 Goal Status (On Track vs Behind)")
 
-status_counts = df["on_track"].value_counts()
+with instrumentation.span("aggregate", "status_counts"):
+    status_counts = df["on_track"].map({1: "On Track", 0: "Behind"}).value_counts()
 
-fig3 = px.pie(
-    values=status_counts.values,
-    names=status_counts.index,
-    color=status_counts.index,
-    color_discrete_map={"On Track": "green", "Behind": "red"}
-)
+with instrumentation.span("figure", "goal_status"):
+    fig3 = px.pie(
+        values=status_counts.values,
+        names=status_counts.index,
+        color=status_counts.index,
+        color_discrete_map={"On Track": "green", "Behind": "red"}
+    )
 
-st.plotly_chart(fig3, use_container_width=True)
+instrumentation.plotly_chart(fig3, "goal_status", use_container_width=True)
@@ -0,0 +1,175 @@
+import streamlit as st
+import plotly.express as px
+
+import cube
+import instrumentation
+
+# -------------------------------
+# Page Layout
+# -------------------------------
+st.title("👥 Cohort Analysis")
+st.markdown("Compare spending across every user by city, occupation and income band.")
+
+with instrumentation.span("load", "cube") as span:
+    cells, cohorts = cube.load_cube()
+    span.payload(cells)
+
+if cells.empty:
+    st.info("No expense transactions to compare yet.")
+    st.stop()
+
+# Selectbox label -> cube column
+COHORT_DIMENSIONS = {
+    "City": "city",
+    "Occupation": "occupation",
+    "Income Band": "income_band",
+}
+DRILL_DIMENSIONS = {**COHORT_DIMENSIONS, "Category": "category_name"}
+MEASURES = {
+    "Spend per User": "spend_per_user",
+    "Total Spend": "total_spent",
+    "Transactions": "num_transactions",
+}
+
+# -------------------------------
+# Controls
+# -------------------------------
+col1, col2 = st.columns(2)
+compare_label = col1.selectbox("Compare By", list(COHORT_DIMENSIONS))
+measure_label = col2.selectbox("Measure", list(MEASURES))
+compare, measure = COHORT_DIMENSIONS[compare_label], MEASURES[measure_label]
+
+with st.expander("🔎 Filters"):
+    filters = {
+        "city": st.multiselect("City", cells["city"].cat.categories),
+        "occupation": st.multiselect("Occupation", cells["occupation"].cat.categories),
+        "income_band": st.multiselect("Income Band", cube.BAND_LABELS),
+        "category_name": st.multiselect("Category", cells["category_name"].cat.categories),
+    }
+    months = sorted(cells["month"].cat.categories)
+    if len(months) > 1:
+        first, last = st.select_slider("Months", months, value=(months[0], months[-1]))
+        filters["month"] = [month for month in months if first <= month <= last]
+st.caption("Leave a filter empty to include everyone.")
+
+
+def cohort_view(by):
+    """Measures rolled up to `by` with each cohort's user count."""
+    rolled = cube.rollup(cells, by, filters)
+    cohort_by = [dimension for dimension in by if dimension in COHORT_DIMENSIONS.values()]
+    return cube.per_user(rolled, cube.cohort_sizes(cohorts, cohort_by, filters))
+
+
+# -------------------------------
+# KPI Section
+# -------------------------------
+with instrumentation.span("aggregate", "cohort_totals"):
+    overall = cohort_view([])
+    by_month = cube.rollup(cells, ["month"], filters)
+
+st.subheader("📌 Selection Overview")
+
+k1, k2, k3, k4 = st.columns(4)
+k1.metric("Users", f"{int(overall['users'].iloc[0]):,}")
+k2.metric("Total Spend", f"${overall['total_spent'].iloc[0]:,.0f}")
+k3.metric("Spend per User", f"${overall['spend_per_user'].fillna(0).iloc[0]:,.0f}")
+if not by_month.empty:
+    peak = by_month.loc[by_month["total_spent"].idxmax()]
+    k4.metric("Highest Spending Month", str(peak["month"]), f"${peak['total_spent']:,.0f}", delta_color="off")
+
+st.markdown("---")
+
+# -------------------------------
+# 1. Cohort Comparison
+# -------------------------------
+st.subheader(f"📊 {measure_label} by {compare_label}")
+
+with instrumentation.span("aggregate", "by_cohort") as span:
+    by_cohort = span.payload(cohort_view([compare]))
+
+if by_cohort.empty:
+    st.info("No spending matches these filters.")
+    st.stop()
+
+with instrumentation.span("figure", "cohort_comparison"):
+    fig1 = px.bar(
+        by_cohort.sort_values(measure, ascending=False),
+        x=compare,
+        y=measure,
+        hover_data=["users"],
+        labels={compare: compare_label, measure: measure_label},
+        color=measure,
+        color_continuous_scale="Blues",
+    )
+
+instrumentation.plotly_chart(fig1, "cohort_comparison", use_container_width=True)
+
+# -------------------------------
+# 2. Monthly Trend
+# -------------------------------
+st.subheader("📈 Monthly Trend")
+
+with instrumentation.span("aggregate", "by_cohort_month") as span:
+    trend = span.payload(cohort_view([compare, "month"]).sort_values("month"))
+    trend[compare] = trend[compare].astype(str)
+
+with instrumentation.span("figure", "cohort_trend"):
+    fig2 = px.line(
+        trend,
+        x="month",
+        y=measure,
+        color=compare,
+        markers=True,
+        labels={"month": "Month", compare: compare_label, measure: measure_label},
+    )
+
+instrumentation.plotly_chart(fig2, "cohort_trend", use_container_width=True)
+
+# -------------------------------
+# 3. Category Mix
+# -------------------------------
+st.subheader("🔥 Category Share of Spend (%)")
+
+with instrumentation.span("aggregate", "category_mix") as span:
+    mix = cube.rollup(cells, [compare, "category_name"], filters).pivot_table(
+        index=compare, columns="category_name", values="total_spent", observed=True, fill_value=0
+    )
+    mix = span.payload(mix.div(mix.sum(axis=1), axis=0) * 100)
+
+with instrumentation.span("figure", "category_mix"):
+    fig3 = px.imshow(
+        mix,
+        aspect="auto",
+        color_continuous_scale="YlOrRd",
+        labels={"x": "Category", "y": compare_label, "color": "% of spend"},
+        text_auto=".1f",
+    )
+
+instrumentation.plotly_chart(fig3, "category_mix", use_container_width=True)
+
+# -------------------------------
+# 4. Drill-down
+# -------------------------------
+st.subheader("🔬 Drill Down")
+
+col1, col2 = st.columns(2)
+cohort = col1.selectbox(compare_label, by_cohort[compare].astype(str))
+drill_label = col2.selectbox("Break Down By", [label for label in DRILL_DIMENSIONS if label != compare_label])
+drill = DRILL_DIMENSIONS[drill_label]
+
+filters[compare] = [cohort]
+with instrumentation.span("aggregate", "drill_down") as span:
+    detail = span.payload(cohort_view([drill]).sort_values(measure, ascending=False))
+
+st.dataframe(
+    detail[[drill, "users", "total_spent", "num_transactions", "spend_per_user"]],
+    column_config={
+        drill: drill_label,
+        "users": st.column_config.NumberColumn("Users"),
+        "total_spent": st.column_config.NumberColumn("Total Spend", format="$%.0f"),
+        "num_transactions": st.column_config.NumberColumn("Transactions"),
+        "spend_per_user": st.column_config.NumberColumn("Spend per User", format="$%.0f"),
+    },
+    hide_index=True,
+    use_container_width=True,
+)
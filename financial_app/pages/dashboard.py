@@ -0,0 +1,95 @@
+import streamlit as st
+
+import charts
+import forecasting
+import instrumentation
+import snapshots
+from data_store import list_users
+
+# --------------------------
+# Streamlit Layout
+# --------------------------
+st.title("💰 Financial Analytics Dashboard")
+st.markdown("Interactive analytics powered by **Python + Streamlit**")
+
+
+# --------------------------
+# Sidebar Filters
+# --------------------------
+st.sidebar.header("Filters")
+users = list_users("monthly")
+selected_user = st.sidebar.selectbox("Select User ID", users)
+
+# KPIs and chart arrays come precomputed from snapshots.py when available
+with instrumentation.span("load", "snapshot") as span:
+    snapshot = span.payload(snapshots.user_snapshot(selected_user))
+kpis = snapshot["kpis"]
+
+
+# --------------------------
+# KPIs
+# --------------------------
+st.subheader("📊 Key Metrics")
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Total Income", f"${kpis['total_income']:,.0f}")
+col2.metric("Total Expenses", f"${kpis['total_expenses']:,.0f}")
+col3.metric("Net Savings", f"${kpis['net_savings']:,.0f}")
+
+# Batch-scored by `python forecasting.py score`; None until a model is trained
+with instrumentation.span("load", "forecast"):
+    forecast = forecasting.user_forecast(selected_user)
+if forecast is None:
+    col4.metric("Forecast Expenses", "—", help="Run `python forecasting.py train` and `score` to enable")
+elif forecast["predicted_expense"] is None:
+    col4.metric(
+        f"Forecast Expenses ({forecast['month']})", "Pending",
+        help="Appears after the next `python forecasting.py score` run",
+    )
+else:
+    col4.metric(
+        f"Forecast Expenses ({forecast['month']})", f"${forecast['predicted_expense']:,.0f}",
+        help="From the previous model until the next `score` run" if forecast["pending"] else None,
+    )
+
+st.markdown("---")
+
+
+# --------------------------
+# Income vs Expenses Trend
+# --------------------------
+st.subheader("📈 Monthly Income vs Expenses")
+
+fig1 = charts.income_vs_expenses(selected_user, snapshots.frame(snapshot, "monthly"))
+
+instrumentation.plotly_chart(fig1, "income_vs_expenses", use_container_width=True)
+
+
+# --------------------------
+# Spending by Category
+# --------------------------
+st.subheader("🛒 Spending by Category")
+
+fig2 = charts.spending_by_category(selected_user, snapshots.frame(snapshot, "category"))
+
+instrumentation.plotly_chart(fig2, "spending_by_category", use_container_width=True)
+
+
+# --------------------------
+# Savings Progress
+# --------------------------
+st.subheader("💡 Savings Goal Progress")
+
+fig3 = charts.savings_progress(selected_user, snapshots.frame(snapshot, "savings"))
+
+instrumentation.plotly_chart(fig3, "savings_progress", use_container_width=True)
+
+# --------------------------
+# Budget Utilization Heatmap
+# --------------------------
+st.subheader("🔥 Budget Utilization (Monthly)")
+
+fig4 = charts.pivot_heatmap(selected_user, snapshots.utilization(snapshot), "Category Name")
+
+instrumentation.plotly_chart(fig4, "utilization_heatmap", use_container_width=True)
+
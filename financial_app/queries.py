@@ -0,0 +1,422 @@
+"""Parameterized SQL behind the sqlite backend.
+
+Every query is scoped to one user and pushes the page filters (date range,
+categories, transaction types, search text) into WHERE / GROUP BY, so a
+session only ever holds the rows it is about to show. Per-user frames come
+back with the same columns as the CSV exports, which lets data_store hand
+them to the pages unchanged.
+"""
+import re
+
+import pandas as pd
+import streamlit as st
+
+from db import get_pool
+from settings import DB_PATH
+
+# --------------------------
+# Per-user frames (same columns as the CSV exports)
+# --------------------------
+# monthly / category / budget read the trigger-maintained summary views
+# (see migrations.py), so they cost O(months x categories) per user no matter
+# how many transactions the user has.
+USER_QUERIES = {
+    "monthly": """
+        SELECT user_id, full_name, month, total_expenses, total_income
+        FROM vw_monthly_summary
+        WHERE user_id = :user_id
+        ORDER BY month;
+    """,
+    "category": """
+        SELECT user_id, full_name, category_name, total_spent
+        FROM vw_category_spending
+        WHERE user_id = :user_id;
+    """,
+    "budget": """
+        SELECT
+            user_id, full_name, category_name, month, year,
+            budget_amount, actual_spent, utilization, recommended_budget, category_id
+        FROM vw_budget_vs_actual
+        WHERE user_id = :user_id
+        ORDER BY category_id, year, month;
+    """,
+    "savings": """
+        SELECT
+            g.goal_id,
+            g.user_id,
+            g.goal_name,
+            g.target_amount,
+            g.current_amount,
+            g.start_date,
+            g.target_date,
+            g.priority_level,
+            g.status,
+            u.annual_income,
+            u.occupation,
+            u.city,
+            g.current_amount * 1.0 / g.target_amount AS progress_ratio,
+            JULIANDAY(g.target_date) - JULIANDAY(g.start_date) AS total_days,
+            JULIANDAY('now') - JULIANDAY(g.start_date) AS days_passed,
+            CASE
+                WHEN g.current_amount * 1.0 / g.target_amount
+                     >= (JULIANDAY('now') - JULIANDAY(g.start_date))
+                        / (JULIANDAY(g.target_date) - JULIANDAY(g.start_date))
+                THEN 1 ELSE 0
+            END AS on_track
+        FROM SavingsGoals g
+        JOIN Users u ON u.user_id = g.user_id
+        WHERE g.user_id = :user_id
+        ORDER BY g.goal_id;
+    """,
+    "users": """
+        SELECT user_id, full_name, occupation, annual_income, country, city
+        FROM Users
+        WHERE user_id = :user_id;
+    """,
+    "transactions": """
+        SELECT
+            t.transaction_id,
+            t.user_id,
+            t.account_id,
+            t.category_id,
+            c.category_name,
+            c.category_type AS transaction_type,
+            t.amount,
+            t.transaction_date,
+            t.transaction_time,
+            t.description,
+            t.payment_method,
+            t.merchant_name,
+            t.location_city,
+            t.location_country,
+            t.reference_number,
+            t.is_recurring
+        FROM Transactions t
+        JOIN Categories c ON c.category_id = t.category_id
+        WHERE t.user_id = :user_id
+        ORDER BY t.transaction_date, t.transaction_id;
+    """,
+}
+
+USER_QUERY_DATES = {
+    "savings": ["start_date", "target_date"],
+    "transactions": ["transaction_date"],
+}
+
+
+def read_sql(sql, params=(), parse_dates=None):
+    with get_pool().connection() as conn:
+        return pd.read_sql_query(sql, conn, params=params, parse_dates=parse_dates)
+
+
+# Table whose rows put a user in each dataset's view; every one is indexed
+# on user_id, so listing costs one probe per user
+USER_LIST_TABLES = {
+    "monthly": "MonthlySummary",
+    "category": "CategoryMonthlySpend",
+    "budget": "Budgets",
+    "savings": "SavingsGoals",
+    "users": None,
+    "transactions": "Transactions",
+}
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def list_users(name):
+    """Sorted ids of the users with at least one row in dataset `name`."""
+    if name not in USER_LIST_TABLES:
+        raise KeyError(f"Unknown dataset {name!r}; expected one of {sorted(USER_LIST_TABLES)}")
+    table = USER_LIST_TABLES[name]
+    where = f" WHERE EXISTS (SELECT 1 FROM {table} t WHERE t.user_id = u.user_id)" if table else ""
+    with get_pool().connection() as conn:
+        rows = conn.execute(f"SELECT u.user_id FROM Users u{where} ORDER BY u.user_id;").fetchall()
+    return [user_id for (user_id,) in rows]
+
+
+def user_data_version(user_id):
+    """(database file id, change counter) of the rows behind one user's views.
+
+    The counter is kept by the migration 8 triggers; the file id tells a
+    recreated database apart from the one a counter was read from.
+    """
+    with get_pool().connection() as conn:
+        row = conn.execute(
+            "SELECT version FROM UserDataVersions WHERE user_id = ?;", (int(user_id),)
+        ).fetchone()
+    return DB_PATH.stat().st_ino, row[0] if row else 0
+
+
+@st.cache_data(ttl=60, max_entries=512, show_spinner=False)
+def user_frame(name, user_id, version=None):
+    """One user's rows of `name`, shaped like the matching CSV export.
+
+    `version` (data_store.dataset_version) is only part of the cache key, so
+    a write to the database is picked up on the next rerun.
+    """
+    if name not in USER_QUERIES:
+        raise KeyError(f"Unknown dataset {name!r}; expected one of {sorted(USER_QUERIES)}")
+    return read_sql(
+        USER_QUERIES[name],
+        {"user_id": int(user_id)},
+        parse_dates=USER_QUERY_DATES.get(name),
+    )
+
+
+# --------------------------
+# Spending alerts (anomaly.py)
+# --------------------------
+ALERTS_SQL = """
+    SELECT
+        a.created_at,
+        a.transaction_date,
+        c.category_name,
+        a.kind,
+        a.value,
+        a.threshold,
+        a.amount,
+        a.reference_number
+    FROM SpendingAlerts a
+    JOIN Categories c ON c.category_id = a.category_id
+    WHERE a.user_id = :user_id
+    ORDER BY a.alert_id DESC
+    LIMIT :limit;
+"""
+
+
+def user_alerts(user_id, limit=50):
+    """One user's most recent alerts, newest first."""
+    return read_sql(ALERTS_SQL, {"user_id": int(user_id), "limit": int(limit)})
+
+
+# --------------------------
+# Transactions Explorer
+# --------------------------
+TRANSACTION_COLUMNS = """
+    t.transaction_id,
+    t.transaction_date,
+    t.transaction_time,
+    c.category_name,
+    c.category_type AS transaction_type,
+    t.amount,
+    t.description,
+    t.payment_method,
+    t.merchant_name,
+    t.location_city,
+    t.reference_number,
+    t.is_recurring
+"""
+
+
+# Same token rule as FTS5's unicode61 tokenizer: runs of letters and digits
+SEARCH_TOKEN = re.compile(r"[^\W_]+")
+
+
+def search_terms(text):
+    """Lowercased search words in `text`; each matches as a word prefix."""
+    return [term.lower() for term in SEARCH_TOKEN.findall(text or "")]
+
+
+def search_match(user_id, terms):
+    """FTS5 MATCH expression: one user's rows containing every term as a prefix."""
+    prefixes = " AND ".join(f'"{term}"*' for term in terms)
+    return f'user_id : "{int(user_id)}" AND {{description merchant_name reference_number}} : ({prefixes})'
+
+
+def transaction_where(user_id, filters):
+    """WHERE clause + params for one user's transactions under `filters`."""
+    clauses = ["t.user_id = ?"]
+    params = [int(user_id)]
+    terms = search_terms(filters.search)
+    if terms:
+        clauses.append(
+            "t.transaction_id IN (SELECT rowid FROM TransactionSearch WHERE TransactionSearch MATCH ?)"
+        )
+        params.append(search_match(user_id, terms))
+    if filters.start is not None:
+        clauses.append("t.transaction_date >= ?")
+        params.append(filters.start.isoformat())
+    if filters.end is not None:
+        clauses.append("t.transaction_date <= ?")
+        params.append(filters.end.isoformat())
+    for column, values in (
+        ("c.category_name", filters.categories),
+        ("c.category_type", filters.types),
+    ):
+        if values is None:
+            continue
+        if not values:
+            clauses.append("0")
+            continue
+        clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    return " AND ".join(clauses), params
+
+
+def transaction_filter_options(user_id):
+    """Date bounds, categories and types available for one user."""
+    with get_pool().connection() as conn:
+        min_date, max_date = conn.execute(
+            "SELECT MIN(transaction_date), MAX(transaction_date) FROM Transactions WHERE user_id = ?;",
+            (int(user_id),),
+        ).fetchone()
+        labels = conn.execute(
+            """
+            SELECT DISTINCT c.category_name, c.category_type
+            FROM Transactions t
+            JOIN Categories c ON c.category_id = t.category_id
+            WHERE t.user_id = ?;
+            """,
+            (int(user_id),),
+        ).fetchall()
+    return {
+        "min_date": pd.Timestamp(min_date) if min_date else None,
+        "max_date": pd.Timestamp(max_date) if max_date else None,
+        "categories": sorted({name for name, _ in labels}),
+        "types": sorted({kind for _, kind in labels}),
+    }
+
+
+def explorer_sql(where):
+    """The explorer's row and chart queries for a WHERE clause from transaction_where."""
+    return {
+        "rows": f"""
+            SELECT {TRANSACTION_COLUMNS}
+            FROM Transactions t
+            JOIN Categories c ON c.category_id = t.category_id
+            WHERE {where}
+            ORDER BY t.transaction_date, t.transaction_id;
+        """,
+        "category_totals": f"""
+            SELECT c.category_name, SUM(t.amount) AS amount
+            FROM Transactions t
+            JOIN Categories c ON c.category_id = t.category_id
+            WHERE {where}
+            GROUP BY c.category_name
+            ORDER BY amount DESC;
+        """,
+        "count": f"""
+            SELECT COUNT(*)
+            FROM Transactions t
+            JOIN Categories c ON c.category_id = t.category_id
+            WHERE {where};
+        """,
+        "daily_totals": f"""
+            SELECT t.transaction_date, SUM(t.amount) AS amount
+            FROM Transactions t
+            JOIN Categories c ON c.category_id = t.category_id
+            WHERE {where}
+            GROUP BY t.transaction_date
+            ORDER BY t.transaction_date;
+        """,
+    }
+
+
+def filtered_transactions(user_id, filters):
+    where, params = transaction_where(user_id, filters)
+    return read_sql(explorer_sql(where)["rows"], params, parse_dates=["transaction_date"])
+
+
+# Typed up front so a chunk where a column is all NULL (or no row matched)
+# keeps the same types as every other chunk
+EXPORT_DTYPES = {
+    "transaction_id": "int64",
+    "amount": "float64",
+    "transaction_time": "string",
+    "category_name": "string",
+    "transaction_type": "string",
+    "description": "string",
+    "payment_method": "string",
+    "merchant_name": "string",
+    "location_city": "string",
+    "reference_number": "string",
+    "is_recurring": "Int64",
+}
+
+
+def transaction_chunks(user_id, filters, size):
+    """Matching rows in date order, `size` at a time from one open cursor."""
+    where, params = transaction_where(user_id, filters)
+    with get_pool().connection() as conn:
+        yield from pd.read_sql_query(
+            explorer_sql(where)["rows"], conn, params=params,
+            parse_dates=["transaction_date"], dtype=EXPORT_DTYPES, chunksize=size,
+        )
+
+
+def count_transactions(user_id, filters):
+    where, params = transaction_where(user_id, filters)
+    with get_pool().connection() as conn:
+        return conn.execute(explorer_sql(where)["count"], params).fetchone()[0]
+
+
+PAGE_SORT_COLUMNS = {"date": "t.transaction_date", "amount": "t.amount"}
+
+
+def transaction_page(user_id, filters, sort_by, descending, size, after=None):
+    """One window of matching rows using keyset pagination.
+
+    `after` is the (sort value, transaction_id) of the last row on the
+    previous page; returns (rows, cursor for the next page or None).
+    """
+    where, params = transaction_where(user_id, filters)
+    column = PAGE_SORT_COLUMNS[sort_by]
+    direction = "DESC" if descending else "ASC"
+    if after is not None:
+        where += f" AND ({column}, t.transaction_id) {'<' if descending else '>'} (?, ?)"
+        params = params + list(after)
+
+    # One extra row tells us whether a next page exists without a second query
+    rows = read_sql(
+        f"""
+        SELECT {TRANSACTION_COLUMNS}
+        FROM Transactions t
+        JOIN Categories c ON c.category_id = t.category_id
+        WHERE {where}
+        ORDER BY {column} {direction}, t.transaction_id {direction}
+        LIMIT ?;
+        """,
+        params + [size + 1],
+    )
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows.iloc[:size]
+        last = rows.iloc[-1]
+        sort_value = last["transaction_date"] if sort_by == "date" else float(last["amount"])
+        next_cursor = (sort_value, int(last["transaction_id"]))
+    rows["transaction_date"] = pd.to_datetime(rows["transaction_date"])
+    return rows, next_cursor
+
+
+# SQL expressions for the start of each time bucket (weeks start on Monday)
+BUCKET_SQL = {
+    "D": "t.transaction_date",
+    "W": "DATE(t.transaction_date, '-' || ((CAST(STRFTIME('%w', t.transaction_date) AS INTEGER) + 6) % 7) || ' days')",
+    "M": "SUBSTR(t.transaction_date, 1, 7) || '-01'",
+}
+
+
+def bucket_totals(user_id, filters, bucket):
+    """Summed amount per day / week / month start under `filters`."""
+    where, params = transaction_where(user_id, filters)
+    return read_sql(
+        f"""
+        SELECT {BUCKET_SQL[bucket]} AS period, SUM(t.amount) AS amount
+        FROM Transactions t
+        JOIN Categories c ON c.category_id = t.category_id
+        WHERE {where}
+        GROUP BY period
+        ORDER BY period;
+        """,
+        params,
+        parse_dates=["period"],
+    )
+
+
+def category_totals(user_id, filters):
+    where, params = transaction_where(user_id, filters)
+    return read_sql(explorer_sql(where)["category_totals"], params)
+
+
+def daily_totals(user_id, filters):
+    where, params = transaction_where(user_id, filters)
+    return read_sql(explorer_sql(where)["daily_totals"], params, parse_dates=["transaction_date"])
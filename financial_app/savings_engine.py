@@ -0,0 +1,162 @@
+"""Savings-goal projections, recomputed live for any date.
+
+savings_progress.csv froze `progress_ratio`, `days_passed` and `on_track` on
+the day it was exported. Here every goal is projected in one vectorized pass
+from the goal amounts and dates, the current date and each user's recent
+savings deposits:
+
+- progress_ratio and the share of the goal's time already elapsed
+- required_monthly: what must be saved per month from today to hit the
+  target on time
+- monthly_contribution: the user's average monthly "Savings Deposit" over
+  the last RATE_MONTHS months of their history, split across their active
+  goals in proportion to what each still needs
+- projected_completion: when the goal is reached at that rate (NaT if the
+  user is not saving)
+- on_track: done, ahead of a straight-line schedule, or projected to finish
+  by the target date
+
+Like budget_engine.py it works on one user's rows or on every goal at once.
+"""
+import numpy as np
+import pandas as pd
+
+from budget_engine import monthly_actuals
+from categories import CATEGORY_IDS
+
+SAVINGS_CATEGORY_ID = CATEGORY_IDS["Savings Deposit"]
+
+# Months of deposits averaged into a user's contribution rate
+RATE_MONTHS = 6
+DAYS_PER_MONTH = 365.25 / 12
+
+ONE_DAY = np.timedelta64(1, "D")
+
+
+def latest_periods(transactions):
+    """Each user's latest month with any transaction, as year * 12 + month."""
+    dates = pd.to_datetime(transactions["transaction_date"])
+    return (dates.dt.year * 12 + dates.dt.month).groupby(transactions["user_id"]).max()
+
+
+def contribution_rates(actuals, latest, months=RATE_MONTHS):
+    """Average monthly savings deposit per user_id.
+
+    `actuals` is shaped like monthly_actuals() (or CategoryMonthlySpend) and
+    `latest` comes from latest_periods(). Each user's window ends at their
+    latest month of activity, so exports that are a few months old still
+    give a rate.
+    """
+    period = actuals["year"].astype("int64") * 12 + actuals["month"].astype("int64")
+    end = actuals["user_id"].map(latest)
+    recent = (actuals["category_id"] == SAVINGS_CATEGORY_ID) & (period > end - months) & (period <= end)
+    deposits = actuals.loc[recent, "actual_spent"].groupby(actuals.loc[recent, "user_id"]).sum()
+    return (deposits / months).rename("monthly_rate")
+
+
+def project_goals(goals, rates, today=None):
+    """Goals with live progress, contribution and on-track columns.
+
+    `goals` needs user_id, target_amount, current_amount, start_date,
+    target_date and status; `rates` maps user_id to a monthly contribution
+    (contribution_rates()). Columns from the export with the same names are
+    replaced.
+    """
+    today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today)
+    now = np.datetime64(today, "ns")
+
+    target = goals["target_amount"].to_numpy(dtype="float64")
+    current = goals["current_amount"].to_numpy(dtype="float64")
+    start = goals["start_date"].to_numpy(dtype="datetime64[ns]")
+    end = goals["target_date"].to_numpy(dtype="datetime64[ns]")
+    status = goals["status"].astype(str).to_numpy()
+
+    total_days = (end - start) / ONE_DAY
+    days_passed = np.clip((now - start) / ONE_DAY, 0, np.maximum(total_days, 0))
+    elapsed = np.divide(days_passed, total_days, out=np.ones_like(total_days), where=total_days > 0)
+    progress = np.divide(current, target, out=np.ones_like(target), where=target > 0)
+    remaining = np.maximum(target - current, 0)
+    done = (remaining <= 0) | (status == "completed")
+
+    # Split each user's rate over their active goals by what is still missing
+    codes, users = pd.factorize(goals["user_id"])
+    open_amount = np.where((status == "active") & ~done, remaining, 0.0)
+    user_open = np.bincount(codes, weights=open_amount, minlength=len(users))[codes]
+    share = np.divide(open_amount, user_open, out=np.zeros_like(open_amount), where=user_open > 0)
+    user_rate = pd.Series(rates).reindex(users).fillna(0).to_numpy(dtype="float64")[codes]
+    contribution = user_rate * share
+
+    months_left = np.maximum((end - now) / ONE_DAY / DAYS_PER_MONTH, 0)
+    # Overdue goals need the whole remainder now
+    required = np.where(done, 0.0, remaining / np.maximum(months_left, 1))
+
+    months_needed = np.divide(remaining, contribution, out=np.full_like(remaining, np.inf), where=contribution > 0)
+    months_needed[done] = 0
+    # Horizons past the last representable date would wrap around in
+    # datetime64[ns]; they count as unreachable
+    days_needed = np.ceil(months_needed * DAYS_PER_MONTH)
+    reachable = days_needed <= (pd.Timestamp.max - today).days
+    days_needed = np.where(reachable, days_needed, 0).astype("int64")
+    projected = np.where(reachable, now + days_needed * ONE_DAY, np.datetime64("NaT", "ns"))
+
+    on_track = done | (progress >= elapsed) | (reachable & (projected <= end))
+    return goals.assign(
+        progress_ratio=progress,
+        total_days=total_days,
+        days_passed=days_passed,
+        elapsed_ratio=elapsed,
+        required_monthly=required.round(2),
+        monthly_contribution=contribution.round(2),
+        projected_completion=projected,
+        on_track=on_track.astype("int8"),
+    )
+
+
+# --------------------------
+# Live, per user (dashboard pages)
+# --------------------------
+def user_goals(user_id, today=None):
+    """One user's goals projected from their current transactions."""
+    from data_store import get_user_frame
+
+    goals = get_user_frame("savings", user_id)
+    transactions = get_user_frame("transactions", user_id)
+    rates = contribution_rates(monthly_actuals(transactions), latest_periods(transactions))
+    return project_goals(goals, rates, today)
+
+
+# --------------------------
+# All users
+# --------------------------
+GOALS_SQL = """
+    SELECT goal_id, user_id, goal_name, target_amount, current_amount,
+           start_date, target_date, priority_level, status
+    FROM SavingsGoals;
+"""
+
+# Both read the summary tables kept current by triggers (migration 2 in
+# migrations.py) instead of scanning Transactions
+DEPOSITS_SQL = """
+    SELECT user_id, category_id, year, month, total_spent AS actual_spent
+    FROM CategoryMonthlySpend
+    WHERE category_id = :category_id;
+"""
+
+LATEST_SQL = """
+    SELECT user_id, MAX(year * 12 + month) AS period
+    FROM MonthlySummary
+    GROUP BY user_id;
+"""
+
+
+def read_goal_inputs(conn):
+    """(every goal, every user's contribution rate) from the database."""
+    goals = pd.read_sql_query(GOALS_SQL, conn, parse_dates=["start_date", "target_date"])
+    deposits = pd.read_sql_query(DEPOSITS_SQL, conn, params={"category_id": SAVINGS_CATEGORY_ID})
+    latest = pd.read_sql_query(LATEST_SQL, conn, index_col="user_id")["period"]
+    return goals, contribution_rates(deposits, latest)
+
+
+def read_goal_projections(conn, today=None):
+    """Every goal in the database projected to `today` (default: now)."""
+    return project_goals(*read_goal_inputs(conn), today)
@@ -0,0 +1,53 @@
+import os
+from pathlib import Path
+
+# --------------------------
+# Locations
+# --------------------------
+APP_DIR = Path(__file__).resolve().parent
+
+# Folder holding the CSV exports produced by index.ipynb
+DATA_DIR = Path(os.environ.get("FMS_DATA_DIR", APP_DIR))
+
+# Typed columnar copies of the CSV exports are written here
+CACHE_DIR = Path(os.environ.get("FMS_CACHE_DIR", DATA_DIR / ".fms_cache"))
+
+# SQLite database built by index.ipynb
+DB_PATH = Path(os.environ.get("FMS_DB_PATH", APP_DIR.parent / "fms_multi_user.db"))
+
+# --------------------------
+# Backend selection
+# --------------------------
+# "files"  -> typed copies of the CSV exports (data_store.py)
+# "sqlite" -> live parameterized queries against DB_PATH (queries.py)
+BACKEND = os.environ.get("FMS_BACKEND", "files")
+
+# Read-only connections kept open per process for the sqlite backend
+DB_POOL_SIZE = int(os.environ.get("FMS_DB_POOL_SIZE", "4"))
+
+# --------------------------
+# Chart cache
+# --------------------------
+# Built Plotly figures / pivots kept per process (least recently used evicted)
+CHART_CACHE_SIZE = int(os.environ.get("FMS_CHART_CACHE_SIZE", "256"))
+
+# --------------------------
+# Dashboard snapshots
+# --------------------------
+# Per-user KPIs and chart arrays precomputed by `python snapshots.py`
+SNAPSHOT_PATH = Path(os.environ.get("FMS_SNAPSHOT_PATH", CACHE_DIR / "snapshots.db"))
+
+# --------------------------
+# Expense forecasting
+# --------------------------
+# Trained models and the prediction cache written by `python forecasting.py`
+MODEL_DIR = Path(os.environ.get("FMS_MODEL_DIR", CACHE_DIR / "models"))
+
+# --------------------------
+# Instrumentation
+# --------------------------
+# Per-rerun timing panel in the sidebar for every session (or add ?debug=1)
+DEBUG_PANEL = os.environ.get("FMS_DEBUG_PANEL", "0") == "1"
+
+# JSON-lines file receiving every rerun's spans; unset = no trace
+TRACE_PATH = Path(os.environ["FMS_TRACE_PATH"]) if os.environ.get("FMS_TRACE_PATH") else None
@@ -0,0 +1,217 @@
+"""Precomputed per-user dashboard snapshots.
+
+A snapshot holds everything the dashboard shows for one user: the KPI totals
+and the small chart-ready arrays behind the monthly trend, category bars,
+savings progress and utilization heatmap. `python snapshots.py` builds them
+for every user with a process pool and stores them in SNAPSHOT_PATH, a
+SQLite file keyed by user_id, so a page view is a single primary-key lookup.
+
+Each row is tagged with the data version it was built from. A snapshot whose
+version no longer matches the current data is ignored and the user's view is
+computed on demand instead, so a stale store is slower but never wrong. On
+the sqlite backend the version is the user's own change counter (migration
+8), so ingesting one user's statements leaves every other snapshot valid.
+Run the job again after re-exporting the CSVs or loading new statements:
+
+    python snapshots.py                 # all users, one worker per CPU
+    python snapshots.py --workers 8 --chunk-size 500
+"""
+import argparse
+import json
+import multiprocessing
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+import budget_engine
+import charts
+import queries
+import savings_engine
+from data_store import dataset_version, get_user_frame, list_users, load_partition
+from db import ConnectionPool
+from settings import BACKEND, DB_POOL_SIZE, SNAPSHOT_PATH
+
+# Everything a snapshot is derived from
+SOURCES = ("monthly", "category", "savings", "budget", "transactions")
+
+# Bumped when build_snapshot changes, so stores built by older code are ignored
+LAYOUT = 2
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS snapshots (
+        user_id  INTEGER PRIMARY KEY,
+        version  TEXT NOT NULL,
+        built_at TEXT NOT NULL,
+        payload  BLOB NOT NULL
+    );
+"""
+
+
+def data_version(user_id):
+    """Version string of the data behind one user's snapshot, stored with it.
+
+    sqlite: the user's change counter. Files: every source export's mtime.
+    """
+    if BACKEND == "sqlite":
+        return json.dumps([LAYOUT, *queries.user_data_version(user_id)])
+    return json.dumps([LAYOUT, *(dataset_version(name) for name in SOURCES)])
+
+
+# --------------------------
+# Building
+# --------------------------
+def columns(frame, names):
+    return {name: frame[name].tolist() for name in names}
+
+
+def build_snapshot(user_id):
+    """One user's KPIs and chart arrays as plain lists."""
+    monthly = get_user_frame("monthly", user_id)
+    category = get_user_frame("category", user_id)
+    # Same live projections as the User Profile and Savings & Goals pages
+    savings = savings_engine.user_goals(user_id)
+    pivot = charts.utilization_pivot(budget_engine.user_budget(user_id))
+
+    total_income = float(monthly["total_income"].sum())
+    total_expenses = float(monthly["total_expenses"].sum())
+    return {
+        "kpis": {
+            "total_income": total_income,
+            "total_expenses": total_expenses,
+            "net_savings": total_income - total_expenses,
+        },
+        "monthly": columns(monthly.astype({"month": str}), ["month", "total_income", "total_expenses"]),
+        "category": columns(category.astype({"category_name": str}), ["category_name", "total_spent"]),
+        "savings": columns(savings.astype({"goal_name": str}), ["goal_name", "progress_ratio"]),
+        "utilization": {
+            "index": pivot.index.astype(str).tolist(),
+            "columns": pivot.columns.tolist(),
+            "data": pivot.to_numpy().tolist(),
+        },
+    }
+
+
+def encode(snapshot):
+    return zlib.compress(json.dumps(snapshot, separators=(",", ":")).encode())
+
+
+def decode(payload):
+    return json.loads(zlib.decompress(payload))
+
+
+def build_chunk(user_ids):
+    """Worker entry point: [(user_id, payload)] for a batch of users."""
+    return [(int(user_id), encode(build_snapshot(user_id))) for user_id in user_ids]
+
+
+# --------------------------
+# Reading (pages/dashboard.py)
+# --------------------------
+def frame(snapshot, name):
+    """A snapshot's chart arrays as the DataFrame the chart builders expect."""
+    return pd.DataFrame(snapshot[name])
+
+
+def utilization(snapshot):
+    """The category x month utilization pivot stored in a snapshot."""
+    pivot = snapshot["utilization"]
+    return pd.DataFrame(
+        pivot["data"],
+        index=pd.Index(pivot["index"], name="category_name"),
+        columns=pd.Index(pivot["columns"], name="month"),
+        dtype="float64",
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def snapshot_pool():
+    """Read-only connections to the snapshot store (retried until it exists)."""
+    if not SNAPSHOT_PATH.exists():
+        raise FileNotFoundError(f"No snapshot store at {SNAPSHOT_PATH}")
+    return ConnectionPool(SNAPSHOT_PATH, DB_POOL_SIZE)
+
+
+def load_snapshot(user_id, version):
+    """The stored snapshot for `user_id` if it was built from `version`."""
+    try:
+        with snapshot_pool().connection() as conn:
+            row = conn.execute(
+                "SELECT version, payload FROM snapshots WHERE user_id = ?;", (int(user_id),)
+            ).fetchone()
+    except (FileNotFoundError, sqlite3.OperationalError):
+        return None
+    if row is None or row[0] != version:
+        return None
+    return decode(row[1])
+
+
+def user_snapshot(user_id):
+    """One lookup when the store is current, otherwise computed on demand."""
+    return load_snapshot(user_id, data_version(user_id)) or build_snapshot(user_id)
+
+
+# --------------------------
+# Precompute job
+# --------------------------
+def open_store(path=SNAPSHOT_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA)
+    return conn
+
+
+def precompute(workers=None, chunk_size=200, path=SNAPSHOT_PATH):
+    """Build every user's snapshot in parallel; returns the number written."""
+    # Read the versions first: if a user's data changes mid-run, their row
+    # written below is already out of date and lookups will skip it.
+    users = list_users("monthly")
+    versions = {int(user_id): data_version(user_id) for user_id in users}
+    chunks = [users[i:i + chunk_size] for i in range(0, len(users), chunk_size)]
+
+    if BACKEND == "files" and "fork" in multiprocessing.get_all_start_methods():
+        # Forked workers share the parent's partitions copy-on-write
+        for name in SOURCES:
+            load_partition(name)
+        context = multiprocessing.get_context("fork")
+    else:
+        # SQLite handles must not cross a fork, so start clean workers
+        context = multiprocessing.get_context("spawn")
+
+    conn = open_store(path)
+    written = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            for rows in pool.map(build_chunk, chunks):
+                built_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO snapshots (user_id, version, built_at, payload) "
+                        "VALUES (?, ?, ?, ?);",
+                        [(user_id, versions[user_id], built_at, payload) for user_id, payload in rows],
+                    )
+                written += len(rows)
+    finally:
+        conn.close()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=200, help="users per worker task")
+    parser.add_argument("--out", type=Path, default=SNAPSHOT_PATH, help=f"snapshot store (default {SNAPSHOT_PATH})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = precompute(args.workers, args.chunk_size, args.out)
+    print(f"{written:,} snapshots -> {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
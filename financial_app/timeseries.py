@@ -0,0 +1,143 @@
+"""Bounded-size time series for the dashboard charts.
+
+Charts never receive more than MAX_CHART_POINTS points. Transactions are
+rolled up to daily totals once per user, with weekly and monthly rollups
+derived from those. The bucket is chosen from the selected date range, and
+if even the coarsest bucket is too dense the series is thinned with
+Largest-Triangle-Three-Buckets (LTTB), which keeps the visual peaks and
+troughs.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+MAX_CHART_POINTS = 400
+
+# bucket -> (pandas resample rule, label used in chart titles)
+BUCKETS = {
+    "D": ("D", "daily"),
+    "W": ("W-MON", "weekly"),
+    "M": ("MS", "monthly"),
+}
+
+
+def choose_bucket(start, end, max_points=MAX_CHART_POINTS):
+    """Finest bucket that keeps [start, end] within max_points."""
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    if days <= max_points:
+        return "D"
+    if days / 7 <= max_points:
+        return "W"
+    return "M"
+
+
+def resample(daily, bucket):
+    """Sum a daily series (DatetimeIndex) into the given bucket."""
+    if bucket == "D" or daily.empty:
+        return daily
+    rule = BUCKETS[bucket][0]
+    return daily.resample(rule, label="left", closed="left").sum()
+
+
+def build_rollups(dates, amounts):
+    """Day / week / month totals for one set of transactions."""
+    daily = pd.Series(np.asarray(amounts, dtype="float64"), index=pd.DatetimeIndex(dates))
+    daily = daily.groupby(level=0).sum().sort_index()
+    return {bucket: resample(daily, bucket) for bucket in BUCKETS}
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def user_rollups(user_id, version):
+    """Precomputed rollups over a user's full transaction history (files backend).
+
+    `version` (data_store.dataset_version) is only part of the cache key, so
+    a re-export is rolled up afresh.
+    """
+    from data_store import get_user_frame
+
+    df = get_user_frame("transactions", user_id)
+    return build_rollups(df["transaction_date"].to_numpy(), df["amount"].to_numpy())
+
+
+def lttb_indices(x, y, threshold):
+    """Indices of the points LTTB keeps when thinning (x, y) to `threshold` points."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    every = (n - 2) / (threshold - 2)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    anchor = 0
+    for i in range(threshold - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        nxt_hi = min(int((i + 2) * every) + 1, n)
+        avg_x = x[hi:nxt_hi].mean()
+        avg_y = y[hi:nxt_hi].mean()
+        # Triangle area between the last kept point, each candidate in this
+        # bucket and the average of the next bucket
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[lo:hi] - y[anchor])
+            - (x[anchor] - x[lo:hi]) * (avg_y - y[anchor])
+        )
+        anchor = lo + int(area.argmax())
+        keep[i + 1] = anchor
+    return keep
+
+
+def downsample(series, max_points=MAX_CHART_POINTS):
+    """LTTB-thin a Series with a DatetimeIndex (or any index) to max_points."""
+    if len(series) <= max_points:
+        return series
+    if isinstance(series.index, pd.DatetimeIndex):
+        x = series.index.asi8
+    else:
+        x = np.arange(len(series))
+    return series.iloc[lttb_indices(x, series.to_numpy(), max_points)]
+
+
+def bound_frame(df, x_col, y_cols, max_points=MAX_CHART_POINTS):
+    """Thin a wide frame (one x, several y columns) to at most max_points rows.
+
+    Each series gets an equal share of the points for its own LTTB picks, so
+    the union of the rows they keep never exceeds max_points.
+    """
+    if len(df) <= max_points:
+        return df
+    share = max_points // max(len(y_cols), 1)
+    if share < 3:
+        # Too many series for LTTB (it needs 3 points); space rows evenly
+        return df.iloc[np.unique(np.linspace(0, len(df) - 1, max_points).round().astype("int64"))]
+    x_values = df[x_col]
+    if pd.api.types.is_datetime64_any_dtype(x_values):
+        x = x_values.to_numpy().astype("int64")
+    else:
+        x = np.arange(len(df))
+    keep = np.unique(np.concatenate([
+        lttb_indices(x, df[col].to_numpy(), share) for col in y_cols
+    ]))
+    return df.iloc[keep]
+
+
+def chart_series(daily, start=None, end=None, max_points=MAX_CHART_POINTS, rollups=None):
+    """Bounded series for [start, end] of a daily Series -> (Series, bucket label).
+
+    `rollups` (from build_rollups over the same daily totals) lets a
+    whole-history selection reuse the precomputed week/month buckets.
+    """
+    if daily.empty:
+        return daily, BUCKETS["D"][1]
+    first, last = daily.index[0], daily.index[-1]
+    start = pd.Timestamp(start) if start is not None else first
+    end = pd.Timestamp(end) if end is not None else last
+    bucket = choose_bucket(start, end, max_points)
+
+    if rollups is not None and start <= first and end >= last:
+        series = rollups[bucket]
+    else:
+        series = resample(daily.loc[start:end], bucket)
+    return downsample(series, max_points), BUCKETS[bucket][1]
@@ -0,0 +1,232 @@
+"""Row sources behind the Transactions Explorer.
+
+A source answers the same questions for one user whichever backend is
+active: which filter values exist, which rows match, and grouped totals for
+the charts. `FrameSource` works on a per-user slice from data_store,
+`SqlSource` pushes everything down to SQLite through queries.py.
+
+The table itself is paged: `page()` returns one window plus an opaque cursor
+for the next window, so only the visible rows are ever sent to the browser.
+Exports read every matching row through `chunks()`, a bounded piece at a time.
+"""
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import queries
+import timeseries
+
+# start/end are datetime.date (or None), categories/types are tuples of the
+# selected values, or None when the column should not be filtered at all.
+# search is the search box text: every word must start a word of the
+# description, merchant name or reference number.
+TransactionFilter = namedtuple(
+    "TransactionFilter", ["start", "end", "categories", "types", "search"], defaults=(None,)
+)
+
+# Columns the search box looks in
+SEARCH_COLUMNS = ["description", "merchant_name", "reference_number"]
+
+# Table sort choices: label -> (sort key, descending)
+SORT_ORDERS = {
+    "Newest first": ("date", True),
+    "Oldest first": ("date", False),
+    "Amount (high → low)": ("amount", True),
+    "Amount (low → high)": ("amount", False),
+}
+
+
+class FrameSource:
+    """Filters an in-memory frame whose key columns were detected by the page."""
+
+    def __init__(
+        self, frame, date_col=None, cat_col=None, type_col=None, amount_col=None,
+        user_id=None, rollups=None,
+    ):
+        self.frame = frame
+        self.user_id = user_id
+        # Precomputed day/week/month totals for the unfiltered frame, if any
+        self.rollups = rollups
+        self.date_col = date_col
+        self.cat_col = cat_col
+        self.type_col = type_col
+        self.amount_col = amount_col
+        self._last = (None, None)
+        # Dates arrive as datetime64 from data_store and per-user partitions
+        # are date-sorted, which lets date ranges be found by binary search.
+        self.date_sorted = bool(date_col) and frame[date_col].is_monotonic_increasing
+
+    def options(self):
+        df = self.frame
+        dates = df[self.date_col] if self.date_col else None
+        if dates is not None and self.date_sorted and len(dates):
+            min_date, max_date = dates.iloc[0], dates.iloc[-1]
+        elif dates is not None:
+            min_date, max_date = dates.min(), dates.max()
+        else:
+            min_date = max_date = None
+        return {
+            "min_date": min_date,
+            "max_date": max_date,
+            "categories": sorted(df[self.cat_col].unique()) if self.cat_col else None,
+            "types": sorted(df[self.type_col].unique()) if self.type_col else None,
+        }
+
+    def rows(self, filters):
+        # The table and both charts ask for the same filtered rows in one rerun
+        if self._last[0] == filters:
+            return self._last[1]
+        df = self.frame
+        if self.date_col and (filters.start is not None or filters.end is not None):
+            df = self.date_window(df, filters.start, filters.end)
+        if self.cat_col and filters.categories is not None:
+            df = df[df[self.cat_col].isin(filters.categories)]
+        if self.type_col and filters.types is not None:
+            df = df[df[self.type_col].isin(filters.types)]
+        terms = queries.search_terms(filters.search)
+        if terms:
+            df = df[self.search_mask(df, terms)]
+        self._last = (filters, df)
+        return df
+
+    def date_window(self, df, start, end):
+        """Rows with start <= date <= end (calendar days, either bound optional)."""
+        # Half-open [start, end + 1 day) so the whole end day is included
+        low = np.datetime64(pd.Timestamp(start), "ns") if start is not None else None
+        high = np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1), "ns") if end is not None else None
+        dates = df[self.date_col].to_numpy()
+
+        if self.date_sorted:
+            first = dates.searchsorted(low, side="left") if low is not None else 0
+            stop = dates.searchsorted(high, side="left") if high is not None else len(dates)
+            return df.iloc[first:stop]
+
+        mask = np.ones(len(dates), dtype=bool)
+        if low is not None:
+            mask &= dates >= low
+        if high is not None:
+            mask &= dates < high
+        return df[mask]
+
+    def search_mask(self, df, terms):
+        """Rows where every term starts a word in one of the SEARCH_COLUMNS."""
+        mask = np.ones(len(df), dtype=bool)
+        columns = [column for column in SEARCH_COLUMNS if column in df.columns]
+        for term in terms:
+            # Not preceded by a letter or digit = start of an FTS5 token
+            pattern = rf"(?<![^\W_]){re.escape(term)}"
+            hit = np.zeros(len(df), dtype=bool)
+            for column in columns:
+                values = df[column]
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    # Match each distinct value once, then map back via the codes
+                    found = values.cat.categories.str.contains(pattern, case=False, regex=True)
+                    codes = values.cat.codes.to_numpy()
+                    hit |= (codes >= 0) & np.append(found, False)[codes]
+                else:
+                    hit |= values.fillna("").astype(str).str.contains(pattern, case=False, regex=True).to_numpy()
+            mask &= hit
+        return mask
+
+    def count(self, filters):
+        return len(self.rows(filters))
+
+    def page(self, filters, sort_by, descending, size, cursor=None):
+        """Rows [cursor, cursor + size) in the requested order; cursor is an offset."""
+        df = self.rows(filters)
+        column = self.date_col if sort_by == "date" else self.amount_col
+        if column is None:
+            ordered = df
+        elif column == self.date_col and self.date_sorted:
+            # Per-user partitions are already date-sorted, no need to re-sort
+            ordered = df.iloc[::-1] if descending else df
+        else:
+            ordered = df.sort_values(column, ascending=not descending, kind="stable")
+
+        start = cursor or 0
+        stop = start + size
+        return ordered.iloc[start:stop], (stop if stop < len(ordered) else None)
+
+    def chunks(self, filters, size):
+        """Matching rows as slices of at most `size` rows (one empty slice if none match)."""
+        df = self.rows(filters)
+        for start in range(0, max(len(df), 1), size):
+            yield df.iloc[start:start + size]
+
+    def category_totals(self, filters):
+        return (
+            self.rows(filters)
+            .groupby(self.cat_col, observed=True)[self.amount_col]
+            .sum()
+            .reset_index()
+            .sort_values(self.amount_col, ascending=False)
+        )
+
+    def daily_totals(self, filters):
+        return (
+            self.rows(filters)
+            .groupby(self.date_col)[self.amount_col]
+            .sum()
+            .reset_index()
+            .sort_values(self.date_col)
+        )
+
+    def time_series(self, filters, max_points=timeseries.MAX_CHART_POINTS):
+        """Bounded amount-over-time series -> (Series, bucket label)."""
+        unfiltered = filters.categories is None and filters.types is None and not queries.search_terms(filters.search)
+        if self.rollups is not None and unfiltered:
+            return timeseries.chart_series(
+                self.rollups["D"], filters.start, filters.end, max_points, rollups=self.rollups
+            )
+        daily = self.daily_totals(filters).set_index(self.date_col)[self.amount_col]
+        return timeseries.chart_series(daily, filters.start, filters.end, max_points)
+
+
+class SqlSource:
+    """One user's transactions in SQLite; filters become WHERE clauses."""
+
+    date_col = "transaction_date"
+    cat_col = "category_name"
+    type_col = "transaction_type"
+    amount_col = "amount"
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+
+    def options(self):
+        return queries.transaction_filter_options(self.user_id)
+
+    def rows(self, filters):
+        return queries.filtered_transactions(self.user_id, filters)
+
+    def count(self, filters):
+        return queries.count_transactions(self.user_id, filters)
+
+    def page(self, filters, sort_by, descending, size, cursor=None):
+        return queries.transaction_page(self.user_id, filters, sort_by, descending, size, cursor)
+
+    def chunks(self, filters, size):
+        return queries.transaction_chunks(self.user_id, filters, size)
+
+    def category_totals(self, filters):
+        return queries.category_totals(self.user_id, filters)
+
+    def daily_totals(self, filters):
+        return queries.daily_totals(self.user_id, filters)
+
+    def time_series(self, filters, max_points=timeseries.MAX_CHART_POINTS):
+        """Bucketed in SQL, then LTTB-thinned if still too dense."""
+        start, end = filters.start, filters.end
+        if start is None or end is None:
+            options = self.options()
+            start = start if start is not None else options["min_date"]
+            end = end if end is not None else options["max_date"]
+        if start is None:
+            bucket = "D"
+        else:
+            bucket = timeseries.choose_bucket(start, end, max_points)
+        totals = queries.bucket_totals(self.user_id, filters, bucket)
+        series = totals.set_index("period")["amount"]
+        return timeseries.downsample(series, max_points), timeseries.BUCKETS[bucket][1]
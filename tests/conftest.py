@@ -0,0 +1,45 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# The app's modules import each other as top-level modules (run from financial_app/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "financial_app"))
+
+
+@pytest.fixture
+def fms_db(tmp_path):
+    """A small generated database with every migration applied (autocommit connection)."""
+    import generate_data
+    import migrations
+
+    path = tmp_path / "fms.db"
+    generate_data.write_all(generate_data.SqliteWriter(path), generate_data.generate(2_000, n_users=20, seed=1))
+    migrations.migrate(path)
+    conn = sqlite3.connect(path, isolation_level=None)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def statement(fms_db):
+    """Builds CSV-shaped expense rows on fms_db's accounts, as a bank feed sends them."""
+    import numpy as np
+    import pandas as pd
+
+    accounts = [account for (account,) in fms_db.execute("SELECT account_id FROM Accounts ORDER BY account_id;")]
+    days = pd.date_range("2025-01-01", "2025-06-30").strftime("%Y-%m-%d")
+
+    def build(rows, merchants=("Naivas", "Uber", "Java House"), seed=0, first_reference=0):
+        rng = np.random.default_rng(seed)
+        return pd.DataFrame({
+            "account_id": rng.choice(accounts, rows),
+            "transaction_date": rng.choice(days, rows),
+            "amount": -rng.gamma(2.0, 500.0, rows).round(2),
+            "reference_number": [f"TST{first_reference + i:08d}" for i in range(rows)],
+            "merchant_name": np.array(merchants)[np.minimum(rng.zipf(1.2, rows), len(merchants)) - 1],
+            "category_name": "Groceries",
+        })
+
+    return build
@@ -0,0 +1,120 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import anomaly
+import migrations
+from anomaly import KEYS, Detector, amount_scores, budget_crossings
+
+
+def empty_state():
+    index = pd.MultiIndex.from_arrays([[], []], names=KEYS)
+    return pd.DataFrame({"n": [], "mean": [], "m2": []}, index=index)
+
+
+def expense_batches(seed=7, batches=5, rows=400):
+    """Expenses for a few (user, category) keys; large amounts, small spread."""
+    rng = np.random.default_rng(seed)
+    for _ in range(batches):
+        yield pd.DataFrame({
+            "user_id": rng.integers(1, 4, rows),
+            "category_id": rng.integers(1, 3, rows),
+            "spent": 1_000_000 + rng.normal(0, 25, rows),
+        })
+
+
+def test_incremental_state_matches_numpy_over_all_batches():
+    state = empty_state()
+    seen = []
+    for batch in expense_batches():
+        _, update = amount_scores(batch, state)
+        state = update.combine_first(state)
+        seen.append(batch)
+
+    everything = pd.concat(seen)
+    for (user_id, category_id), rows in everything.groupby(KEYS):
+        spent = rows["spent"].to_numpy()
+        n, mean, m2 = state.loc[(user_id, category_id), ["n", "mean", "m2"]]
+        assert n == len(spent)
+        assert mean == pytest.approx(spent.mean(), rel=1e-12)
+        assert m2 / n == pytest.approx(np.var(spent), rel=1e-9)
+
+
+def test_scores_use_only_earlier_rows_and_ignore_chunking():
+    batch = next(expense_batches(rows=300))
+    whole, _ = amount_scores(batch, empty_state(), min_history=10)
+
+    state, parts = empty_state(), []
+    for start in range(0, len(batch), 70):
+        z, update = amount_scores(batch.iloc[start:start + 70], state, min_history=10)
+        state = update.combine_first(state)
+        parts.append(z)
+    np.testing.assert_allclose(np.concatenate(parts), whole, rtol=1e-9, equal_nan=True)
+
+    key = batch[KEYS].apply(tuple, axis=1)
+    for position in [150, 220, 299]:
+        earlier = batch["spent"].to_numpy()[:position][(key.iloc[:position] == key.iloc[position]).to_numpy()]
+        expected = (batch["spent"].iloc[position] - earlier.mean()) / earlier.std(ddof=1)
+        assert whole[position] == pytest.approx(expected, rel=1e-6)
+
+
+def test_budget_crossings_follow_running_month_to_date_spend():
+    rows = pd.DataFrame({
+        "user_id": [1, 1, 1], "category_id": [5, 5, 5], "year": [2025] * 3, "month": [3] * 3,
+        "spent": [10.0, 15.0, 30.0],
+    })
+    # 50 already spent before the chunk, 105 after it, against a budget of 100
+    buckets = pd.DataFrame(
+        {"total_spent": [105.0], "budget_amount": [100.0]},
+        index=pd.MultiIndex.from_tuples([(1, 5, 2025, 3)], names=anomaly.BUCKET_KEYS),
+    )
+    crossed = {threshold: (positions.tolist(), utilization.tolist())
+               for positions, threshold, utilization in budget_crossings(rows, buckets)}
+    assert crossed == {80: ([2], [105.0]), 100: ([2], [105.0])}
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE Budgets (user_id INTEGER, category_id INTEGER, year INTEGER, month INTEGER, budget_amount REAL);"
+    )
+    for statement in [migrations.SUMMARY_TABLES[1], *migrations.ANOMALY_TABLES]:
+        conn.execute(statement)
+    conn.execute("INSERT INTO Budgets VALUES (1, 5, 2025, 3, 100);")
+    yield conn
+    conn.close()
+
+
+def inserted(amounts):
+    """Rows as ingest.py hands them to Detector.observe."""
+    return pd.DataFrame({
+        "user_id": 1, "account_id": 9, "category_id": 5, "amount": amounts,
+        "transaction_date": "2025-03-14", "reference_number": [f"R{i}" for i in range(len(amounts))],
+    })
+
+
+def set_month_to_date(conn, total_spent):
+    """What the CategoryMonthlySpend trigger holds after the chunk (expenses only)."""
+    conn.execute(
+        "INSERT OR REPLACE INTO CategoryMonthlySpend (user_id, category_id, year, month, total_spent, num_transactions) "
+        "VALUES (1, 5, 2025, 3, ?, 1);",
+        (total_spent,),
+    )
+
+
+def test_refunds_never_cross_a_budget_threshold(conn):
+    # 70 spent so far; a large refund alone must not raise anything
+    set_month_to_date(conn, 70)
+    assert Detector(conn).observe(inserted([500.0])).empty
+
+    # A refund ahead of an expense must not lower the spend the expense is
+    # measured from: 70 -> 90 crosses 80 once, at the expense
+    set_month_to_date(conn, 90)
+    alerts = Detector(conn).observe(inserted([40.0, -20.0]))
+    assert alerts["kind"].tolist() == ["budget"]
+    assert alerts["threshold"].tolist() == [80]
+    assert alerts["amount"].tolist() == [20.0]
+    assert alerts["value"].tolist() == [90.0]
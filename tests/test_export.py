@@ -0,0 +1,14 @@
+import shlex
+from datetime import date
+
+from export import cli_command
+from transaction_sources import TransactionFilter
+
+
+def test_cli_command_survives_shell_metacharacters_in_the_search():
+    search = "it's $(rm -rf ~) `id` \\n; echo"
+    filters = TransactionFilter(date(2025, 1, 1), date(2025, 3, 31), ("Groceries",), None, search)
+    assert shlex.split(cli_command(42, filters, "parquet")) == [
+        "python", "export.py", "42", "--format", "parquet",
+        "--start", "2025-01-01", "--end", "2025-03-31", "--search", search,
+    ]
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+import ingest
+
+RECOMPUTED_SUMMARY = """
+    SELECT user_id, txn_year AS year, txn_month AS month,
+           SUM(MAX(amount, 0)) AS total_income, SUM(MAX(-amount, 0)) AS total_expenses,
+           COUNT(*) AS num_transactions
+    FROM Transactions
+    GROUP BY user_id, txn_year, txn_month
+    ORDER BY user_id, year, month;
+"""
+
+
+@pytest.fixture
+def feed(statement, tmp_path):
+    """A CSV statement that repeats 50 of its rows two chunks later."""
+    rows = statement(300)
+    path = tmp_path / "feed.csv"
+    pd.concat([rows, rows.head(50)]).to_csv(path, index=False)
+    return path
+
+
+def test_reingesting_a_file_inserts_nothing_and_keeps_monthly_summary_exact(fms_db, feed):
+    first = ingest.ingest_file(fms_db, feed, chunksize=100)
+    again = ingest.ingest_file(fms_db, feed, chunksize=100)
+
+    assert (first["inserted"], first["duplicates"], first["rejected"]) == (300, 50, 0)
+    assert (again["inserted"], again["duplicates"]) == (0, 350)
+    stored = pd.read_sql_query("SELECT * FROM MonthlySummary ORDER BY user_id, year, month;", fms_db)
+    pd.testing.assert_frame_equal(stored, pd.read_sql_query(RECOMPUTED_SUMMARY, fms_db), check_dtype=False)
+
+
+def test_dry_run_finds_duplicates_in_earlier_chunks(fms_db, feed):
+    before = fms_db.execute("SELECT COUNT(*) FROM Transactions;").fetchone()
+    dry = ingest.ingest_file(fms_db, feed, chunksize=100, dry_run=True)
+
+    assert fms_db.execute("SELECT COUNT(*) FROM Transactions;").fetchone() == before
+    real = ingest.ingest_file(fms_db, feed, chunksize=100)
+    counters = ["read", "inserted", "duplicates", "rejected"]
+    assert [dry[key] for key in counters] == [real[key] for key in counters] == [350, 300, 50, 0]
@@ -0,0 +1,93 @@
+from collections import Counter
+
+import numpy as np
+
+import ingest
+from merchants import ALL_USERS, METRICS, space_saving
+from migrations import MERCHANT_GLOBAL_CAPACITY, MERCHANT_USER_CAPACITY
+
+
+def skewed_stream(seed=3, chunks=40, rows=250, merchants=300):
+    """Chunks of {merchant: weight} drawn from a long-tailed merchant mix."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"M{i:03d}" for i in range(merchants)])
+    for _ in range(chunks):
+        picked = names[np.minimum(rng.zipf(1.3, rows), merchants) - 1]
+        spend = rng.gamma(2.0, 40.0, rows).round(2)
+        weights = Counter()
+        for name, amount in zip(picked, spend):
+            weights[name] += amount
+        yield dict(weights)
+
+
+def test_space_saving_bounds_every_true_total():
+    capacity = 32
+    counters, exact = {}, Counter()
+    for weights in skewed_stream():
+        space_saving(counters, weights, capacity)
+        exact.update(weights)
+
+        assert len(counters) <= capacity
+        for merchant, (value, error) in counters.items():
+            # Never undercounts, overcounts by at most `error`
+            assert value - error <= exact[merchant] + 1e-6
+            assert exact[merchant] <= value + 1e-6
+
+    # Anything left out is no larger than the smallest counter, so every
+    # merchant above 1 / capacity of the total has one
+    smallest = min(value for value, _ in counters.values())
+    total = sum(exact.values())
+    for merchant, true_total in exact.items():
+        if merchant not in counters:
+            assert true_total <= smallest + 1e-6
+        if true_total > total / capacity:
+            assert merchant in counters
+
+
+def test_space_saving_is_exact_until_the_summary_fills_up():
+    counters = {}
+    evicted = space_saving(counters, {"a": 5.0, "b": 2.0}, capacity=3)
+    evicted += space_saving(counters, {"a": 1.0, "c": 4.0}, capacity=3)
+    assert evicted == []
+    assert counters == {"a": [6.0, 0.0], "b": [2.0, 0.0], "c": [4.0, 0.0]}
+
+    # A new merchant replaces the smallest counter and inherits its value as error
+    assert space_saving(counters, {"d": 1.0}, capacity=3) == ["b"]
+    assert counters["d"] == [3.0, 2.0]
+
+
+def counters_and_truth(conn, scope, metric):
+    """The stored summary of one scope and metric + every merchant's exact total."""
+    value = "SUM(-amount)" if metric == "spend" else "COUNT(*)"
+    where = "amount < 0 AND merchant_name IS NOT NULL" + ("" if scope == ALL_USERS else f" AND user_id = {scope}")
+    truth = dict(conn.execute(f"SELECT merchant_name, {value} FROM Transactions WHERE {where} GROUP BY merchant_name;"))
+    summary = {
+        merchant: (value, error)
+        for merchant, value, error in conn.execute(
+            "SELECT merchant_name, value, error FROM MerchantCounters WHERE scope = ? AND metric = ?;", (scope, metric)
+        )
+    }
+    return summary, truth
+
+
+def test_tracker_keeps_user_and_all_user_summaries_within_their_bounds(fms_db, statement):
+    ingestor = ingest.Ingestor(fms_db)
+    shops = [f"Shop {i:04d}" for i in range(900)]
+    for chunk in range(4):
+        ingestor.load_chunk(statement(1_500, shops, seed=chunk, first_reference=chunk * 1_500))
+
+    users = [user_id for (user_id,) in fms_db.execute("SELECT user_id FROM Users;")]
+    evicted = set()
+    for scope, capacity in [(ALL_USERS, MERCHANT_GLOBAL_CAPACITY)] + [(user, MERCHANT_USER_CAPACITY) for user in users]:
+        for metric in METRICS:
+            summary, truth = counters_and_truth(fms_db, scope, metric)
+            assert len(summary) <= capacity
+            for merchant, (value, error) in summary.items():
+                assert value - error <= truth[merchant] + 1e-6
+                assert truth[merchant] <= value + 1e-6
+            smallest = min(value for value, _ in summary.values())
+            assert all(total <= smallest + 1e-6 for merchant, total in truth.items() if merchant not in summary)
+            if len(truth) > capacity:
+                evicted.add(scope == ALL_USERS)
+    # Both kinds of summary overflowed, so the eviction path was exercised
+    assert evicted == {True, False}
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from timeseries import bound_frame
+
+
+@pytest.mark.parametrize("columns, max_points", [(2, 400), (3, 400), (5, 12)])
+def test_bound_frame_never_exceeds_max_points(columns, max_points):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"month": pd.date_range("1990-01-01", periods=2_000, freq="D")})
+    for i in range(columns):
+        # Independent noise, so each series' LTTB picks different rows
+        df[f"y{i}"] = rng.normal(size=len(df)).cumsum()
+
+    thinned = bound_frame(df, "month", [f"y{i}" for i in range(columns)], max_points)
+
+    assert len(thinned) <= max_points
+    assert thinned["month"].is_monotonic_increasing
+    assert thinned.index[0] == 0 and thinned.index[-1] == len(df) - 1